@@ -60,9 +60,42 @@ class AppLocalizations {
     _localizedStrings = jsonMap.map((key, value) => MapEntry(key, value));
     final flattened = <String, String>{};
     _flattenJson(_localizedStrings, flattened);
+    applyFaqAliases(_localizedStrings, flattened);
     return flattened;
   }
 
+  /// Открывает FAQ одного калькулятора под id другого.
+  ///
+  /// `"faq_aliases": {"slopes_finishing": "slopes"}` делает ключи
+  /// `faq.slopes_finishing.*` ссылками на строки `faq.slopes.*`, без копии
+  /// блока в JSON (см. tools/faq_aliases.py).
+  @visibleForTesting
+  static void applyFaqAliases(
+    Map<String, dynamic> strings,
+    Map<String, String> target,
+  ) {
+    final aliases = strings['faq_aliases'];
+    if (aliases is! Map<String, dynamic>) return;
+    aliases.forEach((alias, _) {
+      // Цепочки псевдонимов разворачиваются до блока с текстом.
+      var source = aliases[alias];
+      for (var hops = 0; aliases[source] is String && hops < aliases.length; hops++) {
+        source = aliases[source];
+      }
+      if (source is! String) return;
+      final from = 'faq.$source.';
+      final shared = target.entries
+          .where((e) => e.key.startsWith(from))
+          .toList();
+      for (final entry in shared) {
+        target.putIfAbsent(
+          'faq.$alias.${entry.key.substring(from.length)}',
+          () => entry.value,
+        );
+      }
+    });
+  }
+
   /// Удобный метод доступа из контекста.
   static AppLocalizations of(BuildContext context) {
     return Localizations.of<AppLocalizations>(context, AppLocalizations)!;
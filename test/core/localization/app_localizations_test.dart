@@ -300,6 +300,58 @@ void main() {
     });
   });
 
+  group('AppLocalizations faq_aliases', () {
+    const slopesQ1 = 'Чем лучше делать откосы: сэндвич-панелью или штукатуркой?';
+
+    test('переводит FAQ псевдонима текстом исходного блока', () async {
+      final localizations = AppLocalizations(const Locale('ru'));
+      await localizations.load();
+
+      expect(localizations.translate('faq.slopes.q1'), equals(slopesQ1));
+      expect(
+        localizations.translate('faq.slopes_finishing.q1'),
+        equals(slopesQ1),
+      );
+    });
+
+    test('TestAppLocalizations разрешает псевдонимы так же', () {
+      final localizations = TestAppLocalizations(const Locale('ru'));
+
+      expect(
+        localizations.translate('faq.slopes_finishing.q1'),
+        equals(slopesQ1),
+      );
+    });
+
+    test('разворачивает цепочку псевдонимов', () {
+      final target = {'faq.base.q1': 'Вопрос', 'faq.base.a1': 'Ответ'};
+      AppLocalizations.applyFaqAliases({
+        'faq_aliases': {'first': 'second', 'second': 'base'},
+      }, target);
+
+      expect(target['faq.first.q1'], equals('Вопрос'));
+      expect(target['faq.second.a1'], equals('Ответ'));
+    });
+
+    test('не зацикливается на циклических псевдонимах', () {
+      final target = {'faq.base.q1': 'Вопрос'};
+      AppLocalizations.applyFaqAliases({
+        'faq_aliases': {'a': 'b', 'b': 'a'},
+      }, target);
+
+      expect(target, equals({'faq.base.q1': 'Вопрос'}));
+    });
+
+    test('не перезаписывает собственный блок псевдонима', () {
+      final target = {'faq.base.q1': 'Вопрос', 'faq.own.q1': 'Свой'};
+      AppLocalizations.applyFaqAliases({
+        'faq_aliases': {'own': 'base'},
+      }, target);
+
+      expect(target['faq.own.q1'], equals('Свой'));
+    });
+  });
+
   group('AppLocalizations integration', () {
     testWidgets('работает во всём приложении', (tester) async {
       await tester.pumpWidget(
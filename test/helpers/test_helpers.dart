@@ -84,6 +84,15 @@ Map<String, dynamic>? _syncLoadTranslations() {
 
 String _getNestedValue(Map<String, dynamic> map, String key) {
   final parts = key.split('.');
+  // faq.<alias>.* читает блок, на который ссылается faq_aliases.
+  final aliases = map['faq_aliases'];
+  if (parts.length > 1 && parts.first == 'faq' && aliases is Map<String, dynamic>) {
+    var id = parts[1];
+    for (var hops = 0; aliases[id] is String && hops < aliases.length; hops++) {
+      id = aliases[id] as String;
+    }
+    parts[1] = id;
+  }
   dynamic current = map;
 
   for (final part in parts) {
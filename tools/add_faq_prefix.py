@@ -1,9 +1,21 @@
 #!/usr/bin/env python3
-"""Add faqPrefix to CalculatorScaffold calls in calculator screens."""
+"""Add faqPrefix to CalculatorScaffold calls in calculator screens.
 
+The manual `_buildFaqCard()` method is cut at its matching brace (see
+bounded_match.brace_block_end) under a per-file time budget (--budget-ms);
+a file over budget is left unchanged.
+"""
+
+import argparse
 import re
 from pathlib import Path
 
+from bounded_match import FileBudget, TimingReport, add_budget_argument, brace_block_end
+from git_changes import add_change_arguments, dart_files, selected_changes
+from profiling import run_main
+from source_index import SourceIndex
+from writeback import WriteBack
+
 ROOT = Path(__file__).resolve().parents[1]
 REGISTRY = ROOT / "lib/presentation/utils/calculator_screen_registry.dart"
 CALC_DIR = ROOT / "lib/presentation/views/calculator"
@@ -31,16 +43,10 @@ MANUAL = {
     "roofing_unified_calculator_screen.dart": "roofing_unified",
 }
 
-# FAQ prefix may differ from calculator id when localization uses another key
-FAQ_PREFIX_BY_CALC_ID = {
-    "partitions_blocks": "faq.partitions",
-    "insulation_sound": "faq.insulation",
-    "roofing_unified": "faq.roofing",
-    "slopes_finishing": "faq.slopes",
-}
-
 SKIP_FILES = {"pro_calculator_screen.dart"}
 
+FAQ_CARD_METHOD = re.compile(r"\n\s*Widget _buildFaqCard\(\) \{")
+
 
 def camel_to_snake(name: str) -> str:
     s = re.sub(r"(.)([A-Z][a-z]+)", r"\1_\2", name)
@@ -61,31 +67,47 @@ def screen_class_to_file(class_name: str) -> str:
     return f"{camel_to_snake(class_name)}.dart"
 
 
-def parse_registry() -> dict[str, str]:
+def registry_pairs() -> list[tuple[str, str]]:
+    """(calc_id, screen class) for every builder in calculator_screen_registry.dart."""
     text = REGISTRY.read_text(encoding="utf-8")
     pattern = re.compile(
         r"'([^']+)':[^=]*=>\s*(?:\([^)]*\)\s*=>\s*)?(?:const\s+)?(\w+)\("
     )
+    return pattern.findall(text)
+
+
+def parse_registry() -> dict[str, str]:
     mapping: dict[str, str] = {}
-    for calc_id, class_name in pattern.findall(text):
+    for calc_id, class_name in registry_pairs():
         fname = screen_class_to_file(class_name)
         mapping[fname] = calc_id
     mapping.update(MANUAL)
     return mapping
 
 
-def remove_manual_faq(content: str) -> str:
-    """Remove _buildFaqCard method and its usage from children."""
+def remove_manual_faq(content: str, budget: FileBudget | None = None) -> str:
+    """Remove _buildFaqCard method and its usage from children.
+
+    A file whose braces do not balance is returned unchanged. ``budget`` is
+    checked before each method is cut (BudgetExceeded propagates).
+    """
+    original = content
     content = re.sub(
         r"\n\s*const SizedBox\(height: 16\),\n\s*_buildFaqCard\(\),",
         "",
         content,
     )
-    content = re.sub(
-        r"\n\s*Widget _buildFaqCard\(\) \{[\s\S]*?\n\s*\}\n",
-        "\n",
-        content,
-    )
+    # Cut the method at its matching brace rather than with a lazy `[\s\S]*?`,
+    # which would stop at the first nested `}` line.
+    while match := FAQ_CARD_METHOD.search(content):
+        if budget:
+            budget.check()
+        end = brace_block_end(content, match.end() - 1)
+        if end is None:
+            return original
+        if content.startswith("\n", end):
+            end += 1
+        content = content[: match.start()] + "\n" + content[end:]
     return content
 
 
@@ -93,7 +115,8 @@ def add_faq_prefix(content: str, calc_id: str) -> tuple[str, bool, str | None]:
     if "faqPrefix:" in content:
         return content, False, None
 
-    prefix = FAQ_PREFIX_BY_CALC_ID.get(calc_id, f"faq.{calc_id}")
+    # Shared FAQ blocks are resolved at load time via faq_aliases in ru.json.
+    prefix = f"faq.{calc_id}"
     # Insert after accentColor line in first CalculatorScaffold(
     match = re.search(
         r"(return CalculatorScaffold\(\n\s*title:[^\n]+\n\s*accentColor:[^\n]+,)",
@@ -108,37 +131,48 @@ def add_faq_prefix(content: str, calc_id: str) -> tuple[str, bool, str | None]:
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Add faqPrefix to CalculatorScaffold calls.")
+    add_change_arguments(parser)
+    add_budget_argument(parser)
+    args = parser.parse_args()
+
     mapping = parse_registry()
-    dirs = [CALC_DIR, *OTHER_DIRS]
+    changes = selected_changes(args)
+    paths = [p for d in [CALC_DIR, *OTHER_DIRS] if d.exists() for p in dart_files(d, changes)]
     updated = 0
     skipped = 0
+    report = TimingReport(args.budget_ms)
 
-    for d in dirs:
-        if not d.exists():
-            continue
-        for path in sorted(d.glob("*.dart")):
+    with SourceIndex() as index:
+        screens = [p for p, e in zip(paths, index.entries(paths)) if e.has_scaffold]
+
+    with WriteBack() as wb:
+        for path in screens:
             if path.name.startswith("_") or path.name in SKIP_FILES:
                 continue
-            content = path.read_text(encoding="utf-8")
-            if "CalculatorScaffold(" not in content:
-                continue
             calc_id = mapping.get(path.name)
             if not calc_id:
                 print(f"SKIP (no id): {path.name}")
                 skipped += 1
                 continue
 
-            original = content
-            content = remove_manual_faq(content)
+            original = path.read_text(encoding="utf-8")
+            content = None
+            with report.file(path.name) as budget:
+                content = remove_manual_faq(original, budget)
+            if content is None:
+                continue  # over budget: left unchanged
             content, changed, prefix = add_faq_prefix(content, calc_id)
             if content != original:
-                path.write_text(content, encoding="utf-8")
+                wb.stage(path, content)
             if changed:
                 print(f"UPDATED: {path.name} -> {prefix}")
                 updated += 1
 
     print(f"\nDone: {updated} updated, {skipped} skipped")
+    print(wb.stats)
+    report.print()
 
 
 if __name__ == "__main__":
-    main()
+    run_main(main)
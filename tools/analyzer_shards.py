@@ -0,0 +1,123 @@
+"""Sharded, cached `dart analyze` runs for remove_unused_imports.py.
+
+lib/ is split into non-overlapping analyzer targets covering the files
+without cached results, and the analyzer runs on them concurrently, at most
+``jobs`` at a time. `dart analyze DIR` is recursive, so a directory is
+split into its subdirectories only when it holds few Dart files itself
+(those are analyzed one by one); otherwise the whole subtree is one target.
+Every diagnostic a target reports is kept. Diagnostics are cached per
+(path, content SHA-1), so after fixing a handful of files only the targets
+holding changed files are re-analyzed.
+
+The cache assumes a file's unused imports depend only on its own content.
+That holds for the usual cases; pass ``use_cache=False`` (``--no-cache``)
+after changing what a widely imported library exports.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+import subprocess
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from parallel import resolve_jobs
+from source_index import CACHE_DIR, ROOT, SourceIndex
+
+LIB = ROOT / "lib"
+DB_PATH = CACHE_DIR / "analyzer_cache.sqlite"
+# A directory with subdirectories is split when it directly holds at most
+# this many files to analyze; each of them then costs one analyzer start.
+SPLIT_MAX_FILES = 8
+
+Edit = tuple[str, int, str]  # (file relative to ROOT, line, import path)
+
+
+def _open_cache() -> sqlite3.Connection:
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(DB_PATH)
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS unused_imports ("
+        "path TEXT NOT NULL, sha1 TEXT NOT NULL, edits TEXT NOT NULL, "
+        "PRIMARY KEY (path, sha1))"
+    )
+    return db
+
+
+def shard_targets(files: set[Path], directory: Path = LIB) -> list[Path]:
+    """Disjoint files and directories under ``directory`` covering ``files``."""
+    inside = {f for f in files if f.is_relative_to(directory)}
+    if not inside:
+        return []
+    own = {f for f in inside if f.parent == directory}
+    subdirs = sorted(p for p in directory.iterdir() if p.is_dir())
+    if not subdirs or len(own) > SPLIT_MAX_FILES:
+        return [directory]
+    targets = sorted(own)
+    for sub in subdirs:
+        targets += shard_targets(inside - own, sub)
+    return targets
+
+
+def _covered(target: Path) -> list[Path]:
+    return sorted(target.rglob("*.dart")) if target.is_dir() else [target]
+
+
+def run_shard(target: Path) -> list[Edit]:
+    """Analyze one file or directory tree and return its unused_import diagnostics."""
+    # Imported lazily to avoid a cycle: remove_unused_imports imports us.
+    from remove_unused_imports import DART_ANALYZE_MACHINE, iter_edits
+
+    result = subprocess.run(
+        [*DART_ANALYZE_MACHINE, target.relative_to(ROOT).as_posix()],
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        cwd=ROOT,
+    )
+    return list(iter_edits((result.stdout + "\n" + result.stderr).splitlines()))
+
+
+def analyze_sharded(jobs: int = 1, use_cache: bool = True) -> tuple[list[Edit], int, int]:
+    """Return (edits sorted by file/line, targets analyzed, files served from cache).
+
+    ``jobs`` follows add_jobs_argument: 0 means one per CPU.
+    """
+    paths = sorted(LIB.rglob("*.dart"))
+    with SourceIndex() as index:
+        hashes = {e.path: e.sha1 for e in index.entries(paths)}
+
+    db = _open_cache()
+    cached: dict[str, list[Edit]] = {}
+    if use_cache:
+        for path, sha1 in hashes.items():
+            row = db.execute(
+                "SELECT edits FROM unused_imports WHERE path = ? AND sha1 = ?",
+                (path, sha1),
+            ).fetchone()
+            if row:
+                cached[path] = [(path, ln, ip) for ln, ip in json.loads(row[0])]
+
+    shards = shard_targets({ROOT / p for p in hashes if p not in cached})
+    fresh: dict[str, list[Edit]] = defaultdict(list)
+    with ThreadPoolExecutor(max_workers=resolve_jobs(jobs)) as pool:
+        for shard, edits in zip(shards, pool.map(run_shard, shards)):
+            covered = {p.relative_to(ROOT).as_posix() for p in _covered(shard)}
+            for edit in edits:
+                fresh[edit[0]].append(edit)
+            # Every file of the target is cached, those without diagnostics as
+            # an empty list; cached results inside it are replaced.
+            for key in covered:
+                cached.pop(key, None)
+                if key in hashes:
+                    db.execute(
+                        "INSERT OR REPLACE INTO unused_imports VALUES (?, ?, ?)",
+                        (key, hashes[key], json.dumps([[ln, ip] for _, ln, ip in fresh[key]])),
+                    )
+    db.commit()
+    db.close()
+
+    merged = [e for edits in (*cached.values(), *fresh.values()) for e in edits]
+    merged.sort()
+    return merged, len(shards), len(cached)
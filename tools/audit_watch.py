@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+"""Keep the FAQ and parity audits warm and answer them in milliseconds.
+
+faq_gap_check.py, list_missing_faq.py and compare_parity_registry.py each
+start cold. This watcher loads their inputs once and keeps them in memory:
+
+    ids        calculator ids per file under lib/domain/calculators
+    faq        `faq` blocks and `faq_aliases` of assets/lang/ru.json
+    adapters   ids in test/helpers/canonical_adapter_registry.dart
+    fixtures   calculator_id per test/parity_fixtures/*.parity.json
+
+On a file event only the affected file is re-read (inotify via ctypes on
+Linux, stat polling elsewhere or with --poll). Every change that moves an
+audit prints a diff (`+` new finding, `-` resolved). A query on the Unix
+socket gets the current findings as one JSON line.
+
+    python tools/audit_watch.py                     # watch, print diffs, serve
+    python tools/audit_watch.py --poll 0.5          # stat polling instead of inotify
+    python tools/audit_watch.py --query faq_gap_check
+    python tools/audit_watch.py --query all --json
+
+Audits: faq_gap_check (definitions/ and the registry), list_missing_faq (all
+of lib/domain/calculators), compare_parity_registry, all, status. An id
+counts as covered when the block it resolves to through faq_aliases exists.
+"""
+from __future__ import annotations
+
+import argparse
+import ctypes
+import ctypes.util
+import json
+import os
+import selectors
+import signal
+import socket
+import struct
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterator
+
+from faq_aliases import ALIASES_KEY, resolve
+from profiling import run_main
+from source_index import CACHE_DIR, ID_RE, ROOT, RU_JSON, SourceIndex, rel
+from xref_graph import ADAPTER_ENTRY_RE, ADAPTER_REGISTRY, CALCULATORS, FIXTURES, adapter_id
+
+DEFINITIONS = CALCULATORS / "definitions"
+REGISTRY = CALCULATORS / "calculator_registry.dart"
+SOCKET_PATH = CACHE_DIR / "audit_watch.sock"
+# Editors write a file in several steps; apply changes once events settle.
+DEBOUNCE = 0.05
+AUDITS = ("faq_gap_check", "list_missing_faq", "compare_parity_registry")
+
+
+def relevant(path: Path) -> bool:
+    if path in (RU_JSON, ADAPTER_REGISTRY):
+        return True
+    if path.parent == FIXTURES:
+        return path.name.endswith(".parity.json")
+    return path.suffix == ".dart" and path.is_relative_to(CALCULATORS)
+
+
+def _json_object(text: str, what: str) -> dict[str, Any]:
+    data = json.loads(text)
+    if not isinstance(data, dict):
+        raise ValueError(f"{what} is not a JSON object")
+    return data
+
+
+class AuditState:
+    def __init__(self) -> None:
+        self.ids: dict[str, tuple[str, ...]] = {}  # rel path -> calculator ids
+        self.faq_blocks: set[str] = set()
+        self.aliases: dict[str, str] = {}
+        self.adapters: set[str] = set()
+        self.fixtures: dict[str, str] = {}  # rel path -> calculator_id
+        self.errors: dict[str, str] = {}  # rel path -> last parse error
+
+    def load(self) -> None:
+        with SourceIndex() as index:
+            self.ids = {e.path: e.ids for e in index.scan(CALCULATORS, recursive=True) if e.ids}
+        for path in [RU_JSON, ADAPTER_REGISTRY, *sorted(FIXTURES.glob("*.parity.json"))]:
+            self.update(path)
+
+    def _load_faq(self) -> None:
+        # Plain json: LocalizationStore keeps layout this does not need, at 10x the cost.
+        data = _json_object(RU_JSON.read_text(encoding="utf-8"), "ru.json")
+        faq = data.get("faq", {})
+        aliases = data.get(ALIASES_KEY, {})
+        if not isinstance(aliases, dict):
+            raise ValueError(f"{ALIASES_KEY} is not an object")
+        self.faq_blocks = set(faq) if isinstance(faq, dict) else set()
+        self.aliases = {a: t for a, t in aliases.items() if isinstance(t, str)}
+
+    def _load_adapters(self) -> None:
+        text = ADAPTER_REGISTRY.read_text(encoding="utf-8")
+        self.adapters = {adapter for adapter, _ in ADAPTER_ENTRY_RE.findall(text)}
+
+    def _load_fixture(self, path: Path) -> None:
+        data = _json_object(path.read_text(encoding="utf-8"), "fixture")
+        self.fixtures[rel(path)] = data.get("calculator_id", path.name.removesuffix(".parity.json"))
+
+    def update(self, path: Path) -> None:
+        """Re-read one changed, created or deleted input."""
+        key = rel(path)
+        self.errors.pop(key, None)
+        try:
+            if path == RU_JSON:
+                self._load_faq()
+            elif path == ADAPTER_REGISTRY:
+                self._load_adapters()
+            elif not path.is_file():
+                self.ids.pop(key, None)
+                self.fixtures.pop(key, None)
+            elif path.parent == FIXTURES:
+                self._load_fixture(path)
+            else:
+                ids = tuple(ID_RE.findall(path.read_text(encoding="utf-8")))
+                if ids:
+                    self.ids[key] = ids
+                else:
+                    self.ids.pop(key, None)
+        except (OSError, UnicodeDecodeError, ValueError) as exc:
+            # Half-written file: keep the previous facts until the next save.
+            self.errors[key] = str(exc)
+
+    def rescan(self, directory: Path) -> list[Path]:
+        """Inputs under a directory that appeared or disappeared as a whole."""
+        prefix = rel(directory) + "/"
+        known = [ROOT / p for p in [*self.ids, *self.fixtures] if p.startswith(prefix)]
+        found = [p for p in directory.rglob("*") if relevant(p)] if directory.is_dir() else []
+        return sorted(set(known) | set(found))
+
+    def _has_faq(self, calc_id: str) -> bool:
+        try:
+            return resolve(self.aliases, calc_id) in self.faq_blocks
+        except ValueError:  # alias cycle
+            return False
+
+    def audits(self) -> dict[str, dict[str, list[str]]]:
+        gap_prefixes = (rel(DEFINITIONS) + "/", rel(REGISTRY))
+        gap_ids = {i for path, ids in self.ids.items() if path.startswith(gap_prefixes) for i in ids}
+        all_ids = {i for ids in self.ids.values() for i in ids}
+        fixture_adapters = {adapter_id(calc_id) for calc_id in self.fixtures.values()}
+        return {
+            "faq_gap_check": {"missing FAQ": sorted(i for i in gap_ids if not self._has_faq(i))},
+            "list_missing_faq": {"missing FAQ": sorted(i for i in all_ids if not self._has_faq(i))},
+            "compare_parity_registry": {
+                "fixtures without adapter": sorted(
+                    p for p, calc_id in self.fixtures.items() if adapter_id(calc_id) not in self.adapters
+                ),
+                "adapters without fixture": sorted(self.adapters - fixture_adapters),
+            },
+        }
+
+    def counts(self) -> dict[str, int]:
+        return {
+            "definition files": len(self.ids),
+            "calculator ids": len({i for ids in self.ids.values() for i in ids}),
+            "faq blocks": len(self.faq_blocks),
+            "faq aliases": len(self.aliases),
+            "adapters": len(self.adapters),
+            "fixtures": len(self.fixtures),
+        }
+
+
+def diff(old: dict[str, dict[str, list[str]]], new: dict[str, dict[str, list[str]]]) -> Iterator[str]:
+    for audit, sections in new.items():
+        for section, items in sections.items():
+            before = set(old.get(audit, {}).get(section, []))
+            for item in sorted(before - set(items)):
+                yield f"  - {audit}: {section}: {item}"
+            for item in sorted(set(items) - before):
+                yield f"  + {audit}: {section}: {item}"
+
+
+# -- file watching -----------------------------------------------------------
+
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_IGNORED = 0x8000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT = struct.Struct("iIII")
+
+
+def watched_dirs() -> list[Path]:
+    dirs = [CALCULATORS, *(p for p in CALCULATORS.rglob("*") if p.is_dir())]
+    return dirs + [FIXTURES, RU_JSON.parent, ADAPTER_REGISTRY.parent]
+
+
+class InotifyWatcher:
+    """Directory watches through libc; read() returns changed input paths."""
+
+    name = "inotify"
+
+    def __init__(self) -> None:
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs: dict[int, Path] = {}
+        for directory in watched_dirs():
+            self.add(directory)
+
+    def add(self, directory: Path) -> None:
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd >= 0:
+            self.dirs[wd] = directory
+
+    def fileno(self) -> int:
+        return self.fd
+
+    def read(self, state: AuditState) -> set[Path]:
+        changed: set[Path] = set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        pos = 0
+        while pos < len(data):
+            wd, mask, _, length = EVENT.unpack_from(data, pos)
+            name = data[pos + EVENT.size : pos + EVENT.size + length].rstrip(b"\0")
+            pos += EVENT.size + length
+            if mask & IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            if wd not in self.dirs:
+                continue
+            path = self.dirs[wd] / os.fsdecode(name)
+            if mask & IN_ISDIR:
+                if path.is_relative_to(CALCULATORS):
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        for directory in [path, *(p for p in path.rglob("*") if p.is_dir())]:
+                            self.add(directory)
+                    changed.update(state.rescan(path))
+            elif relevant(path):
+                changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Stat every input each interval; for systems without inotify."""
+
+    name = "polling"
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.snapshot = self._stat()
+
+    def _stat(self) -> dict[Path, tuple[int, int]]:
+        found = {}
+        for directory in watched_dirs():
+            for entry in os.scandir(directory):
+                path = Path(entry.path)
+                if entry.is_file() and relevant(path):
+                    st = entry.stat()
+                    found[path] = (st.st_mtime_ns, st.st_size)
+        return found
+
+    def fileno(self) -> None:
+        return None
+
+    def read(self, state: AuditState) -> set[Path]:
+        current = self._stat()
+        changed = {p for p in current.keys() | self.snapshot.keys() if current.get(p) != self.snapshot.get(p)}
+        self.snapshot = current
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+def make_watcher(poll: float | None) -> InotifyWatcher | PollingWatcher:
+    if poll is None and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher()
+        except (OSError, AttributeError) as exc:
+            print(f"inotify unavailable ({exc}); polling every 0.5 s", file=sys.stderr)
+    return PollingWatcher(poll or 0.5)
+
+
+# -- daemon ------------------------------------------------------------------
+
+
+class Daemon:
+    def __init__(self, watcher: InotifyWatcher | PollingWatcher, socket_path: Path | None) -> None:
+        self.state = AuditState()
+        self.watcher = watcher
+        self.socket_path = socket_path
+        self.pending: set[Path] = set()
+        self.last_event = 0.0
+        self.updated_at = time.time()
+        self.update_ms = 0.0
+
+        start = time.perf_counter()
+        self.state.load()
+        self.update_ms = (time.perf_counter() - start) * 1000
+        self.findings = self.state.audits()
+
+    def apply(self) -> None:
+        if not self.pending:
+            return
+        start = time.perf_counter()
+        paths, self.pending = sorted(self.pending), set()
+        for path in paths:
+            self.state.update(path)
+        findings = self.state.audits()
+        self.update_ms = (time.perf_counter() - start) * 1000
+        self.updated_at = time.time()
+        lines = list(diff(self.findings, findings))
+        self.findings = findings
+        stamp = datetime.now().strftime("%H:%M:%S")
+        names = ", ".join(rel(p) for p in paths[:3]) + (f" (+{len(paths) - 3})" if len(paths) > 3 else "")
+        print(f"[{stamp}] {names}: {'no coverage change' if not lines else f'{len(lines)} change(s)'} ({self.update_ms:.1f} ms)")
+        for line in lines:
+            print(line)
+        for path, error in sorted(self.state.errors.items()):
+            print(f"  ! {path}: {error}")
+        sys.stdout.flush()
+
+    def answer(self, request: str) -> dict[str, Any]:
+        self.apply()
+        if request == "status":
+            return {
+                "watcher": self.watcher.name,
+                "counts": self.state.counts(),
+                "updated_at": self.updated_at,
+                "update_ms": round(self.update_ms, 3),
+                "errors": self.state.errors,
+            }
+        if request == "all":
+            return {"findings": self.findings, "counts": self.state.counts()}
+        if request in self.findings:
+            return {"findings": {request: self.findings[request]}, "counts": self.state.counts()}
+        return {"error": f"unknown audit {request!r}; expected one of {', '.join(AUDITS + ('all', 'status'))}"}
+
+    def _serve(self, server: socket.socket) -> None:
+        conn, _ = server.accept()
+        with conn:
+            conn.settimeout(1.0)
+            try:
+                request = conn.makefile("r", encoding="utf-8").readline().strip()
+                conn.sendall((json.dumps(self.answer(request), ensure_ascii=False) + "\n").encode("utf-8"))
+            except OSError:
+                pass
+
+    def run(self) -> None:
+        counts = self.state.counts()
+        print(
+            f"Watching ({self.watcher.name}): {counts['calculator ids']} ids, {counts['faq blocks']} FAQ blocks, {counts['faq aliases']} aliases, "
+            f"{counts['adapters']} adapters, {counts['fixtures']} fixtures; loaded in {self.update_ms:.0f} ms"
+        )
+        for audit, sections in self.findings.items():
+            print(f"  {audit}: " + ", ".join(f"{section} {len(items)}" for section, items in sections.items()))
+        for path, error in sorted(self.state.errors.items()):
+            print(f"  ! {path}: {error}")
+        sys.stdout.flush()
+
+        # A plain kill should still remove the socket.
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        selector = selectors.DefaultSelector()
+        server = None
+        if self.socket_path is not None:
+            server = listen(self.socket_path)
+            selector.register(server, selectors.EVENT_READ, "client")
+            print(f"Serving on {self.socket_path}")
+        if self.watcher.fileno() is not None:
+            selector.register(self.watcher.fileno(), selectors.EVENT_READ, "watch")
+        try:
+            while True:
+                if self.pending:
+                    timeout = max(self.last_event + DEBOUNCE - time.monotonic(), 0.0)
+                elif self.watcher.fileno() is None:
+                    timeout = self.watcher.interval
+                else:
+                    timeout = None
+                ready = selector.select(timeout)
+                for key, _ in ready:
+                    if key.data == "client":
+                        self._serve(server)
+                    else:
+                        self._collect()
+                if self.watcher.fileno() is None and not ready:
+                    self._collect()
+                if self.pending and time.monotonic() - self.last_event >= DEBOUNCE:
+                    self.apply()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            selector.close()
+            self.watcher.close()
+            if server is not None:
+                server.close()
+                self.socket_path.unlink(missing_ok=True)
+
+    def _collect(self) -> None:
+        changed = self.watcher.read(self.state)
+        if changed:
+            self.pending |= changed
+            self.last_event = time.monotonic()
+
+
+def listen(path: Path) -> socket.socket:
+    if path.exists():
+        try:
+            query(path, "status")
+        except OSError:
+            path.unlink()  # left behind by a watcher that died
+        else:
+            raise SystemExit(f"A watcher is already serving on {path}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(path))
+    server.listen()
+    return server
+
+
+def query(path: Path, request: str) -> dict[str, Any]:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(5.0)
+        client.connect(str(path))
+        client.sendall(request.encode("utf-8") + b"\n")
+        return json.loads(client.makefile("r", encoding="utf-8").read())
+
+
+def print_answer(answer: dict[str, Any]) -> None:
+    if "error" in answer:
+        print(answer["error"], file=sys.stderr)
+        return
+    if "findings" not in answer:
+        for key, value in answer.items():
+            print(f"{key}: {value}")
+        return
+    print("  ".join(f"{name}: {count}" for name, count in answer["counts"].items()))
+    for audit, sections in answer["findings"].items():
+        for section, items in sections.items():
+            print(f"\n{audit}: {section}: {len(items)}")
+            for item in items:
+                print(f"  {item}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Watch FAQ and parity inputs and keep their audits warm.")
+    parser.add_argument("--query", metavar="AUDIT", help=f"ask a running watcher: {', '.join(AUDITS)}, all or status")
+    parser.add_argument("--json", action="store_true", help="with --query: print the raw JSON answer")
+    parser.add_argument("--socket", type=Path, default=SOCKET_PATH, help=f"Unix socket (default {rel(SOCKET_PATH)})")
+    parser.add_argument("--no-socket", action="store_true", help="only print coverage diffs")
+    parser.add_argument("--poll", type=float, metavar="SECONDS", help="poll file stats instead of using inotify")
+    parser.add_argument("--strict", action="store_true", help="with --query: exit 1 when there are findings")
+    args = parser.parse_args()
+
+    if args.query:
+        try:
+            answer = query(args.socket, args.query)
+        except OSError as exc:
+            print(f"No watcher on {args.socket} ({exc}); start one with python tools/audit_watch.py", file=sys.stderr)
+            return 2
+        if args.json:
+            print(json.dumps(answer, ensure_ascii=False, indent=2))
+        else:
+            print_answer(answer)
+        if "error" in answer:
+            return 2
+        findings = answer.get("findings", {})
+        return 1 if args.strict and any(items for sections in findings.values() for items in sections.values()) else 0
+
+    Daemon(make_watcher(args.poll), None if args.no_socket else args.socket).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_main(main))
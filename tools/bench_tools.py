@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""Benchmark the tools/ core functions on a synthetic Flutter tree.
+
+A deterministic generator (seeded, no randomness between runs) writes a
+tree shaped like this repo at a given scale:
+
+    lib/presentation/views/calculator/   60 x scale screens, pre-migration:
+                                         CalculatorScaffold without faqPrefix,
+                                         CalculatorTextField rows, a
+                                         `final _calculator = Calculate...();`
+                                         field and a `_buildFaqCard()` method
+    lib/presentation/utils/calculator_screen_registry.dart
+    assets/lang/ru.json                  titles, FAQ, 7000 x scale filler keys
+    test/parity_fixtures/                70 x scale fixtures
+    test/.../calculator_scaffold_test.dart  MaterialApp(home: ...) call sites
+    analyze.log                          `flutter analyze` output with unused imports
+
+and times each core function on it (best of --repeat runs, inputs already
+read so only the function is measured). Every run starts with an empty
+dart_lexer cache kept in the temp directory, so repeats tokenize like a
+first run and tools/.cache/lexer_cache.sqlite is left alone:
+
+    parse_registry   add_faq_prefix.parse_registry
+    add_faq_prefix   remove_manual_faq + add_faq_prefix over every screen
+    transform        migrate_calculator_screens.transform_counts over every screen
+    rewrite          rewrite_scaffold_test.rewrite on the test file
+    collect_edits    remove_unused_imports.collect_edits on the log
+    merge            LocalizationStore load + set of new FAQ blocks + render
+
+For each function the growth exponent between scales is reported
+(1.0 = linear); above SUPERLINEAR it is flagged.
+
+    python tools/bench_tools.py                          # 1x 10x 100x -> tools/.cache/bench_baseline.json
+    python tools/bench_tools.py --scales 1 10 --compare  # compare with the saved baseline
+    python tools/bench_tools.py --keep /tmp/synthetic --scales 10
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import add_faq_prefix
+import dart_lexer
+import migrate_calculator_screens
+import remove_unused_imports
+import rewrite_scaffold_test
+from l10n_store import LocalizationStore
+from profiling import run_main
+from source_index import CACHE_DIR
+
+BASELINE_PATH = CACHE_DIR / "bench_baseline.json"
+BENCH_VERSION = 2
+SUPERLINEAR = 1.25
+# Today's tree, the 1x point.
+BASE_SCREENS = 60
+BASE_FIXTURES = 70
+BASE_FILLER_KEYS = 7000
+BASE_TEST_CALLS = 40
+BASE_LOG_LINES = 2000
+
+SCREEN = """\
+import 'package:flutter/material.dart';
+import '../../../domain/usecases/calculate_{id}.dart';
+import '../../widgets/calculator/calculator_widgets.dart';
+
+class {cls}CalculatorScreen extends StatefulWidget {{
+  const {cls}CalculatorScreen({{super.key}});
+
+  @override
+  State<{cls}CalculatorScreen> createState() => _{cls}CalculatorScreenState();
+}}
+
+class _{cls}CalculatorScreenState extends State<{cls}CalculatorScreen> {{
+  final _calculator = Calculate{cls}();
+{values}
+  Map<String, double> _buildCalculationInputs() => {{
+{inputs}
+  }};
+
+  void _calculate() {{
+    final result = _calculator(_buildCalculationInputs(), []);
+    setState(() => _result = result);
+  }}
+
+  @override
+  Widget build(BuildContext context) {{
+    return CalculatorScaffold(
+      title: 'calculator.{id}.title',
+      accentColor: CalculatorColors.interior,
+      children: [
+{fields}
+        const SizedBox(height: 16),
+        _buildFaqCard(),
+      ],
+    );
+  }}
+
+  Widget _buildFaqCard() {{
+    return Card(
+      child: Column(
+        children: [
+{faq}
+        ],
+      ),
+    );
+  }}
+}}
+"""
+
+FIELD = """\
+        CalculatorTextField(
+          label: 'input.{id}.field{k}',
+          value: _value{k},
+          onChanged: (v) {{
+            setState(() => _value{k} = v);
+            _calculate();
+          }},
+          suffix: 'м',
+        ),"""
+
+TEST_CASE = """\
+  testWidgets('scaffold {i}', (tester) async {{
+    await tester.pumpWidget(MaterialApp(home: CalculatorScaffold(
+      title: 'Test {i}',
+      accentColor: Colors.blue,
+      children: [Text('row {i}'), SizedBox(height: {i}), Row(children: [Text('a'), Text('b')])],
+    )));
+    expect(find.text('Test {i}'), findsOneWidget);
+  }});
+"""
+
+WORDS = "стена пол потолок кирпич плитка раствор смесь площадь толщина расход упаковка слой монтаж".split()
+
+
+def _class_name(calc_id: str) -> str:
+    return "".join(part.title() for part in calc_id.split("_"))
+
+
+def _sentence(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+
+def generate(root: Path, scale: int, seed: int = 0) -> dict[str, Any]:
+    """Write the synthetic tree under ``root``; returns its paths and sizes."""
+    rng = random.Random(seed)
+    screens_dir = root / "lib/presentation/views/calculator"
+    screens_dir.mkdir(parents=True, exist_ok=True)
+    ids = [f"calc_{i:05d}" for i in range(BASE_SCREENS * scale)]
+    registry = ["final calculatorScreenRegistry = <String, CalculatorScreenBuilder>{"]
+    screens = []
+    for calc_id in ids:
+        cls = _class_name(calc_id)
+        fields = range(rng.randint(3, 12))
+        text = SCREEN.format(
+            id=calc_id,
+            cls=cls,
+            values="\n".join(f"  double _value{k} = {rng.randint(1, 100)};" for k in fields),
+            inputs="\n".join(f"    'field{k}': _value{k}," for k in fields),
+            fields="\n".join(FIELD.format(id=calc_id, k=k) for k in fields),
+            faq="\n".join(f"          Text(_loc.translate('faq.{calc_id}.q{q}'))," for q in range(1, 4)),
+        )
+        path = screens_dir / f"{calc_id}_calculator_screen.dart"
+        path.write_text(text, encoding="utf-8")
+        screens.append((path, calc_id))
+        registry.append(f"    '{calc_id}': (_, _) => const {cls}CalculatorScreen(),")
+    registry.append("};")
+    registry_path = root / "lib/presentation/utils/calculator_screen_registry.dart"
+    registry_path.parent.mkdir(parents=True, exist_ok=True)
+    registry_path.write_text("\n".join(registry) + "\n", encoding="utf-8")
+
+    # ru.json: existing FAQ for 90% of the calculators, the rest to merge.
+    have_faq = ids[: len(ids) * 9 // 10]
+    faq = {
+        calc_id: {f"{k}{q}": _sentence(rng, 8 if k == "q" else 24) for q in range(1, 4) for k in ("q", "a")}
+        for calc_id in ids
+    }
+    lang = {
+        "calculator": {calc_id: {"title": _sentence(rng, 2), "description": _sentence(rng, 10)} for calc_id in ids},
+        "faq": {calc_id: faq[calc_id] for calc_id in have_faq},
+        "common": {f"key_{i:06d}": _sentence(rng, 6) for i in range(BASE_FILLER_KEYS * scale)},
+    }
+    ru_json = root / "assets/lang/ru.json"
+    ru_json.parent.mkdir(parents=True, exist_ok=True)
+    ru_json.write_text(json.dumps(lang, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    missing = {calc_id: faq[calc_id] for calc_id in ids[len(have_faq) :]}
+
+    fixtures_dir = root / "test/parity_fixtures"
+    fixtures_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(BASE_FIXTURES * scale):
+        doc = {
+            "calculator_id": f"calc-{i:05d}",
+            "formula_version": f"calc-{i:05d}-canonical-v1",
+            "generated_at": "2026-01-01T00:00:00.000Z",
+            "cases": [{
+                "id": "defaults",
+                "inputs": {f"field{k}": rng.randint(1, 100) for k in range(6)},
+                "expected_totals": {f"total{k}": round(rng.uniform(0, 500), 4) for k in range(20)},
+                "expected_materials_count": 4,
+                "expected_material_names": [rng.choice(WORDS) for _ in range(4)],
+            }],
+        }
+        (fixtures_dir / f"calc-{i:05d}.parity.json").write_text(
+            json.dumps(doc, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+
+    test_path = root / "test/presentation/widgets/calculator/calculator_scaffold_test.dart"
+    test_path.parent.mkdir(parents=True, exist_ok=True)
+    test_path.write_text(
+        "void main() {\n" + "".join(TEST_CASE.format(i=i) for i in range(BASE_TEST_CALLS * scale)) + "}\n",
+        encoding="utf-8",
+    )
+
+    log_lines = []
+    for i in range(BASE_LOG_LINES * scale):
+        path, _ = screens[i % len(screens)]
+        where = path.relative_to(root).as_posix()
+        if i % 10 == 0:
+            log_lines.append(f"   info - Unused import: 'package:flutter/services.dart' - {where}:{i % 7 + 1}:8 - unused_import")
+        else:
+            log_lines.append(f"   info - Prefer const constructors - {where}:{i % 90 + 10}:12 - prefer_const_constructors")
+    log_path = root / "analyze.log"
+    log_path.write_text("\n".join(log_lines) + "\n", encoding="utf-8")
+
+    return {
+        "screens": screens,
+        "registry": registry_path,
+        "ru_json": ru_json,
+        "missing_faq": missing,
+        "test": test_path,
+        "log": log_path,
+        "bytes": sum(p.stat().st_size for p in root.rglob("*") if p.is_file()),
+    }
+
+
+@contextmanager
+def patched(module: Any, **attrs: Any) -> Iterator[None]:
+    """Point a tool's module-level paths at the synthetic tree."""
+    saved = {name: getattr(module, name) for name in attrs}
+    for name, value in attrs.items():
+        setattr(module, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(module, name, value)
+
+
+def cold_lexer_cache() -> None:
+    """Forget every cached token stream, in memory and on disk."""
+    dart_lexer._memory.clear()
+    if dart_lexer._db is not None:
+        dart_lexer._db.close()
+        dart_lexer._db = None
+    dart_lexer.DB_PATH.unlink(missing_ok=True)
+
+
+def benchmarks(tree: dict[str, Any]) -> dict[str, tuple[Callable[[], Any], int]]:
+    """Name -> (call, items processed); inputs are read here, outside the timing."""
+    screens = [(path.read_text(encoding="utf-8"), calc_id) for path, calc_id in tree["screens"]]
+    ru_bytes = tree["ru_json"].read_bytes()
+    test_text = tree["test"].read_text(encoding="utf-8")
+
+    def parse_registry() -> Any:
+        with patched(add_faq_prefix, REGISTRY=tree["registry"]):
+            return add_faq_prefix.parse_registry()
+
+    def faq_prefix() -> Any:
+        return [add_faq_prefix.add_faq_prefix(add_faq_prefix.remove_manual_faq(text), calc_id) for text, calc_id in screens]
+
+    def transform() -> Any:
+        return [migrate_calculator_screens.transform_counts(text, calc_id) for text, calc_id in screens]
+
+    def rewrite() -> Any:
+        return rewrite_scaffold_test.rewrite(test_text)
+
+    def collect_edits() -> Any:
+        return remove_unused_imports.collect_edits(str(tree["log"]))
+
+    def merge() -> Any:
+        store = LocalizationStore(ru_bytes)
+        for calc_id, entry in tree["missing_faq"].items():
+            store.set(("faq", calc_id), entry)
+        store.commit()
+        return store.text
+
+    return {
+        "parse_registry": (parse_registry, len(screens)),
+        "add_faq_prefix": (faq_prefix, len(screens)),
+        "transform": (transform, len(screens)),
+        "rewrite": (rewrite, test_text.count("MaterialApp(")),
+        "collect_edits": (collect_edits, sum(1 for _ in tree["log"].open(encoding="utf-8"))),
+        "merge": (merge, len(tree["missing_faq"])),
+    }
+
+
+def check_outputs(results: dict[str, Any], tree: dict[str, Any]) -> list[str]:
+    """The generated tree must exercise every path, or the timings mean nothing."""
+    problems = []
+    if len(results["parse_registry"]) < len(tree["screens"]):
+        problems.append("parse_registry missed registry entries")
+    if not all(changed for _, changed, _ in results["add_faq_prefix"]):
+        problems.append("add_faq_prefix left screens unchanged")
+    if not all(counts.get("fields") for _, counts in results["transform"]):
+        problems.append("transform did not remove the use case fields")
+    if results["rewrite"][1] == 0:
+        problems.append("rewrite found no MaterialApp call sites")
+    if not results["collect_edits"]:
+        problems.append("collect_edits found no unused imports")
+    return problems
+
+
+def run(scales: list[int], repeat: int, keep: Path | None, seed: int) -> dict[str, Any]:
+    results: dict[str, dict[str, dict[str, float]]] = {}
+    for scale in scales:
+        with tempfile.TemporaryDirectory(prefix=f"bench_{scale}x_") as tmp:
+            root = (keep / f"{scale}x") if keep else Path(tmp)
+            start = time.perf_counter()
+            tree = generate(root, scale, seed)
+            print(f"{scale}x: {len(tree['screens'])} screens, {tree['bytes'] / 1e6:.1f} MB generated in {time.perf_counter() - start:.1f}s")
+            outputs = {}
+            with patched(dart_lexer, DB_PATH=Path(tmp) / "lexer_cache.sqlite", _db=None, _memory={}):
+                for name, (call, items) in benchmarks(tree).items():
+                    best = math.inf
+                    for _ in range(repeat):
+                        cold_lexer_cache()
+                        start = time.perf_counter()
+                        outputs[name] = call()
+                        best = min(best, time.perf_counter() - start)
+                    results.setdefault(name, {})[str(scale)] = {"seconds": round(best, 6), "items": items}
+                    print(f"  {name:<15} {best * 1000:>10.1f} ms  ({items} items, {best / max(items, 1) * 1e6:.1f} us/item)")
+                cold_lexer_cache()  # closes the temp database before the directory goes
+            for problem in check_outputs(outputs, tree):
+                print(f"  WARNING: {problem}")
+    return {
+        "version": BENCH_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": seed,
+        "scales": scales,
+        "results": results,
+        "exponents": exponents(results, scales),
+    }
+
+
+def exponents(results: dict[str, dict[str, dict[str, float]]], scales: list[int]) -> dict[str, list[float]]:
+    """Growth exponent of each function between consecutive scales (1.0 = linear)."""
+    found = {}
+    for name, by_scale in results.items():
+        found[name] = [
+            round(math.log(max(by_scale[str(b)]["seconds"], 1e-9) / max(by_scale[str(a)]["seconds"], 1e-9)) / math.log(b / a), 2)
+            for a, b in zip(scales, scales[1:])
+        ]
+    return found
+
+
+def compare(baseline: dict[str, Any], current: dict[str, Any], tolerance: float, floor: float) -> list[str]:
+    """Functions slower than the baseline by more than ``tolerance`` (and ``floor`` seconds)."""
+    regressions = []
+    for name, by_scale in current["results"].items():
+        for scale, result in by_scale.items():
+            old = baseline["results"].get(name, {}).get(scale)
+            if old is None:
+                continue
+            ratio = result["seconds"] / max(old["seconds"], 1e-9)
+            if ratio > 1 + tolerance and result["seconds"] - old["seconds"] > floor:
+                regressions.append(f"{name} at {scale}x: {old['seconds'] * 1000:.1f} -> {result['seconds'] * 1000:.1f} ms ({ratio:.2f}x)")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark tools/ on a synthetic tree at several scales.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100], help="tree sizes relative to today's (default 1 10 100)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per function, best is kept (default 3)")
+    parser.add_argument("--seed", type=int, default=0, help="generator seed (default 0)")
+    parser.add_argument("--keep", type=Path, metavar="DIR", help="write the synthetic trees to DIR/<scale>x and keep them")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="baseline JSON (default tools/.cache/bench_baseline.json)")
+    parser.add_argument("--compare", action="store_true", help="compare with the baseline instead of overwriting it; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before a regression is reported (default 0.25)")
+    parser.add_argument("--floor", type=float, default=0.005, help="ignore slowdowns smaller than this many seconds (default 0.005)")
+    args = parser.parse_args()
+
+    current = run(sorted(set(args.scales)), args.repeat, args.keep, args.seed)
+    superlinear = {name: exps for name, exps in current["exponents"].items() if any(e > SUPERLINEAR for e in exps)}
+    if len(current["scales"]) > 1:
+        print("\nGrowth exponents (1.0 = linear):")
+        for name, exps in current["exponents"].items():
+            flag = "  SUPERLINEAR" if name in superlinear else ""
+            print(f"  {name:<15} {', '.join(f'{e:.2f}' for e in exps)}{flag}")
+
+    if args.compare:
+        if not args.baseline.exists():
+            print(f"\n{args.baseline} not found; run without --compare first")
+            return 1
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(baseline, current, args.tolerance, args.floor)
+        for name, exps in superlinear.items():
+            old = baseline.get("exponents", {}).get(name, [])
+            if not any(e > SUPERLINEAR for e in old):
+                regressions.append(f"{name} became superlinear: {exps}")
+        print(f"\nRegressions vs {args.baseline}: {len(regressions)}")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1 if regressions else 0
+
+    args.baseline.parent.mkdir(parents=True, exist_ok=True)
+    args.baseline.write_text(json.dumps(current, indent=2) + "\n", encoding="utf-8")
+    print(f"\nBaseline written to {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_main(main))
@@ -0,0 +1,145 @@
+"""Run backtracking-prone patterns inside bounded windows, under a per-file time budget.
+
+Patterns such as raise_room_limits.PATTERN (`.*?` with re.DOTALL) can
+backtrack across the whole file when nothing matches. Here they only run
+inside windows found structurally first:
+
+    call_windows(text, "CalculatorTextField")  # each `CalculatorTextField(...)` call
+    brace_block_end(text, open_pos)            # end of a `{ ... }` block
+
+A FileBudget is checked between windows. When a file goes over budget the
+rest of it is skipped (and left unchanged by the caller). TimingReport
+collects per-file times, lists the files that went over budget and prints a
+histogram.
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from call_rewriter import compile_scanner, find_calls
+from dart_lexer import PUNCT, TokenStream, tokenize_cached
+
+# Upper bounds (ms) of the histogram buckets; the last bucket is open-ended.
+BUCKETS_MS = (1, 4, 16, 64, 256, 1000)
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+class FileBudget:
+    __slots__ = ("deadline",)
+
+    def __init__(self, seconds: float) -> None:
+        self.deadline = time.perf_counter() + seconds
+
+    def check(self) -> None:
+        if time.perf_counter() > self.deadline:
+            raise BudgetExceeded
+
+
+class TimingReport:
+    def __init__(self, budget_ms: float) -> None:
+        self.budget_ms = budget_ms
+        self.timings: list[tuple[str, float]] = []
+        self.over_budget: list[str] = []
+
+    @contextmanager
+    def file(self, name: str) -> Iterator[FileBudget]:
+        """Time one file; a BudgetExceeded raised inside is recorded, not propagated."""
+        start = time.perf_counter()
+        try:
+            yield FileBudget(self.budget_ms / 1000)
+        except BudgetExceeded:
+            self.over_budget.append(name)
+            print(f"OVER BUDGET ({self.budget_ms:.0f} ms), skipped: {name}")
+        finally:
+            self.timings.append((name, (time.perf_counter() - start) * 1000))
+
+    def histogram(self) -> list[tuple[str, int]]:
+        counts = [0] * (len(BUCKETS_MS) + 1)
+        for _, ms in self.timings:
+            counts[bisect_left(BUCKETS_MS, ms)] += 1
+        labels = [f"<{b} ms" for b in BUCKETS_MS] + [f">={BUCKETS_MS[-1]} ms"]
+        return list(zip(labels, counts))
+
+    def print(self) -> None:
+        if not self.timings:
+            return
+        print("\nTiming per file:")
+        width = max(c for _, c in self.histogram()) or 1
+        for label, count in self.histogram():
+            print(f"  {label:>10} {count:5d} {'#' * round(40 * count / width)}")
+        slowest = max(self.timings, key=lambda t: t[1])
+        print(f"  slowest: {slowest[0]} ({slowest[1]:.1f} ms)")
+        if self.over_budget:
+            print(f"  over budget: {len(self.over_budget)} file(s)")
+
+
+def add_budget_argument(parser: argparse.ArgumentParser, default_ms: float = 500) -> None:
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=default_ms,
+        help=f"per-file time budget; slower files are skipped (default {default_ms:g})",
+    )
+
+
+def call_windows(text: str, name: str) -> list[tuple[int, int]]:
+    """(start, end) spans of every `name(...)` call, outermost first, end exclusive."""
+    return [(s.start, s.close + 1) for s in find_calls(text, compile_scanner([name]))]
+
+
+def brace_block_end(text: str, open_pos: int, tokens: TokenStream | None = None) -> int | None:
+    """Offset just past the `}` matching the `{` at ``open_pos`` (strings/comments skipped).
+
+    None when the braces never balance, e.g. in a half-edited file.
+    """
+    if tokens is None:
+        tokens = tokenize_cached(text)
+    i = tokens.index_at(open_pos)
+    depth = 0
+    for j in range(i, len(tokens)):
+        if tokens.kinds[j] != PUNCT:
+            continue
+        c = text[tokens.starts[j]]
+        if c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return tokens.ends[j]
+    return None
+
+
+def sub_in_windows(
+    pattern: re.Pattern[str],
+    repl: str | Callable[[re.Match[str]], str],
+    text: str,
+    windows: list[tuple[int, int]],
+    budget: FileBudget | None = None,
+) -> tuple[str, int]:
+    """``pattern.subn`` applied separately inside each non-overlapping window."""
+    parts: list[str] = []
+    pos = 0
+    count = 0
+    for start, end in windows:
+        if start < pos:
+            continue  # nested in a window already handled
+        if budget:
+            budget.check()
+        new, n = pattern.subn(repl, text[start:end])
+        if n:
+            parts.append(text[pos:start])
+            parts.append(new)
+            pos = end
+            count += n
+    if not count:
+        return text, 0
+    parts.append(text[pos:])
+    return "".join(parts), count
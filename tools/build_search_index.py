@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""Build the calculator search index from definitions and ru.json.
+
+Every calculator definition (files with `id: '...'`, as in faq_gap_check.py)
+is joined with the Russian texts the user actually sees:
+
+    title         calculator.<id>.title         weight 8
+    tags          tag.* translations, raw tags  weight 4
+    subcategory   subcategory.*                 weight 2
+    description   calculator.<id>.description   weight 2
+    faq           faq.<id>.q* questions         weight 1
+
+Texts are lowercased, `ё` folded to `е` and split into words. The index
+(build/calculator_search_index.json, compact JSON) holds:
+
+    calculators   calculator ids; postings refer to them by position
+    terms         sorted words, so a prefix is a binary-searched range
+    postings      per term: [calc, score, calc, score, ...]
+    trigrams      trigram of "^term$" -> delta-encoded term positions, to
+                  find candidates for a misspelt word
+
+The app does not read this file yet: CalculatorRegistry still builds
+CalculatorSearchIndex at runtime, and ranking and typo tolerance live there
+only. Until a Dart loader lands the index stays in build/ (under assets/ it
+would ship unused) and its layout is not a contract; --check only reports
+whether it matches the sources.
+
+    python tools/build_search_index.py
+    python tools/build_search_index.py --check
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from faq_aliases import load_aliases, target_or_none
+from l10n_store import LocalizationStore
+from profiling import run_main
+from source_index import ROOT, RU_JSON, SourceIndex, rel, shown
+from xref_graph import CALCULATORS
+
+OUT_PATH = ROOT / "build/calculator_search_index.json"
+INDEX_VERSION = 1
+
+WEIGHTS = {"title": 8, "tags": 4, "subcategory": 2, "description": 2, "faq": 1}
+WORD_RE = re.compile(r"[0-9a-zа-я]+")
+KEY_ARG = r"(?:'([^']+)'|{fn}\('([^']+)'\))"
+TITLE_RE = re.compile(r"titleKey:\s*" + KEY_ARG.format(fn="calculatorTitleKey"))
+DESCRIPTION_RE = re.compile(r"descriptionKey:\s*" + KEY_ARG.format(fn="calculatorDescriptionKey"))
+SUBCATEGORY_RE = re.compile(r"subCategoryKey:\s*'([^']+)'")
+TAGS_RE = re.compile(r"tags:\s*\[([^\]]*)\]")
+STRING_RE = re.compile(r"'([^']*)'")
+FAQ_QUESTION_RE = re.compile(r"q\d+")
+
+
+class Definition(NamedTuple):
+    calc_id: str
+    path: str
+    title_key: str
+    description_key: str | None
+    subcategory_key: str | None
+    tags: list[str]
+
+
+def words(text: str) -> list[str]:
+    return [w for w in WORD_RE.findall(text.lower().replace("ё", "е")) if len(w) > 1]
+
+
+def _key(match: re.Match | None, template: str) -> str | None:
+    if match is None:
+        return None
+    return match.group(1) or template.format(match.group(2))
+
+
+def definitions() -> list[Definition]:
+    """Calculator definitions with a titleKey, one per id."""
+    found: dict[str, Definition] = {}
+    with SourceIndex() as index:
+        entries = [e for e in index.scan(CALCULATORS, recursive=True) if e.ids]
+    for e in entries:
+        text = (ROOT / e.path).read_text(encoding="utf-8")
+        starts = [(m.start(), m.group(1)) for m in re.finditer(r"id: '([^']+)'", text)]
+        # A definition's fields follow its id up to the next id.
+        for i, (pos, calc_id) in enumerate(starts):
+            block = text[pos : starts[i + 1][0] if i + 1 < len(starts) else len(text)]
+            title = _key(TITLE_RE.search(block), "calculator.{}.title")
+            if title is None:
+                continue
+            tags = TAGS_RE.search(block)
+            subcategory = SUBCATEGORY_RE.search(block)
+            found.setdefault(calc_id, Definition(
+                calc_id,
+                e.path,
+                title,
+                _key(DESCRIPTION_RE.search(block), "calculator.{}.description"),
+                subcategory.group(1) if subcategory else None,
+                STRING_RE.findall(tags.group(1)) if tags else [],
+            ))
+    return sorted(found.values())
+
+
+def texts(definition: Definition, store: LocalizationStore, aliases: dict[str, str]) -> dict[str, list[str]]:
+    """Field -> texts of one calculator, translated where ru.json has the key."""
+
+    def translate(key: str | None) -> list[str]:
+        value = store.get(tuple(key.split("."))) if key else None
+        return [value] if isinstance(value, str) else []
+
+    tags = []
+    for tag in definition.tags:
+        tags += translate(tag) if tag.startswith("tag.") else [tag.replace("_", " ")]
+    faq_block = ("faq", target_or_none(aliases, definition.calc_id) or definition.calc_id)
+    faq = [
+        store.get(faq_block + (key,))
+        for key in (store.keys(faq_block) if store.is_object(faq_block) else [])
+        if FAQ_QUESTION_RE.fullmatch(key)
+    ]
+    return {
+        "title": translate(definition.title_key),
+        "tags": tags,
+        "subcategory": translate(definition.subcategory_key),
+        "description": translate(definition.description_key),
+        "faq": [q for q in faq if isinstance(q, str)],
+    }
+
+
+def trigrams(term: str) -> set[str]:
+    padded = f"^{term}$"
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def build_index(defs: list[Definition], store: LocalizationStore) -> dict[str, Any]:
+    aliases = load_aliases(store)
+    calculators = [d.calc_id for d in defs]
+    scores: dict[str, Counter[int]] = defaultdict(Counter)
+    for i, definition in enumerate(defs):
+        for field, values in texts(definition, store, aliases).items():
+            # A word counts once per field, however often it repeats.
+            for word in {w for value in values for w in words(value)}:
+                scores[word][i] += WEIGHTS[field]
+    terms = sorted(scores)
+    grams: dict[str, list[int]] = defaultdict(list)
+    for t, term in enumerate(terms):
+        for gram in sorted(trigrams(term)):
+            grams[gram].append(t)
+    return {
+        "version": INDEX_VERSION,
+        "weights": WEIGHTS,
+        "calculators": calculators,
+        "terms": terms,
+        "postings": [[v for calc, score in sorted(scores[term].items()) for v in (calc, score)] for term in terms],
+        "trigrams": {
+            gram: [ids[0]] + [b - a for a, b in zip(ids, ids[1:])] for gram, ids in sorted(grams.items())
+        },
+    }
+
+
+def sources_sha1(defs: list[Definition]) -> str:
+    h = hashlib.sha1(f"v{INDEX_VERSION}".encode())
+    for path in sorted({d.path for d in defs}) + [rel(RU_JSON)]:
+        h.update(f"\n{path} ".encode() + hashlib.sha1((ROOT / path).read_bytes()).digest())
+    return h.hexdigest()
+
+
+def render(defs: list[Definition]) -> str:
+    index = build_index(defs, LocalizationStore.load(RU_JSON))
+    index["source_sha1"] = sources_sha1(defs)
+    return json.dumps(index, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build the calculator search index.")
+    parser.add_argument("--out", type=Path, default=OUT_PATH, help=f"index path (default {rel(OUT_PATH)})")
+    parser.add_argument("--check", action="store_true", help="exit 1 if the index is out of date, write nothing")
+    args = parser.parse_args()
+
+    defs = definitions()
+    text = render(defs)
+    current = args.out.read_text(encoding="utf-8") if args.out.exists() else None
+    if args.check:
+        fresh = current == text
+        print(f"{shown(args.out)} is {'up to date' if fresh else 'out of date; run tools/build_search_index.py'}")
+        return 0 if fresh else 1
+    index = json.loads(text)
+    postings = sum(len(p) // 2 for p in index["postings"])
+    print(f"Calculators: {len(defs)}, terms: {len(index['terms'])}, postings: {postings}, trigrams: {len(index['trigrams'])}")
+    if current == text:
+        print(f"{shown(args.out)} unchanged ({len(text.encode('utf-8'))} bytes)")
+        return 0
+    # Build output: written directly, not through the WriteBack journal.
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(text, encoding="utf-8")
+    print(f"Wrote {shown(args.out)} ({len(text.encode('utf-8'))} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_main(main))
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""Rewrite Dart call sites (`Name(...)`) with pluggable rules in one linear pass.
+
+A single compiled regex jumps from one token of interest to the next:
+string literals and comments (skipped whole), parentheses, and the callee
+names the rules care about. Parentheses are matched on one stack, so every
+candidate call is resolved to its closing paren without rescanning.
+
+A rule receives a CallSite and returns the replacement text for the whole
+call (including a leading `const `/`new `), or None to leave it alone.
+When an outer call is rewritten, calls nested inside it are left as they
+were in the original text.
+
+Known limitation: string interpolation containing a quote of the same kind
+(`'${m['k']}'`) is not understood; such files are rare in this tree.
+
+Usage:
+    python tools/call_rewriter.py material_app_to_test_app 'test/**/*_test.dart'
+    python tools/call_rewriter.py --dry-run material_app_to_test_app 'test/**/*_test.dart'
+"""
+from __future__ import annotations
+
+import argparse
+import re
+from functools import partial
+from pathlib import Path
+from typing import Callable, Mapping, NamedTuple, Sequence
+
+from parallel import add_jobs_argument, map_files
+from profiling import run_main
+from writeback import WriteBack
+
+ROOT = Path(__file__).resolve().parents[1]
+
+_SKIP = (
+    r"(?P<skip>"
+    r"//[^\n]*"
+    r"|/\*.*?\*/"
+    r"|r'''.*?'''|r\"\"\".*?\"\"\""
+    r"|'''(?:\\.|[^\\])*?'''|\"\"\"(?:\\.|[^\\])*?\"\"\""
+    r"|r'[^'\n]*'|r\"[^\"\n]*\""
+    r"|'(?:\\.|[^'\\\n])*'|\"(?:\\.|[^\"\\\n])*\""
+    r")"
+)
+_ARG_TOKEN_RE = re.compile(_SKIP + r"|(?P<open>[(\[{])|(?P<close>[)\]}])|(?P<comma>,)", re.DOTALL)
+_NAMED_ARG_RE = re.compile(r"\s*(\w+)\s*:(?!:)")
+_INDENT_RE = re.compile(r"[ \t]*")
+
+
+class CallSite(NamedTuple):
+    text: str  # whole file
+    start: int  # first char of the call, including a `const `/`new ` prefix
+    name: str
+    open: int  # index of "("
+    close: int  # index of the matching ")"
+
+    @property
+    def source(self) -> str:
+        return self.text[self.start : self.close + 1]
+
+    @property
+    def args(self) -> str:
+        return self.text[self.open + 1 : self.close]
+
+    @property
+    def indent(self) -> str:
+        """Leading whitespace of the line the call starts on."""
+        line_start = self.text.rfind("\n", 0, self.start) + 1
+        return _INDENT_RE.match(self.text, line_start).group()
+
+    def preceding_char(self) -> str:
+        """Last non-whitespace char before the call ("" at start of file)."""
+        j = self.start - 1
+        while j >= 0 and self.text[j] in " \t\r\n":
+            j -= 1
+        return self.text[j] if j >= 0 else ""
+
+
+Rule = Callable[[CallSite], str | None]
+
+
+def split_args(args: str) -> list[str]:
+    """Top-level arguments of a call's argument text (a trailing comma adds none)."""
+    parts: list[str] = []
+    depth = 0
+    start = 0
+    for m in _ARG_TOKEN_RE.finditer(args):
+        kind = m.lastgroup
+        if kind == "open":
+            depth += 1
+        elif kind == "close":
+            depth -= 1
+        elif kind == "comma" and depth == 0:
+            parts.append(args[start : m.start()])
+            start = m.end()
+    parts.append(args[start:])
+    return [part for part in parts if part.strip()]
+
+
+def compile_scanner(names: Sequence[str]) -> re.Pattern[str]:
+    callees = "|".join(sorted(map(re.escape, names), key=len, reverse=True))
+    return re.compile(
+        _SKIP
+        + rf"|(?P<call>(?:\b(?:const|new)\s+)?\b(?P<name>{callees})\s*\()"
+        + r"|(?P<open>\()|(?P<close>\))",
+        re.DOTALL,
+    )
+
+
+def find_calls(text: str, scanner: re.Pattern[str]) -> list[CallSite]:
+    """All candidate calls in ``text``, ordered by start offset."""
+    stack: list[tuple[int, str, int] | None] = []
+    sites: list[CallSite] = []
+    for m in scanner.finditer(text):
+        kind = m.lastgroup
+        if kind == "call":
+            stack.append((m.start(), m.group("name"), m.end() - 1))
+        elif kind == "open":
+            stack.append(None)
+        elif kind == "close":
+            if not stack:
+                continue
+            frame = stack.pop()
+            if frame is not None:
+                start, name, open_pos = frame
+                sites.append(CallSite(text, start, name, open_pos, m.start()))
+    sites.sort(key=lambda s: s.start)
+    return sites
+
+
+class CallRewriter:
+    def __init__(self, rules: Mapping[str, Rule]) -> None:
+        self.rules = dict(rules)
+        self.scanner = compile_scanner(list(self.rules))
+
+    def rewrite(self, text: str) -> tuple[str, int]:
+        """Return rewritten text + number of replacements."""
+        parts: list[str] = []
+        pos = 0
+        count = 0
+        for site in find_calls(text, self.scanner):
+            if site.start < pos:
+                continue  # nested inside a call we already replaced
+            replacement = self.rules[site.name](site)
+            if replacement is None:
+                continue
+            parts.append(text[pos : site.start])
+            parts.append(replacement)
+            pos = site.close + 1
+            count += 1
+        if not count:
+            return text, 0
+        parts.append(text[pos:])
+        return "".join(parts), count
+
+
+# --- Built-in rules ---------------------------------------------------------
+
+
+def material_app_to_test_app(site: CallSite) -> str | None:
+    """`(const )?MaterialApp(home: W(...))` passed directly to a call -> `createTestApp(child: W(...))`."""
+    if site.preceding_char() != "(":
+        return None
+    # createTestApp only takes the child: any other argument would be lost.
+    args = split_args(site.args)
+    named = [_NAMED_ARG_RE.match(arg) for arg in args]
+    if len(args) != 1 or named[0] is None or named[0].group(1) != "home":
+        return None
+    widget = args[0][named[0].end() :].strip()
+    indent = site.indent
+    return "createTestApp(\n" + indent + "  child: " + widget + ",\n" + indent + ")"
+
+
+RULE_SETS: dict[str, dict[str, Rule]] = {
+    "material_app_to_test_app": {"MaterialApp": material_app_to_test_app},
+}
+
+
+def _rewrite_file(rule_set: str, path: Path) -> tuple[str | None, int]:
+    """Worker: return (new text or None, replacements) without writing."""
+    text = path.read_text(encoding="utf-8")
+    new_text, n = CallRewriter(RULE_SETS[rule_set]).rewrite(text)
+    return (new_text if n else None), n
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rewrite Dart call sites with a rule set.")
+    parser.add_argument("rule_set", choices=sorted(RULE_SETS))
+    parser.add_argument("globs", nargs="+", help="glob(s) relative to the repo root")
+    parser.add_argument("--dry-run", action="store_true", help="report without writing")
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    paths = sorted({p for g in args.globs for p in ROOT.glob(g) if p.is_file()})
+    results = map_files(partial(_rewrite_file, args.rule_set), paths, args.jobs)
+    files = calls = 0
+    with WriteBack(dry_run=args.dry_run) as wb:
+        for path, (new_text, n) in zip(paths, results):
+            if new_text is None:
+                continue
+            wb.stage(path, new_text)
+            print(f"{path.relative_to(ROOT)}: {n} replacement(s)")
+            files += 1
+            calls += n
+    print(f"Done: {calls} call(s) in {files} file(s), {len(paths)} scanned")
+    if not args.dry_run:
+        print(wb.stats)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(run_main(main))
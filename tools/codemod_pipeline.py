@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Run several codemods over the screen files in a single pass.
+
+Each file is read once, streamed through the selected transforms in the
+given order (all `str -> str`) and written back only if the final text
+differs from what was on disk.
+
+Usage:
+    python tools/codemod_pipeline.py remove_manual_faq add_faq_prefix defocus
+    python tools/codemod_pipeline.py --dry-run migrate_engine fix_engine_calls
+    python tools/codemod_pipeline.py --jobs 0 defocus   # one worker per CPU
+
+Available steps: see STEPS below (`--list`).
+"""
+from __future__ import annotations
+
+import argparse
+from collections import Counter
+from functools import partial
+from pathlib import Path
+from typing import Callable, NamedTuple, Sequence
+
+import add_faq_prefix
+import defocus_textfield_setters
+import fix_calculator_engine_calls
+import migrate_calculator_screens
+from parallel import add_jobs_argument, map_files
+from profiling import run_main
+from writeback import WriteBack, WriteStats
+
+ROOT = Path(__file__).resolve().parents[1]
+VIEWS = ROOT / "lib" / "presentation" / "views"
+
+Transform = Callable[[str], str]
+# A step builds the transform for one file, or returns None when the step
+# does not apply to it (e.g. no calculator id is known for the screen).
+Step = Callable[[Path], Transform | None]
+
+
+def _faq_calc_id(path: Path) -> str | None:
+    """Calculator id for a screen add_faq_prefix.py would touch, else None."""
+    if path.parent not in (add_faq_prefix.CALC_DIR, *add_faq_prefix.OTHER_DIRS):
+        return None
+    if path.name.startswith("_") or path.name in add_faq_prefix.SKIP_FILES:
+        return None
+    return _registry().get(path.name)
+
+
+def _remove_manual_faq(path: Path) -> Transform | None:
+    if not _faq_calc_id(path):
+        return None
+    return add_faq_prefix.remove_manual_faq
+
+
+def _add_faq_prefix(path: Path) -> Transform | None:
+    calc_id = _faq_calc_id(path)
+    if not calc_id:
+        return None
+    return lambda text: add_faq_prefix.add_faq_prefix(text, calc_id)[0]
+
+
+def _fix_engine_calls(path: Path) -> Transform | None:
+    # Same scope as the script: views/calculator/*.dart, not subdirectories.
+    if path.parent != fix_calculator_engine_calls.root:
+        return None
+    return fix_calculator_engine_calls.fix_text
+
+
+def _migrate_engine(path: Path) -> Transform | None:
+    rel = path.relative_to(migrate_calculator_screens.ROOT).as_posix()
+    calc_id = migrate_calculator_screens.FILE_TO_ID.get(rel)
+    if not calc_id:
+        return None
+    return lambda text: migrate_calculator_screens.transform_text(text, calc_id)
+
+
+def _defocus(path: Path) -> Transform | None:
+    return lambda text: defocus_textfield_setters.transform_text(text)[0]
+
+
+STEPS: dict[str, Step] = {
+    "remove_manual_faq": _remove_manual_faq,
+    "add_faq_prefix": _add_faq_prefix,
+    "fix_engine_calls": _fix_engine_calls,
+    "migrate_engine": _migrate_engine,
+    "defocus": _defocus,
+}
+
+_registry_cache: dict[str, str] | None = None
+
+
+def _registry() -> dict[str, str]:
+    global _registry_cache
+    if _registry_cache is None:
+        _registry_cache = add_faq_prefix.parse_registry()
+    return _registry_cache
+
+
+class PipelineResult(NamedTuple):
+    changed: list[Path]
+    hits: Counter[str]  # step name -> files it changed
+    files_seen: int
+    stats: WriteStats
+
+
+def apply_steps(path: Path, text: str, steps: Sequence[str]) -> tuple[str, list[str]]:
+    """Run ``text`` through every applicable step; return new text + names of steps that hit."""
+    hit: list[str] = []
+    for name in steps:
+        transform = STEPS[name](path)
+        if transform is None:
+            continue
+        new_text = transform(text)
+        if new_text != text:
+            hit.append(name)
+            text = new_text
+    return text, hit
+
+
+def _rewrite_file(steps: Sequence[str], path: Path) -> tuple[str | None, list[str]]:
+    """Worker: return (new text or None, steps that hit) without writing."""
+    text = path.read_text(encoding="utf-8")
+    new_text, hit = apply_steps(path, text, steps)
+    return (new_text if new_text != text else None), hit
+
+
+def run_pipeline(
+    paths: Sequence[Path],
+    steps: Sequence[str],
+    dry_run: bool = False,
+    jobs: int = 1,
+) -> PipelineResult:
+    changed: list[Path] = []
+    hits: Counter[str] = Counter({name: 0 for name in steps})
+    results = map_files(partial(_rewrite_file, tuple(steps)), paths, jobs)
+    with WriteBack(dry_run=dry_run) as wb:
+        for path, (new_text, hit) in zip(paths, results):
+            hits.update(hit)
+            if new_text is not None:
+                wb.stage(path, new_text)
+                changed.append(path)
+    return PipelineResult(changed, hits, len(paths), wb.stats)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run chained codemods in one pass.")
+    parser.add_argument("steps", nargs="*", help="step names, applied in order")
+    parser.add_argument("--list", action="store_true", help="list available steps")
+    parser.add_argument("--dry-run", action="store_true", help="report without writing")
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    if args.list or not args.steps:
+        print("Available steps:", ", ".join(STEPS))
+        return 0
+    unknown = [s for s in args.steps if s not in STEPS]
+    if unknown:
+        parser.error(f"unknown step(s): {', '.join(unknown)}")
+
+    result = run_pipeline(
+        sorted(VIEWS.rglob("*.dart")), args.steps, dry_run=args.dry_run, jobs=args.jobs
+    )
+
+    for path in result.changed:
+        print(f"{'WOULD UPDATE' if args.dry_run else 'UPDATED'}: {path.relative_to(ROOT)}")
+    print(f"\nFiles: {result.files_seen} scanned, {len(result.changed)} changed")
+    for name in args.steps:
+        print(f"  {name}: changed {result.hits[name]} file(s)")
+    if not args.dry_run:
+        print(result.stats)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(run_main(main))
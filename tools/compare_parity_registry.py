@@ -1,15 +1,22 @@
 import json
-import re
-from pathlib import Path
 
-ROOT = Path(__file__).resolve().parents[1]
-reg = (ROOT / "test/helpers/canonical_adapter_registry.dart").read_text(encoding="utf-8")
-adapters = set(re.findall(r"'([^']+)':", reg))
-fixtures = set()
-for p in (ROOT / "test/parity_fixtures").glob("*.parity.json"):
-    d = json.loads(p.read_text(encoding="utf-8"))
-    fixtures.add(d.get("calculator_id", p.stem.replace(".parity", "")))
+from parity_bundle import FIXTURES, fixture_paths, open_current
+from source_index import rel
+from xref_graph import ADAPTER_ENTRY_RE, ADAPTER_REGISTRY, adapter_id
+
+adapters = sorted({a for a, _ in ADAPTER_ENTRY_RE.findall(ADAPTER_REGISTRY.read_text(encoding="utf-8"))})
+# calculator_id per fixture file; the JSON files only when the bundle is stale.
+bundle = open_current()
+if bundle is not None:
+    fixture_ids = {rel(FIXTURES / name): calc_id for name, calc_id, _ in bundle.files()}
+else:
+    fixture_ids = {
+        rel(p): json.loads(p.read_text(encoding="utf-8")).get("calculator_id", p.name.removesuffix(".parity.json"))
+        for p in fixture_paths()
+    }
+fixtures = sorted(fixture_ids)
+covered = {adapter_id(calc_id) for calc_id in fixture_ids.values()}
 print("adapters", len(adapters))
 print("fixtures", len(fixtures))
-print("fixtures without adapter:", sorted(fixtures - adapters))
-print("adapters without fixture:", sorted(adapters - fixtures))
+print("fixtures without adapter:", [f for f in fixtures if adapter_id(fixture_ids[f]) not in adapters])
+print("adapters without fixture:", [a for a in adapters if a not in covered])
@@ -0,0 +1,274 @@
+"""Small Dart tokenizer so regex codemods stop matching inside strings and comments.
+
+The token stream is array-backed rather than one object per token:
+
+    starts, ends -- array('I') of offsets into the text
+    kinds        -- bytearray of IDENT / NUMBER / STRING / COMMENT / PUNCT
+
+Whitespace is not emitted. A string literal is a single STRING token,
+including any `${...}` interpolation inside it (nested braces, strings and
+comments are followed correctly). Block comments nest, as in Dart.
+
+Codemods use this in two ways:
+
+    sub_anchored(pattern, repl, text, anchor=...)  # try the pattern only at
+        # IDENT tokens spelled ``anchor``: faster on big files and never
+        # matches in a comment or string
+    sub_code(pattern, repl, text)  # regular scan, but drop matches that
+        # start inside a string or comment
+
+Token streams are cached per content SHA-1, in memory (the MEMORY_ENTRIES
+most recently used) and on disk.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import sqlite3
+from array import array
+from bisect import bisect_right
+from typing import Callable, Iterator
+
+from source_index import CACHE_DIR
+
+DB_PATH = CACHE_DIR / "lexer_cache.sqlite"
+# Bump when token kinds or boundaries change.
+LEXER_VERSION = 1
+# Streams kept in memory; long-lived processes (audit_watch, bench_tools) stay bounded.
+MEMORY_ENTRIES = 256
+
+IDENT, NUMBER, STRING, COMMENT, PUNCT = 1, 2, 3, 4, 5
+KIND_NAMES = {IDENT: "ident", NUMBER: "number", STRING: "string", COMMENT: "comment", PUNCT: "punct"}
+
+_CODE = re.compile(
+    r"(?P<ws>\s+)"
+    r"|(?P<line_comment>//[^\n]*)"
+    r"|(?P<block_comment>/\*)"
+    r"|(?P<string>r?(?:'''|\"\"\"|'|\"))"
+    r"|(?P<ident>[A-Za-z_$][\w$]*)"
+    r"|(?P<number>0[xX][0-9a-fA-F]+|\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)"
+    r"|(?P<punct>.)",
+    re.DOTALL,
+)
+_BLOCK = re.compile(r"/\*|\*/")
+_STRING_BODY = {
+    q: re.compile(r"\\.|\$\{|" + re.escape(q), re.DOTALL) for q in ("'''", '"""', "'", '"')
+}
+
+
+def _skip_block_comment(text: str, pos: int) -> int:
+    """``pos`` is just past the opening ``/*``; return the end of the comment."""
+    depth = 1
+    for m in _BLOCK.finditer(text, pos):
+        depth += 1 if m.group() == "/*" else -1
+        if depth == 0:
+            return m.end()
+    return len(text)
+
+
+def _skip_string(text: str, pos: int, opener: str) -> int:
+    """``pos`` is just past ``opener`` (e.g. ``r'''`` or ``"``); return the end of the literal."""
+    raw = opener.startswith("r")
+    quote = opener.lstrip("r")
+    if raw:
+        end = text.find(quote, pos)
+        return len(text) if end < 0 else end + len(quote)
+    body = _STRING_BODY[quote]
+    while True:
+        m = body.search(text, pos)
+        if m is None:
+            return len(text)
+        token = m.group()
+        if token == quote:
+            return m.end()
+        pos = _skip_interpolation(text, m.end()) if token == "${" else m.end()
+
+
+def _skip_interpolation(text: str, pos: int) -> int:
+    """``pos`` is just past ``${``; return the position after the matching ``}``."""
+    depth = 1
+    n = len(text)
+    while pos < n:
+        m = _CODE.match(text, pos)
+        kind = m.lastgroup
+        if kind == "string":
+            pos = _skip_string(text, m.end(), m.group())
+            continue
+        if kind == "block_comment":
+            pos = _skip_block_comment(text, m.end())
+            continue
+        if kind == "punct":
+            c = m.group()
+            if c == "{":
+                depth += 1
+            elif c == "}":
+                depth -= 1
+                if depth == 0:
+                    return m.end()
+        pos = m.end()
+    return n
+
+
+class TokenStream:
+    __slots__ = ("starts", "ends", "kinds")
+
+    def __init__(self, starts: array, ends: array, kinds: bytearray) -> None:
+        self.starts = starts
+        self.ends = ends
+        self.kinds = kinds
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def index_at(self, offset: int) -> int:
+        """Index of the token containing ``offset``, or -1 (whitespace / none)."""
+        i = bisect_right(self.starts, offset) - 1
+        if i >= 0 and offset < self.ends[i]:
+            return i
+        return -1
+
+    def in_code(self, offset: int) -> bool:
+        """True unless ``offset`` falls inside a string literal or comment."""
+        i = self.index_at(offset)
+        return i < 0 or self.kinds[i] not in (STRING, COMMENT)
+
+    def ident_offsets(self, text: str, name: str) -> Iterator[int]:
+        """Start offsets of IDENT tokens spelled ``name``."""
+        size = len(name)
+        starts, ends, kinds = self.starts, self.ends, self.kinds
+        # Walk candidate positions with str.find and confirm against the token
+        # table; cheaper than visiting every token in Python.
+        pos = text.find(name)
+        while pos >= 0:
+            i = self.index_at(pos)
+            if i >= 0 and kinds[i] == IDENT and starts[i] == pos and ends[i] == pos + size:
+                yield pos
+            pos = text.find(name, pos + size)
+
+
+def tokenize(text: str) -> TokenStream:
+    starts = array("I")
+    ends = array("I")
+    kinds = bytearray()
+    pos = 0
+    n = len(text)
+    match = _CODE.match
+    while pos < n:
+        m = match(text, pos)
+        kind = m.lastgroup
+        end = m.end()
+        if kind == "ws":
+            pos = end
+            continue
+        if kind == "ident":
+            code = IDENT
+        elif kind == "punct":
+            code = PUNCT
+        elif kind == "string":
+            code = STRING
+            end = _skip_string(text, end, m.group())
+        elif kind == "line_comment":
+            code = COMMENT
+        elif kind == "block_comment":
+            code = COMMENT
+            end = _skip_block_comment(text, end)
+        else:
+            code = NUMBER
+        starts.append(pos)
+        ends.append(end)
+        kinds.append(code)
+        pos = end
+    return TokenStream(starts, ends, kinds)
+
+
+_memory: dict[str, TokenStream] = {}
+_db: sqlite3.Connection | None = None
+
+
+def _open_db() -> sqlite3.Connection:
+    global _db
+    if _db is None:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _db = sqlite3.connect(DB_PATH, timeout=30)  # shared by --jobs workers
+        _db.execute(
+            "CREATE TABLE IF NOT EXISTS tokens ("
+            "sha1 TEXT PRIMARY KEY, version INTEGER NOT NULL, "
+            "starts BLOB NOT NULL, ends BLOB NOT NULL, kinds BLOB NOT NULL)"
+        )
+    return _db
+
+
+def tokenize_cached(text: str) -> TokenStream:
+    """``tokenize`` with a per-content-hash cache (memory, then tools/.cache)."""
+    sha1 = hashlib.sha1(text.encode("utf-8")).hexdigest()
+    tokens = _memory.pop(sha1, None)
+    if tokens is not None:
+        _memory[sha1] = tokens  # most recently used last
+        return tokens
+    db = _open_db()
+    row = db.execute(
+        "SELECT starts, ends, kinds FROM tokens WHERE sha1 = ? AND version = ?",
+        (sha1, LEXER_VERSION),
+    ).fetchone()
+    if row:
+        starts, ends = array("I"), array("I")
+        starts.frombytes(row[0])
+        ends.frombytes(row[1])
+        tokens = TokenStream(starts, ends, bytearray(row[2]))
+    else:
+        tokens = tokenize(text)
+        db.execute(
+            "INSERT OR REPLACE INTO tokens VALUES (?, ?, ?, ?, ?)",
+            (sha1, LEXER_VERSION, tokens.starts.tobytes(), tokens.ends.tobytes(), bytes(tokens.kinds)),
+        )
+        db.commit()
+    if len(_memory) >= MEMORY_ENTRIES:
+        del _memory[next(iter(_memory))]
+    _memory[sha1] = tokens
+    return tokens
+
+
+def _splice(text: str, matches: Iterator[re.Match[str]], repl: str | Callable[[re.Match[str]], str]) -> tuple[str, int]:
+    parts: list[str] = []
+    pos = 0
+    count = 0
+    for m in matches:
+        if m.start() < pos:
+            continue  # overlaps the previous replacement
+        parts.append(text[pos : m.start()])
+        parts.append(repl(m) if callable(repl) else m.expand(repl))
+        pos = m.end()
+        count += 1
+    if not count:
+        return text, 0
+    parts.append(text[pos:])
+    return "".join(parts), count
+
+
+def sub_code(
+    pattern: re.Pattern[str],
+    repl: str | Callable[[re.Match[str]], str],
+    text: str,
+    tokens: TokenStream | None = None,
+) -> tuple[str, int]:
+    """Like ``pattern.subn`` but skip matches starting inside strings/comments."""
+    if tokens is None:
+        tokens = tokenize_cached(text)
+    return _splice(text, (m for m in pattern.finditer(text) if tokens.in_code(m.start())), repl)
+
+
+def sub_anchored(
+    pattern: re.Pattern[str],
+    repl: str | Callable[[re.Match[str]], str],
+    text: str,
+    anchor: str,
+    tokens: TokenStream | None = None,
+) -> tuple[str, int]:
+    """Like ``pattern.subn`` but only try ``pattern.match`` at IDENT tokens ``anchor``.
+
+    The pattern must start with the anchor identifier.
+    """
+    if tokens is None:
+        tokens = tokenize_cached(text)
+    matches = (pattern.match(text, pos) for pos in tokens.ident_offsets(text, anchor))
+    return _splice(text, (m for m in matches if m), repl)
@@ -9,9 +9,17 @@ Keeps Slider/Switch/etc. callbacks unchanged (those need setState).
 
 from __future__ import annotations
 
+import argparse
 import re
 from pathlib import Path
 
+from dart_lexer import sub_anchored
+from git_changes import add_change_arguments, dart_files, selected_changes
+from parallel import add_jobs_argument, map_files
+from profiling import run_main
+from source_index import SourceIndex
+from writeback import WriteBack
+
 ROOT = Path(__file__).resolve().parents[1] / "lib" / "presentation" / "views"
 
 pattern = re.compile(
@@ -21,17 +29,27 @@ pattern = re.compile(
 )
 
 
-def transform_file(path: Path) -> bool:
-    text = path.read_text(encoding="utf-8")
+def _repl(m: re.Match[str]) -> str:
+    assignment = m.group(1).strip()
+    return f"onChanged: (v) {{ {assignment} _update(); }}"
+
+
+def transform_text(text: str) -> tuple[str, int]:
+    """Return rewritten text + number of replacements."""
     if "CalculatorTextField" not in text:
-        return False
+        return text, 0
+    return sub_anchored(pattern, _repl, text, anchor="onChanged")
 
-    def repl(m: re.Match[str]) -> str:
-        assignment = m.group(1).strip()
-        return f"onChanged: (v) {{ {assignment} _update(); }}"
 
-    new_text, n = pattern.subn(repl, text)
-    if n == 0:
+def rewrite_file(path: Path) -> tuple[str | None, int]:
+    """Worker: return (new text or None, replacements) without writing."""
+    new_text, n = transform_text(path.read_text(encoding="utf-8"))
+    return (new_text if n else None), n
+
+
+def transform_file(path: Path) -> bool:
+    new_text, n = rewrite_file(path)
+    if new_text is None:
         return False
     path.write_text(new_text, encoding="utf-8")
     print(f"{path.relative_to(ROOT.parent.parent)}: {n} replacement(s)")
@@ -39,12 +57,26 @@ def transform_file(path: Path) -> bool:
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Drop setState from CalculatorTextField onChanged.")
+    add_jobs_argument(parser)
+    add_change_arguments(parser)
+    args = parser.parse_args()
+
+    paths = dart_files(ROOT, selected_changes(args), recursive=True)
+    with SourceIndex() as index:
+        candidates = [p for p, e in zip(paths, index.entries(paths)) if e.has_text_field]
+
     count = 0
-    for path in ROOT.rglob("*.dart"):
-        if transform_file(path):
+    with WriteBack() as wb:
+        for path, (new_text, n) in zip(candidates, map_files(rewrite_file, candidates, args.jobs)):
+            if new_text is None:
+                continue
+            wb.stage(path, new_text)
+            print(f"{path.relative_to(ROOT.parent.parent)}: {n} replacement(s)")
             count += 1
     print(f"Done. Modified {count} file(s).")
+    print(wb.stats)
 
 
 if __name__ == "__main__":
-    main()
+    run_main(main)
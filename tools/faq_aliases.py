@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""FAQ aliases declared in assets/lang/ru.json instead of copied blocks.
+
+Some calculators share another calculator's FAQ. Rather than a copy of the
+block under `faq.<alias>`, ru.json declares the reference:
+
+    "faq_aliases": {
+      "slopes_finishing": "slopes",
+      ...
+    }
+
+AppLocalizations maps `faq.<alias>.*` onto the target block at load time,
+so screens keep using `faqPrefix: 'faq.<calc_id>'`.
+
+    python tools/faq_aliases.py              # validate, report bytes saved
+    python tools/faq_aliases.py --migrate    # turn identical FAQ blocks into aliases
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from collections import defaultdict
+
+from l10n_store import LocalizationStore
+from profiling import run_main
+from source_index import RU_JSON
+from writeback import WriteBack
+
+ALIASES_KEY = "faq_aliases"
+
+
+def load_aliases(store: LocalizationStore) -> dict[str, str]:
+    """alias calc id -> target calc id, as declared in ru.json."""
+    declared = store.get((ALIASES_KEY,), {})
+    if not isinstance(declared, dict):
+        raise ValueError(f"{ALIASES_KEY} must be an object of alias -> calc id, not {type(declared).__name__}")
+    return {alias: target for alias, target in declared.items() if isinstance(target, str)}
+
+
+def resolve(aliases: dict[str, str], calc_id: str) -> str:
+    """Calc id whose FAQ block ``calc_id`` shows (follows alias chains)."""
+    seen = [calc_id]
+    while calc_id in aliases:
+        calc_id = aliases[calc_id]
+        if calc_id in seen:
+            raise ValueError(f"alias cycle: {' -> '.join(seen + [calc_id])}")
+        seen.append(calc_id)
+    return calc_id
+
+
+def target_or_none(aliases: dict[str, str], calc_id: str) -> str | None:
+    """resolve(), or None when ``calc_id`` runs into an alias cycle (problems() reports it)."""
+    try:
+        return resolve(aliases, calc_id)
+    except ValueError:
+        return None
+
+
+def problems(store: LocalizationStore, aliases: dict[str, str]) -> list[str]:
+    found = []
+    for alias in aliases:
+        try:
+            target = resolve(aliases, alias)
+        except ValueError as exc:
+            found.append(str(exc))
+            continue
+        if ("faq", alias) in store:
+            found.append(f"{alias}: has its own FAQ block and an alias to {aliases[alias]}")
+        if ("faq", target) not in store:
+            found.append(f"{alias}: target {target} has no FAQ block")
+    return found
+
+
+def copies(store: LocalizationStore) -> dict[str, str]:
+    """FAQ blocks identical to an earlier block: copy id -> original id."""
+    first: dict[bytes, str] = {}
+    found = {}
+    for calc_id in store.keys(("faq",)):
+        # Compare decoded content, not bytes: indentation may differ.
+        key = json.dumps(store.get(("faq", calc_id)), ensure_ascii=False, sort_keys=True).encode("utf-8")
+        if key in first:
+            found[calc_id] = first[key]
+        else:
+            first[key] = calc_id
+    return found
+
+
+def saved_bytes(store: LocalizationStore, aliases: dict[str, str]) -> int:
+    """Bytes the declared aliases would take as copied `faq` members, minus the declarations."""
+    total = 0
+    for alias in aliases:
+        target = target_or_none(aliases, alias)
+        if target is None or ("faq", target) not in store:
+            continue
+        span = store.spans[("faq", target)]
+        member = len(json.dumps(alias).encode("utf-8")) + 2 + span.end - span.start
+        declaration = len(json.dumps(alias).encode("utf-8")) + 2 + len(json.dumps(target).encode("utf-8"))
+        total += member - declaration
+    return total
+
+
+def duplicate_strings(store: LocalizationStore) -> tuple[int, int]:
+    """(strings, bytes) of FAQ text repeated across blocks that aliases do not cover."""
+    where: dict[str, set[str]] = defaultdict(set)
+    for path, value in store.iter_strings(("faq",)):
+        where[value].add(path[1])
+    count = extra = 0
+    for value, calc_ids in where.items():
+        if len(calc_ids) > 1:
+            count += 1
+            extra += len(value.encode("utf-8")) * (len(calc_ids) - 1)
+    return count, extra
+
+
+def migrate(store: LocalizationStore) -> dict[str, str]:
+    """Replace copied FAQ blocks with alias declarations; return the new aliases."""
+    found = copies(store)
+    if not found:
+        return {}
+    for copy in found:
+        store.delete(("faq", copy))
+    store.commit()
+    for copy, original in found.items():
+        store.set((ALIASES_KEY, copy), original)
+    store.commit()
+    return found
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Validate FAQ aliases in ru.json and report savings.")
+    parser.add_argument("--migrate", action="store_true", help="replace identical FAQ blocks with aliases")
+    parser.add_argument("--dry-run", action="store_true", help="with --migrate: report only")
+    args = parser.parse_args()
+
+    with WriteBack(dry_run=args.dry_run) as wb:
+        store = LocalizationStore(wb.read(RU_JSON).encode("utf-8"))
+        try:
+            aliases = load_aliases(store)
+        except ValueError as exc:
+            print(f"{RU_JSON.name}: {exc}")
+            return 1
+        before = len(store.data)
+        if args.migrate:
+            for copy, original in migrate(store).items():
+                print(f"ALIASED: {copy} -> {original}")
+            wb.stage(RU_JSON, store.text)
+
+    aliases = load_aliases(store)
+    found = problems(store, aliases)
+    for problem in found:
+        print(f"  {problem}")
+    print(f"Aliases: {len(aliases)}, FAQ blocks: {len(store.keys(('faq',)))}")
+    if args.migrate:
+        print(f"ru.json: {before} -> {len(store.data)} bytes")
+        print(wb.stats)
+    print(f"Saved by aliases: ~{saved_bytes(store, aliases)} bytes")
+    strings, extra = duplicate_strings(store)
+    print(f"FAQ text still repeated across blocks: {strings} string(s), {extra} bytes")
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_main(main))
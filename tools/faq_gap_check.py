@@ -1,23 +1,45 @@
 #!/usr/bin/env python3
-"""Find calculator IDs missing FAQ blocks in ru.json."""
-import json
-import re
+"""Find calculator IDs missing FAQ blocks in ru.json.
+
+With --changed-only / --since REV only ids from changed definition files
+are checked, unless ru.json itself changed.
+"""
+import argparse
 from pathlib import Path
 
+from git_changes import add_change_arguments, dart_files, selected_changes
+from profiling import run_main
+from source_index import RU_JSON, SourceIndex
+
 ROOT = Path(__file__).resolve().parents[1]
-ru = json.loads((ROOT / "assets/lang/ru.json").read_text(encoding="utf-8"))
-faq = ru.get("faq", {})
-
-ids: set[str] = set()
-for f in (ROOT / "lib/domain/calculators/definitions").glob("*.dart"):
-    text = f.read_text(encoding="utf-8")
-    ids.update(re.findall(r"id: '([^']+)'", text))
-
-# Seed calculators in registry
-reg = (ROOT / "lib/domain/calculators/calculator_registry.dart").read_text(encoding="utf-8")
-ids.update(re.findall(r"id: '([^']+)'", reg))
-
-missing = sorted(i for i in ids if i not in faq)
-print(f"Definitions: {len(ids)}, FAQ blocks: {len(faq)}, missing: {len(missing)}")
-for i in missing:
-    print(f"  {i}")
+DEFINITIONS = ROOT / "lib/domain/calculators/definitions"
+REGISTRY = ROOT / "lib/domain/calculators/calculator_registry.dart"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_change_arguments(parser)
+    args = parser.parse_args()
+
+    changes = selected_changes(args)
+    if changes is not None and RU_JSON in changes:
+        changes = None
+
+    with SourceIndex() as index:
+        faq = index.faq()
+        aliases = index.faq_aliases()
+        ids: set[str] = set()
+        for e in index.entries(dart_files(DEFINITIONS, changes)):
+            ids.update(e.ids)
+        # Seed calculators in registry
+        if changes is None or REGISTRY in changes:
+            ids.update(index.entry(REGISTRY).ids)
+
+    missing = sorted(i for i in ids if i not in faq)
+    print(f"Definitions: {len(ids)}, FAQ blocks: {len(faq) - len(aliases)}, aliases: {len(aliases)}, missing: {len(missing)}")
+    for i in missing:
+        print(f"  {i}")
+
+
+if __name__ == "__main__":
+    run_main(main)
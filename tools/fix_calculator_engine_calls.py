@@ -1,7 +1,13 @@
 #!/usr/bin/env python3
+import argparse
 import re
 from pathlib import Path
 
+from git_changes import add_change_arguments, dart_files, selected_changes
+from parallel import add_jobs_argument, map_files
+from profiling import run_main
+from writeback import WriteBack
+
 root = Path(__file__).resolve().parents[1] / "lib" / "presentation" / "views" / "calculator"
 
 broken_values = re.compile(
@@ -11,16 +17,39 @@ missing_paren = re.compile(
     r"CalculatorEngine\.calculate\('([^']+)', _buildCalculationInputs\(\);"
 )
 
-for path in root.glob("*.dart"):
-    text = path.read_text(encoding="utf-8")
+
+def fix_text(text: str) -> str:
     updated = broken_values.sub(
         r"CalculatorEngine.calculate('\1', _buildCalculationInputs()).values",
         text,
     )
-    updated = missing_paren.sub(
+    return missing_paren.sub(
         r"CalculatorEngine.calculate('\1', _buildCalculationInputs());",
         updated,
     )
-    if updated != text:
-        path.write_text(updated, encoding="utf-8")
-        print("fixed", path.name)
+
+
+def rewrite_file(path: Path) -> str | None:
+    """Worker: return the fixed text, or None when nothing changed."""
+    text = path.read_text(encoding="utf-8")
+    updated = fix_text(text)
+    return updated if updated != text else None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fix broken CalculatorEngine.calculate calls.")
+    add_jobs_argument(parser)
+    add_change_arguments(parser)
+    args = parser.parse_args()
+
+    paths = dart_files(root, selected_changes(args))
+    with WriteBack() as wb:
+        for path, updated in zip(paths, map_files(rewrite_file, paths, args.jobs)):
+            if updated is not None:
+                wb.stage(path, updated)
+                print("fixed", path.name)
+    print(wb.stats)
+
+
+if __name__ == "__main__":
+    run_main(main)
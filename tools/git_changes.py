@@ -0,0 +1,64 @@
+"""Git-aware incremental mode (`--since REV` / `--changed-only`) for tools/ scripts.
+
+Instead of globbing whole directories, scripts can restrict themselves to
+the files under the project reported by `git diff --name-only` plus
+untracked files (the project may live in a subdirectory of the repository):
+
+    --changed-only   working tree + index vs HEAD (what a pre-commit hook sees)
+    --since REV      working tree vs REV (e.g. origin/main for a PR)
+
+Deleted files are never reported.
+"""
+from __future__ import annotations
+
+import argparse
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def add_change_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--since", metavar="REV", help="only files changed since REV (plus untracked)")
+    group.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="only files changed vs HEAD (staged, unstaged and untracked)",
+    )
+
+
+def _git_lines(*args: str) -> list[str]:
+    result = subprocess.run(
+        ["git", *args], capture_output=True, text=True, cwd=ROOT, check=True
+    )
+    return [line for line in result.stdout.splitlines() if line]
+
+
+def changed_files(since: str = "HEAD") -> set[Path]:
+    """Absolute paths of files changed vs ``since`` plus untracked files."""
+    # Both relative to ROOT, which may be a subdirectory of a larger repository.
+    names = _git_lines("diff", "--name-only", "--relative", "--diff-filter=d", since, "--")
+    names += _git_lines("ls-files", "--others", "--exclude-standard")
+    return {ROOT / name for name in names}
+
+
+def selected_changes(args: argparse.Namespace) -> set[Path] | None:
+    """Changed files for the parsed flags, or None when running on the full tree."""
+    if getattr(args, "since", None):
+        return changed_files(args.since)
+    if getattr(args, "changed_only", False):
+        return changed_files()
+    return None
+
+
+def dart_files(directory: Path, changes: set[Path] | None, recursive: bool = False) -> list[Path]:
+    """Sorted `*.dart` files under ``directory``, limited to ``changes`` unless it is None."""
+    if changes is None:
+        return sorted(directory.rglob("*.dart") if recursive else directory.glob("*.dart"))
+    return sorted(
+        p
+        for p in changes
+        if p.suffix == ".dart"
+        and (p.is_relative_to(directory) if recursive else p.parent == directory)
+    )
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""Import graph of the Dart tree: unreachable files, cycles and heavy imports.
+
+Directives (`import`, `export`, `part`, including every branch of a
+conditional import) are read from the token stream of each file and cached
+per content SHA-1 in tools/.cache/import_graph.sqlite, so a rebuild only
+re-reads changed files. URIs resolve relative to the file, or to lib/ for
+`package:<name>/` (name from pubspec.yaml); `dart:` and other packages are
+external and not followed.
+
+Reports, from the entry points (default lib/main.dart and lib/main_web.dart):
+
+    unreachable  lib/ files no entry point reaches (marked if test/ imports them)
+    cycles       strongly connected components with more than one file
+    heavy        transitive bytes each file pulls in, and the bytes only
+                 reachable through it (its dominator subtree): what removing
+                 every import of that file would drop from the app
+
+    python tools/import_graph.py
+    python tools/import_graph.py --why lib/presentation/views/foo.dart
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sqlite3
+import sys
+from collections import deque
+from pathlib import Path
+from typing import Iterator, NamedTuple
+
+from dart_lexer import COMMENT, IDENT, PUNCT, STRING, tokenize_cached
+from profiling import run_main
+from source_index import CACHE_DIR, LIB, ROOT, SourceIndex, rel
+
+DB_PATH = CACHE_DIR / "import_graph.sqlite"
+# Bump when directive extraction changes.
+PARSER_VERSION = 1
+
+TEST = ROOT / "test"
+ENTRY_POINTS = [LIB / "main.dart", LIB / "main_web.dart"]
+DIRECTIVES = {"import", "export", "part"}
+
+
+def package_name() -> str:
+    m = re.search(r"^name:\s*(\S+)", (ROOT / "pubspec.yaml").read_text(encoding="utf-8"), re.MULTILINE)
+    return m.group(1) if m else ""
+
+
+class Directive(NamedTuple):
+    keyword: str  # import / export / part / part of
+    uri: str
+    conditional: bool  # an `if (dart.library.x)` branch
+
+
+def _uri(token: str) -> str:
+    return token.lstrip("r")[1:-1]
+
+
+def parse_directives(text: str) -> list[Directive]:
+    """Directives at the top of a Dart file, up to the first declaration."""
+    tokens = tokenize_cached(text)
+    starts, ends, kinds = tokens.starts, tokens.ends, tokens.kinds
+    n = len(kinds)
+    found: list[Directive] = []
+    i = 0
+    while i < n:
+        kind = kinds[i]
+        word = text[starts[i] : ends[i]]
+        if kind == COMMENT:
+            i += 1
+        elif kind == PUNCT and word == "@":
+            # Annotation: @name, @a.b or @name(...)
+            i += 1
+            while i < n and (kinds[i] == IDENT or text[starts[i]] == "."):
+                i += 1
+            if i < n and text[starts[i]] == "(":
+                depth = 0
+                while i < n:
+                    c = text[starts[i]] if kinds[i] == PUNCT else ""
+                    depth += (c == "(") - (c == ")")
+                    i += 1
+                    if depth == 0:
+                        break
+        elif kind == IDENT and (word in DIRECTIVES or word == "library"):
+            keyword = word
+            if word == "part" and i + 1 < n and text[starts[i + 1] : ends[i + 1]] == "of":
+                keyword = "part of"
+            depth = 0
+            conditional = False
+            i += 1
+            while i < n and not (kinds[i] == PUNCT and text[starts[i]] == ";"):
+                c = text[starts[i]] if kinds[i] == PUNCT else ""
+                depth += (c == "(") - (c == ")")
+                if kinds[i] == IDENT and text[starts[i] : ends[i]] == "if":
+                    conditional = True
+                elif kinds[i] == STRING and depth == 0 and keyword != "library":
+                    found.append(Directive(keyword, _uri(text[starts[i] : ends[i]]), conditional))
+                i += 1
+            i += 1
+        else:
+            break
+    return found
+
+
+class ImportCache:
+    def __init__(self) -> None:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(DB_PATH)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS directives ("
+            "sha1 TEXT PRIMARY KEY, version INTEGER NOT NULL, directives TEXT NOT NULL)"
+        )
+
+    def directives(self, path: Path, sha1: str) -> list[Directive]:
+        row = self.db.execute(
+            "SELECT directives FROM directives WHERE sha1 = ? AND version = ?", (sha1, PARSER_VERSION)
+        ).fetchone()
+        if row:
+            return [Directive(*d) for d in json.loads(row[0])]
+        found = parse_directives(path.read_text(encoding="utf-8"))
+        self.db.execute(
+            "INSERT OR REPLACE INTO directives VALUES (?, ?, ?)",
+            (sha1, PARSER_VERSION, json.dumps(found)),
+        )
+        return found
+
+    def close(self) -> None:
+        self.db.commit()
+        self.db.close()
+
+
+class ImportGraph:
+    """Files are keyed by path relative to ROOT; ``edges[a]`` are the files ``a`` depends on."""
+
+    def __init__(self) -> None:
+        self.sizes: dict[str, int] = {}
+        self.edges: dict[str, set[str]] = {}
+        self.directives: dict[str, list[Directive]] = {}
+        self.external: dict[str, set[str]] = {}  # file -> dart:/other package URIs
+        self.unresolved: list[tuple[str, str]] = []
+
+    @classmethod
+    def build(cls, roots: tuple[Path, ...] = (LIB, TEST)) -> ImportGraph:
+        graph = cls()
+        package = f"package:{package_name()}/"
+        cache = ImportCache()
+        try:
+            with SourceIndex() as index:
+                for root in roots:
+                    if not root.exists():
+                        continue
+                    for entry in index.scan(root, recursive=True):
+                        path = ROOT / entry.path
+                        graph.sizes[entry.path] = path.stat().st_size
+                        graph.directives[entry.path] = cache.directives(path, entry.sha1)
+        finally:
+            cache.close()
+        for path, directives in graph.directives.items():
+            deps = graph.edges.setdefault(path, set())
+            for d in directives:
+                if d.keyword == "part of":
+                    continue
+                if d.uri.startswith(package):
+                    target = rel(LIB / d.uri[len(package) :])
+                elif ":" in d.uri:
+                    graph.external.setdefault(path, set()).add(d.uri)
+                    continue
+                else:
+                    target = rel((ROOT / path).parent / d.uri)
+                if target in graph.sizes:
+                    deps.add(target)
+                else:
+                    graph.unresolved.append((path, d.uri))
+        return graph
+
+    def importers(self) -> dict[str, set[str]]:
+        reverse: dict[str, set[str]] = {p: set() for p in self.edges}
+        for src, deps in self.edges.items():
+            for dep in deps:
+                reverse[dep].add(src)
+        return reverse
+
+    def reachable(self, entries: list[str]) -> set[str]:
+        seen = set(e for e in entries if e in self.edges)
+        queue = deque(seen)
+        while queue:
+            for dep in self.edges[queue.popleft()]:
+                if dep not in seen:
+                    seen.add(dep)
+                    queue.append(dep)
+        return seen
+
+    def path_to(self, entries: list[str], target: str) -> list[str] | None:
+        """Shortest import chain from an entry point to ``target``."""
+        parent: dict[str, str | None] = {e: None for e in entries if e in self.edges}
+        queue = deque(parent)
+        while queue:
+            node = queue.popleft()
+            if node == target:
+                chain = []
+                while node is not None:
+                    chain.append(node)
+                    node = parent[node]
+                return chain[::-1]
+            for dep in sorted(self.edges[node]):
+                if dep not in parent:
+                    parent[dep] = node
+                    queue.append(dep)
+        return None
+
+    def sccs(self) -> list[list[str]]:
+        """Strongly connected components (Tarjan, iterative), dependencies first."""
+        index: dict[str, int] = {}
+        low: dict[str, int] = {}
+        on_stack: set[str] = set()
+        stack: list[str] = []
+        result: list[list[str]] = []
+        counter = 0
+        for root in sorted(self.edges):
+            if root in index:
+                continue
+            work: list[tuple[str, Iterator[str]]] = [(root, iter(sorted(self.edges[root])))]
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, deps = work[-1]
+                for dep in deps:
+                    if dep not in index:
+                        index[dep] = low[dep] = counter
+                        counter += 1
+                        stack.append(dep)
+                        on_stack.add(dep)
+                        work.append((dep, iter(sorted(self.edges[dep]))))
+                        break
+                    if dep in on_stack:
+                        low[node] = min(low[node], index[dep])
+                else:
+                    work.pop()
+                    if work:
+                        low[work[-1][0]] = min(low[work[-1][0]], low[node])
+                    if low[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        result.append(sorted(component))
+        return result
+
+    def transitive_bytes(self) -> dict[str, int]:
+        """Bytes of each file plus everything it imports, directly or not."""
+        components = self.sccs()
+        owner = {p: i for i, comp in enumerate(components) for p in comp}
+        bit = {p: 1 << i for i, p in enumerate(sorted(self.edges))}
+        sizes_by_bit = [self.sizes[p] for p in sorted(self.edges)]
+        closure: list[int] = []
+        # Tarjan yields components dependencies-first, so successors are done.
+        for i, comp in enumerate(components):
+            mask = 0
+            for p in comp:
+                mask |= bit[p]
+                for dep in self.edges[p]:
+                    if owner[dep] != i:
+                        mask |= closure[owner[dep]]
+            closure.append(mask)
+        totals = []
+        for mask in closure:
+            total = 0
+            while mask:
+                low_bit = mask & -mask
+                total += sizes_by_bit[low_bit.bit_length() - 1]
+                mask ^= low_bit
+            totals.append(total)
+        return {p: totals[owner[p]] for p in self.edges}
+
+    def dominated_bytes(self, entries: list[str]) -> dict[str, int]:
+        """Bytes reachable from ``entries`` only through each file (itself included)."""
+        root = "<entry>"
+        succ = {root: [e for e in entries if e in self.edges]}
+        order: list[str] = []
+        seen = {root}
+        # Reverse postorder from the virtual root.
+        stack: list[tuple[str, Iterator[str]]] = [(root, iter(succ[root]))]
+        while stack:
+            node, it = stack[-1]
+            for dep in it:
+                if dep not in seen:
+                    seen.add(dep)
+                    stack.append((dep, iter(sorted(self.edges[dep]))))
+                    break
+            else:
+                order.append(node)
+                stack.pop()
+        order.reverse()
+        rpo = {n: i for i, n in enumerate(order)}
+        preds: dict[str, list[str]] = {n: [] for n in order}
+        for n in order:
+            for dep in succ[n] if n == root else self.edges[n]:
+                preds[dep].append(n)
+        # Cooper, Harvey & Kennedy, "A Simple, Fast Dominance Algorithm".
+        idom: dict[str, str] = {root: root}
+
+        def intersect(a: str, b: str) -> str:
+            while a != b:
+                while rpo[a] > rpo[b]:
+                    a = idom[a]
+                while rpo[b] > rpo[a]:
+                    b = idom[b]
+            return a
+
+        changed = True
+        while changed:
+            changed = False
+            for n in order[1:]:
+                done = [p for p in preds[n] if p in idom]
+                new = done[0]
+                for p in done[1:]:
+                    new = intersect(p, new)
+                if idom.get(n) != new:
+                    idom[n] = new
+                    changed = True
+        totals = {n: self.sizes[n] for n in order[1:]}
+        for n in reversed(order[1:]):
+            parent = idom[n]
+            if parent != root:
+                totals[parent] += totals[n]
+        return totals
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Dart import graph: unreachable files, cycles, heavy imports.")
+    parser.add_argument("--entry", type=Path, action="append", help="entry point (default lib/main.dart, lib/main_web.dart)")
+    parser.add_argument("--top", type=int, default=15, help="rows in the heavy-import tables (default 15)")
+    parser.add_argument("--why", type=Path, metavar="FILE", help="print the import chain that reaches FILE")
+    parser.add_argument("--json", type=Path, metavar="OUT", help="write the graph and reports as JSON")
+    args = parser.parse_args()
+
+    graph = ImportGraph.build()
+    entries = [rel(p) for p in (args.entry or ENTRY_POINTS)]
+    if args.why:
+        chain = graph.path_to(entries, rel(args.why))
+        print("\n  -> ".join(chain) if chain else f"{rel(args.why)} is not reachable")
+        return 0
+
+    lib_prefix = rel(LIB) + "/"
+    lib_files = sorted(p for p in graph.edges if p.startswith(lib_prefix))
+    reachable = graph.reachable(entries)
+    importers = graph.importers()
+    unreachable = [p for p in lib_files if p not in reachable]
+    # Reached only when tests are added as entry points.
+    test_only = graph.reachable([p for p in graph.edges if not p.startswith(lib_prefix)]) - reachable
+    cycles = [c for c in graph.sccs() if len(c) > 1 and c[0].startswith(lib_prefix)]
+    transitive = graph.transitive_bytes()
+    dominated = graph.dominated_bytes(entries)
+    app_bytes = sum(graph.sizes[p] for p in reachable)
+
+    print(f"lib/ files: {len(lib_files)}, reachable: {len(reachable)} ({app_bytes} bytes), unreachable: {len(unreachable)}")
+    for path in unreachable:
+        note = " (used by tests)" if path in test_only else ""
+        print(f"  {path}  {graph.sizes[path]} bytes{note}")
+    print(f"\nImport cycles: {len(cycles)}")
+    for comp in sorted(cycles, key=len, reverse=True):
+        print(f"  {len(comp)} files: {', '.join(Path(p).name for p in comp[:6])}{' ...' if len(comp) > 6 else ''}")
+    print(f"\nHeaviest files by transitive size (of {app_bytes} bytes reachable):")
+    for path in sorted(reachable, key=lambda p: (-transitive[p], p))[: args.top]:
+        print(f"  {transitive[path]:>9}  {path}")
+    print("\nBytes only reachable through a file (dropped with all its imports):")
+    for path in sorted((p for p in dominated if p not in entries), key=lambda p: (-dominated[p], p))[: args.top]:
+        print(f"  {dominated[path]:>9}  {path}  (imported by {len(importers[path])})")
+    if graph.unresolved:
+        print(f"\nUnresolved URIs: {len(graph.unresolved)}")
+        for path, uri in graph.unresolved:
+            print(f"  {path}: {uri}")
+    if args.json:
+        args.json.write_text(
+            json.dumps(
+                {
+                    "entries": entries,
+                    "edges": {p: sorted(d) for p, d in sorted(graph.edges.items())},
+                    "sizes": graph.sizes,
+                    "unreachable": unreachable,
+                    "cycles": cycles,
+                    "transitive_bytes": {p: transitive[p] for p in sorted(reachable)},
+                    "dominated_bytes": dict(sorted(dominated.items())),
+                },
+                indent=2,
+            )
+            + "\n",
+            encoding="utf-8",
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_main(main))
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""Key-path index over assets/lang/ru.json with span-level patching.
+
+The file is scanned once (as bytes) and every key path is mapped to the
+byte span of its value:
+
+    store = LocalizationStore.load()
+    ("faq", "stairs", "q1") in store        # membership, no decoding
+    store.get(("faq", "stairs"))            # decodes only that span
+    store.keys(("faq",))                    # calc ids, in file order
+
+Key paths are tuples, not dotted strings: many keys contain dots
+themselves (``"room.unit.meters"``, ``input."mode.by_area"``).
+``resolve("faq.stairs.q1")`` maps a dotted key, as the app looks it up,
+back to a tuple path.
+
+``set(path, value)`` and ``delete(path)`` queue a patch instead of re-serializing the whole
+document. A new key is inserted after the last member of its parent at the
+parent's indentation; an existing key has only its value span replaced.
+``render()`` splices all patches in one pass, so bytes outside the patched
+spans stay identical. Queries see the text as of the last ``commit()``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Any, Iterator, NamedTuple
+
+from profiling import run_main
+from source_index import RU_JSON
+
+KeyPath = tuple[str, ...]
+
+_TOKEN = re.compile(rb'\s*(?:("(?:[^"\\]|\\.)*")|([{}\[\]:,])|([^\s{}\[\]:,"]+))', re.DOTALL)
+
+
+class Span(NamedTuple):
+    key_start: int  # offset of the key's opening quote (0 for the root)
+    start: int  # value start
+    end: int  # value end (exclusive)
+
+
+class JsonLayoutError(ValueError):
+    pass
+
+
+class LocalizationStore:
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self._index()
+        self._replace: dict[KeyPath, Any] = {}
+        self._insert: dict[KeyPath, dict[str, Any]] = {}
+        self._delete: set[KeyPath] = set()
+
+    @classmethod
+    def load(cls, path: Path = RU_JSON) -> LocalizationStore:
+        return cls(path.read_bytes())
+
+    @property
+    def text(self) -> str:
+        return self.data.decode("utf-8")
+
+    # -- scanning -----------------------------------------------------------
+
+    def _index(self) -> None:
+        self.spans: dict[KeyPath, Span] = {}
+        # object path -> member keys in file order; last member's value end
+        self._members: dict[KeyPath, list[str]] = {}
+        self._tail: dict[KeyPath, int] = {}
+        self._pos = 0
+        start = self._peek()
+        end = self._value(())
+        self.spans[()] = Span(0, start, end)
+        if self.data[end:].strip():
+            raise JsonLayoutError(f"trailing data at byte {end}")
+        first = self._members.get((), [])
+        self.unit = self._indent(self.spans[(first[0],)].key_start) if first else b"  "
+        if not self.unit:
+            self.unit = b"  "
+
+    def _next(self) -> re.Match[bytes]:
+        m = _TOKEN.match(self.data, self._pos)
+        if m is None or m.end() == m.start():
+            raise JsonLayoutError(f"unexpected input at byte {self._pos}")
+        self._pos = m.end()
+        return m
+
+    def _peek(self) -> int:
+        """Offset of the next token."""
+        m = _TOKEN.match(self.data, self._pos)
+        if m is None:
+            raise JsonLayoutError(f"unexpected end of input at byte {self._pos}")
+        return m.start(m.lastindex)
+
+    def _value(self, path: KeyPath | None) -> int:
+        """Scan one value at the cursor; index members when ``path`` is not None."""
+        m = self._next()
+        punct = m.group(2)
+        if punct == b"{":
+            return self._object(path)
+        if punct == b"[":
+            if self.data[self._peek()] == ord("]"):
+                return self._next().end()
+            while True:
+                self._value(None)
+                m = self._next()
+                if m.group(2) == b"]":
+                    return m.end()
+                if m.group(2) != b",":
+                    raise JsonLayoutError(f"expected ',' or ']' at byte {m.start()}")
+        if punct is not None:
+            raise JsonLayoutError(f"unexpected {punct.decode()!r} at byte {m.start()}")
+        return m.end()
+
+    def _object(self, path: KeyPath | None) -> int:
+        members: list[str] = []
+        if path is not None:
+            self._members[path] = members
+        m = self._next()
+        if m.group(2) == b"}":
+            return m.end()
+        while True:
+            if m.group(1) is None:
+                raise JsonLayoutError(f"expected a key at byte {m.start()}")
+            key = json.loads(m.group(1))
+            key_start = m.start(1)
+            if self._next().group(2) != b":":
+                raise JsonLayoutError(f"expected ':' after key {key!r}")
+            start = self._peek()
+            child = None if path is None else path + (key,)
+            end = self._value(child)
+            if child is not None:
+                # Duplicate keys: the last one wins, as with json.loads.
+                if child not in self.spans:
+                    members.append(key)
+                self.spans[child] = Span(key_start, start, end)
+                self._tail[path] = end
+            m = self._next()
+            if m.group(2) == b"}":
+                return m.end()
+            if m.group(2) != b",":
+                raise JsonLayoutError(f"expected ',' or '}}' at byte {m.start()}")
+            m = self._next()
+
+    def _indent(self, offset: int) -> bytes:
+        line_start = self.data.rfind(b"\n", 0, offset) + 1
+        return self.data[line_start:offset]
+
+    # -- queries ------------------------------------------------------------
+
+    def __contains__(self, path: KeyPath) -> bool:
+        return path in self.spans
+
+    def is_object(self, path: KeyPath) -> bool:
+        return path in self._members
+
+    def keys(self, path: KeyPath = ()) -> list[str]:
+        """Member keys of the object at ``path`` in file order ([] if not an object)."""
+        return list(self._members.get(path, ()))
+
+    def raw(self, path: KeyPath) -> bytes:
+        span = self.spans[path]
+        return self.data[span.start : span.end]
+
+    def get(self, path: KeyPath, default: Any = None) -> Any:
+        if path not in self.spans:
+            return default
+        return json.loads(self.raw(path))
+
+    def resolve(self, dotted: str) -> KeyPath | None:
+        """Tuple path for a dotted key (``faq.stairs.q1``), or None if it is not present."""
+        parts = dotted.split(".")
+
+        def walk(base: KeyPath, i: int) -> KeyPath | None:
+            if i == len(parts):
+                return base
+            # Longest component first: "room.unit.meters" before "room".
+            for j in range(len(parts), i, -1):
+                candidate = base + (".".join(parts[i:j]),)
+                if candidate in self.spans:
+                    found = walk(candidate, j)
+                    if found is not None:
+                        return found
+            return None
+
+        return walk((), 0)
+
+    def iter_strings(self, path: KeyPath = ()) -> Iterator[tuple[KeyPath, str]]:
+        """(path, value) for every string leaf below ``path``, decoded lazily."""
+        for key in self._members.get(path, ()):
+            child = path + (key,)
+            if child in self._members:
+                yield from self.iter_strings(child)
+            else:
+                raw = self.raw(child)
+                if raw.startswith(b'"'):
+                    yield child, json.loads(raw)
+
+    # -- patches ------------------------------------------------------------
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._replace or self._insert or self._delete)
+
+    def set(self, path: KeyPath, value: Any) -> None:
+        """Queue ``path = value``; missing parent objects are created."""
+        if not path:
+            raise ValueError("cannot replace the root object")
+        for i in range(1, len(path)):
+            if path[:i] in self._replace:
+                # Inside a pending replacement: edit its value instead.
+                self._assign(self._replace[path[:i]], path[i:], value, path[:i])
+                return
+        if path in self.spans:
+            self._drop_pending(path)
+            self._replace[path] = value
+            return
+        anchor = path[:-1]
+        while anchor not in self.spans:
+            anchor = anchor[:-1]
+        if anchor not in self._members:
+            raise ValueError(f"{'.'.join(anchor)} is not an object")
+        self._assign(self._insert.setdefault(anchor, {}), path[len(anchor) :], value, anchor)
+
+    def delete(self, path: KeyPath) -> None:
+        """Queue removal of the member at ``path`` (with its separating comma)."""
+        if not path:
+            raise ValueError("cannot delete the root object")
+        if path not in self.spans:
+            raise KeyError(path)
+        self._drop_pending(path)
+        self._delete.add(path)
+
+    def _drop_pending(self, path: KeyPath) -> None:
+        """Forget queued edits at or below ``path``."""
+        size = len(path)
+        for pending in [p for p in self._replace if p[:size] == path]:
+            del self._replace[pending]
+        for pending in [p for p in self._insert if p[:size] == path]:
+            del self._insert[pending]
+        self._delete -= {p for p in self._delete if p[:size] == path}
+
+    @staticmethod
+    def _assign(node: Any, rest: KeyPath, value: Any, base: KeyPath) -> None:
+        for key in rest[:-1]:
+            node = node.setdefault(key, {})
+            if not isinstance(node, dict):
+                raise ValueError(f"{'.'.join(base + rest)}: {key} is not an object")
+        if not isinstance(node, dict):
+            raise ValueError(f"{'.'.join(base)} is not an object")
+        node[rest[-1]] = value
+
+    def _dump(self, value: Any, indent: bytes) -> bytes:
+        out = json.dumps(value, ensure_ascii=False, indent=len(self.unit)).encode("utf-8")
+        return out.replace(b"\n", b"\n" + indent)
+
+    def _patches(self) -> list[tuple[int, int, bytes]]:
+        patches: list[tuple[int, int, bytes]] = []
+        for path, value in self._replace.items():
+            span = self.spans[path]
+            patches.append((span.start, span.end, self._dump(value, self._indent(span.key_start))))
+        for path, new in self._insert.items():
+            members = self._members[path]
+            if members:
+                indent = self._indent(self.spans[path + (members[0],)].key_start)
+            else:
+                indent = self._indent(self.spans[path].key_start) + (self.unit if path else b"")
+            body = b",\n".join(
+                indent + json.dumps(key, ensure_ascii=False).encode("utf-8") + b": " + self._dump(v, indent)
+                for key, v in new.items()
+            )
+            if members:
+                at = self._tail[path]
+                patches.append((at, at, b",\n" + body))
+            else:
+                span = self.spans[path]
+                closing = indent[: len(indent) - len(self.unit)]
+                patches.append((span.start + 1, span.end - 1, b"\n" + body + b"\n" + closing))
+        by_parent: dict[KeyPath, set[str]] = {}
+        for path in self._delete:
+            by_parent.setdefault(path[:-1], set()).add(path[-1])
+        for parent, doomed in by_parent.items():
+            patches.extend(self._delete_patches(parent, doomed))
+        patches.sort(key=lambda p: (p[0], p[1]))
+        return patches
+
+    def _delete_patches(self, parent: KeyPath, doomed: set[str]) -> Iterator[tuple[int, int, bytes]]:
+        members = self._members[parent]
+        if doomed.issuperset(members):
+            span = self.spans[parent]
+            yield span.start + 1, span.end - 1, b""
+            return
+        i = 0
+        while i < len(members):
+            if members[i] not in doomed:
+                i += 1
+                continue
+            j = i
+            while j + 1 < len(members) and members[j + 1] in doomed:
+                j += 1
+            last = self.spans[parent + (members[j],)]
+            if i > 0:
+                # From the end of the member before the run, taking the comma along.
+                yield self.spans[parent + (members[i - 1],)].end, last.end, b""
+            else:
+                yield self.spans[parent + (members[0],)].key_start, self.spans[parent + (members[j + 1],)].key_start, b""
+            i = j + 1
+
+    def render(self) -> bytes:
+        """The document with all queued patches spliced in."""
+        if not self.dirty:
+            return self.data
+        parts: list[bytes] = []
+        pos = 0
+        for start, end, replacement in self._patches():
+            if start < pos:
+                raise ValueError("overlapping edits; commit() between them")
+            parts.append(self.data[pos:start])
+            parts.append(replacement)
+            pos = end
+        parts.append(self.data[pos:])
+        return b"".join(parts)
+
+    def commit(self) -> bool:
+        """Apply queued patches and re-index; return True if the bytes changed."""
+        if not self.dirty:
+            return False
+        new = self.render()
+        changed = new != self.data
+        self.__init__(new)
+        return changed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Query the ru.json key index.")
+    parser.add_argument("keys", nargs="*", help="dotted keys to look up (e.g. faq.stairs.q1)")
+    parser.add_argument("--file", type=Path, default=RU_JSON)
+    args = parser.parse_args()
+
+    store = LocalizationStore.load(args.file)
+    if not args.keys:
+        print(
+            f"{args.file.name}: {len(store.data)} bytes, {len(store.spans)} keys,"
+            f" {len(store.keys())} namespaces, {len(store.keys(('faq',)))} FAQ blocks"
+        )
+        return 0
+    missing = 0
+    for dotted in args.keys:
+        path = store.resolve(dotted)
+        if path is None:
+            missing += 1
+            print(f"{dotted}: MISSING")
+        else:
+            span = store.spans[path]
+            print(f"{dotted}: bytes {span.start}-{span.end} {store.raw(path)[:80].decode('utf-8', 'replace')}")
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_main(main))
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""Report unused, missing and dynamically built localization keys.
+
+ru.json is flattened into the dotted keys AppLocalizations serves
+(`calculator.stairs.title`, plus `calculator.stairs` for objects with a
+`title`, plus `faq.<alias>.*`) and loaded into a trie of dot-separated
+segments. Every Dart file is tokenized once (dart_lexer, cached) and each
+string literal is classified:
+
+    static     'input.roomWidth'        exact key -> used; a key-shaped
+               literal passed to translate() or a `...Key:` argument that
+               is not in ru.json -> missing
+    prefix     'faq.stairs'             inner trie node -> its whole subtree is used
+    dynamic    'faq.$calcId.q$i'        interpolation -> every key matching the
+               pattern (walked through the trie) is treated as used, as long
+               as the first segment is literal; '$a.$b' is reported but
+               would match everything, so it marks nothing
+
+translate() calls whose argument is not a literal are counted separately as
+dynamic call sites; whatever they load cannot be known statically.
+
+    python tools/l10n_usage.py              # summary
+    python tools/l10n_usage.py --unused     # list unused keys
+    python tools/l10n_usage.py -j 0 --json usage.json  # full report for other tools
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Iterator, NamedTuple
+
+from dart_lexer import IDENT, PUNCT, STRING, tokenize_cached
+from faq_aliases import ALIASES_KEY, load_aliases, resolve
+from l10n_store import LocalizationStore
+from parallel import add_jobs_argument, map_files
+from profiling import run_main
+from source_index import LIB, ROOT, RU_JSON
+
+KEY_SHAPE = re.compile(r"[a-z][A-Za-z0-9_]*(?:\.[A-Za-z0-9_]+)+")
+# `$name` / `${...}` inside a Dart string (after escapes are removed)
+INTERPOLATION = re.compile(r"\$(?:\{[^}]*\}|[A-Za-z_]\w*)")
+WILDCARD = "\0"
+
+
+class Literal(NamedTuple):
+    kind: str  # "static" | "dynamic" | "call"
+    value: str  # key, pattern with WILDCARD, or the call's source text
+    line: int
+    keyed: bool  # argument of translate() or of a `...Key:` parameter
+
+
+def _decode(token: str) -> tuple[str, bool]:
+    """(text, has_interpolation) of a Dart string literal token."""
+    raw = token.startswith("r")
+    body = token[1:] if raw else token
+    quote = body[:3] if body[:3] in ("'''", '"""') else body[0]
+    body = body[len(quote) : len(body) - len(quote)]
+    if raw:
+        return body, False
+    has_interp = False
+    out: list[str] = []
+    i = 0
+    while i < len(body):
+        c = body[i]
+        if c == "\\" and i + 1 < len(body):
+            out.append(body[i + 1] if body[i + 1] != "$" else "\\$")
+            i += 2
+            continue
+        if c == "$":
+            m = INTERPOLATION.match(body, i)
+            if m:
+                out.append(WILDCARD)
+                has_interp = True
+                i = m.end()
+                continue
+        out.append(c)
+        i += 1
+    return "".join(out).replace("\\$", "$"), has_interp
+
+
+def scan_file(path: Path) -> list[Literal]:
+    text = path.read_text(encoding="utf-8")
+    tokens = tokenize_cached(text)
+    starts, ends, kinds = tokens.starts, tokens.ends, tokens.kinds
+    lines = [0] + [m.end() for m in re.finditer("\n", text)]
+    found: list[Literal] = []
+    for i in range(len(kinds)):
+        kind = kinds[i]
+        if kind == IDENT and text[starts[i] : ends[i]] == "translate":
+            # `.translate(<not a string literal>)` -> dynamic call site
+            # (`Transform.translate(offset: ...)` passes a named argument)
+            if (
+                0 < i < len(kinds) - 3
+                and text[starts[i - 1]] == "."
+                and text[starts[i + 1]] == "("
+                and kinds[i + 2] != STRING
+                and text[starts[i + 3]] != ":"
+            ):
+                close = text.find(")", starts[i + 2])
+                found.append(Literal("call", text[starts[i + 2] : close], bisect_right(lines, starts[i]), True))
+            continue
+        if kind != STRING:
+            continue
+        value, dynamic = _decode(text[starts[i] : ends[i]])
+        if not ("." in value and KEY_SHAPE.fullmatch(value.replace(WILDCARD, "x"))):
+            continue
+        keyed = False
+        if i >= 2 and kinds[i - 1] == PUNCT:
+            before = text[starts[i - 1]]
+            name = text[starts[i - 2] : ends[i - 2]] if kinds[i - 2] == IDENT else ""
+            keyed = (before == "(" and name == "translate") or (
+                before == ":" and (name.endswith("Key") or name.endswith("Prefix"))
+            )
+        line = bisect_right(lines, starts[i])
+        found.append(Literal("dynamic" if dynamic else "static", value, line, keyed))
+    return found
+
+
+class KeyTrie:
+    """Dotted keys as a trie of segments; ``_end`` marks a complete key."""
+
+    def __init__(self, keys: list[str]) -> None:
+        self.root: dict = {}
+        for key in keys:
+            node = self.root
+            for segment in key.split("."):
+                node = node.setdefault(segment, {})
+            node["_end"] = key
+
+    def node(self, key: str) -> dict | None:
+        node = self.root
+        for segment in key.split("."):
+            node = node.get(segment)
+            if node is None:
+                return None
+        return node
+
+    @staticmethod
+    def subtree(node: dict) -> Iterator[str]:
+        for segment, child in node.items():
+            if segment == "_end":
+                yield child
+            else:
+                yield from KeyTrie.subtree(child)
+
+    def match(self, pattern: str) -> set[str]:
+        """Keys matching ``pattern``; a segment that is only a wildcard spans one or more segments."""
+        parts = pattern.split(".")
+        found: set[str] = set()
+
+        def walk(node: dict, i: int) -> None:
+            if i == len(parts):
+                if "_end" in node:
+                    found.add(node["_end"])
+                return
+            part = parts[i]
+            if part == WILDCARD:
+                for segment, child in node.items():
+                    if segment != "_end":
+                        walk(child, i + 1)  # one segment
+                        walk_deeper(child, i)  # or more
+                return
+            if WILDCARD not in part:
+                child = node.get(part)
+                if child is not None:
+                    walk(child, i + 1)
+                return
+            regex = re.compile(".*".join(map(re.escape, part.split(WILDCARD))))
+            for segment, child in node.items():
+                if segment != "_end" and regex.fullmatch(segment):
+                    walk(child, i + 1)
+
+        def walk_deeper(node: dict, i: int) -> None:
+            for segment, child in node.items():
+                if segment != "_end":
+                    walk(child, i + 1)
+                    walk_deeper(child, i)
+
+        walk(self.root, 0)
+        return found
+
+
+def flatten(store: LocalizationStore) -> dict[str, str]:
+    """Keys as AppLocalizations serves them -> the ru.json key that holds the text.
+
+    Besides every string leaf this includes `a.b` for an object with a
+    `title` (served from `a.b.title`) and `faq.<alias>.*` (served from the
+    alias target's block).
+    """
+    keys: dict[str, str] = {}
+    for path, _ in store.iter_strings():
+        if path[0] == ALIASES_KEY:
+            continue
+        key = ".".join(path)
+        keys[key] = key
+        if path[-1] == "title" and len(path) > 1:
+            keys.setdefault(".".join(path[:-1]), key)
+    aliases = load_aliases(store)
+    for alias in aliases:
+        target = resolve(aliases, alias)
+        for path, _ in store.iter_strings(("faq", target)):
+            keys[f"faq.{alias}.{'.'.join(path[2:])}"] = ".".join(path)
+    return keys
+
+
+class Usage(NamedTuple):
+    keys: int  # ru.json string keys
+    unused: list[str]
+    missing: dict[str, list[str]]  # key -> ["file:line", ...]
+    dynamic: dict[str, tuple[int, int]]  # pattern -> (sites, keys matched)
+    calls: list[str]  # "file:line  translate(expr)"
+
+
+def analyze(paths: list[Path], jobs: int = 1) -> Usage:
+    served = flatten(LocalizationStore.load(RU_JSON))
+    trie = KeyTrie(list(served))
+    used: set[str] = set()
+    missing: dict[str, list[str]] = defaultdict(list)
+    patterns: Counter[str] = Counter()
+    calls: list[str] = []
+    for path, literals in zip(paths, map_files(scan_file, paths, jobs)):
+        where = path.relative_to(ROOT).as_posix()
+        for lit in literals:
+            if lit.kind == "call":
+                calls.append(f"{where}:{lit.line}  translate({lit.value})")
+            elif lit.kind == "dynamic":
+                patterns[lit.value] += 1
+            elif lit.value in served:
+                used.add(lit.value)
+            else:
+                node = trie.node(lit.value)
+                if node is not None:
+                    used.update(trie.subtree(node))
+                elif lit.keyed:
+                    missing[lit.value].append(f"{where}:{lit.line}")
+    dynamic = {}
+    for pattern, sites in patterns.items():
+        if WILDCARD in pattern.split(".", 1)[0]:
+            dynamic[pattern.replace(WILDCARD, "*")] = (sites, 0)
+            continue
+        matched = trie.match(pattern)
+        used |= matched
+        dynamic[pattern.replace(WILDCARD, "*")] = (sites, len(matched))
+    sources = set(served.values())
+    unused = sorted(sources - {served[key] for key in used})
+    return Usage(len(sources), unused, dict(missing), dynamic, calls)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Report unused, missing and dynamic localization keys.")
+    parser.add_argument("paths", nargs="*", type=Path, help="Dart files or directories (default lib/)")
+    parser.add_argument("--unused", action="store_true", help="list every unused key")
+    parser.add_argument("--json", type=Path, metavar="OUT", help="write the full report as JSON")
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    roots = [p.resolve() for p in args.paths] or [LIB]
+    paths = sorted({f for r in roots for f in ([r] if r.is_file() else r.rglob("*.dart"))})
+    usage = analyze(paths, args.jobs)
+    unused = usage.unused
+
+    print(f"Dart files: {len(paths)}, keys: {usage.keys}, unused: {len(unused)}")
+    by_namespace = Counter(k.split(".", 1)[0] for k in unused)
+    print("Unused by namespace: " + ", ".join(f"{ns} {n}" for ns, n in by_namespace.most_common(10)))
+    print(f"\nMissing keys: {len(usage.missing)}")
+    for key, sites in sorted(usage.missing.items()):
+        print(f"  {key}  ({', '.join(sites[:3])}{' ...' if len(sites) > 3 else ''})")
+    print(f"\nDynamic key patterns: {len(usage.dynamic)}")
+    for pattern, (sites, matched) in sorted(usage.dynamic.items()):
+        print(f"  {pattern}  sites={sites} keys={matched}")
+    print(f"\nDynamic translate() call sites: {len(usage.calls)}")
+    if args.unused:
+        print(f"\nUnused keys: {len(unused)}")
+        for key in unused:
+            print(f"  {key}")
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(
+            json.dumps(
+                {
+                    "unused": unused,
+                    "missing": usage.missing,
+                    "dynamic": {p: {"sites": s, "keys": m} for p, (s, m) in usage.dynamic.items()},
+                    "dynamic_calls": usage.calls,
+                },
+                ensure_ascii=False,
+                indent=2,
+            )
+            + "\n",
+            encoding="utf-8",
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_main(main))
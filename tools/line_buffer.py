@@ -0,0 +1,102 @@
+"""Line-addressed edits over one text buffer, applied as a single splice.
+
+LineBuffer keeps the file as one str plus an array('I') of line-start
+offsets. Deletions and insertions are queued against the *original* line
+numbers and applied together in commit(), which rebuilds the text in one
+pass, so k edits on an n-line file cost O(n + k) instead of k list
+deletions. A buffer with no queued edits is never written back.
+"""
+from __future__ import annotations
+
+from array import array
+from pathlib import Path
+from typing import Iterator
+
+
+class LineBuffer:
+    __slots__ = ("text", "starts", "_deletes", "_inserts")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.starts = array("I", [0])
+        find = text.find
+        pos = find("\n")
+        while pos >= 0:
+            self.starts.append(pos + 1)
+            pos = find("\n", pos + 1)
+        self._deletes: set[int] = set()
+        # 0-based index of the line to insert before -> lines (without "\n")
+        self._inserts: dict[int, list[str]] = {}
+
+    @classmethod
+    def read(cls, path: Path) -> LineBuffer:
+        return cls(path.read_text(encoding="utf-8"))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def line(self, idx: int) -> str:
+        """0-based line ``idx`` without its newline (original numbering)."""
+        start = self.starts[idx]
+        end = self.starts[idx + 1] - 1 if idx + 1 < len(self.starts) else len(self.text)
+        return self.text[start:end]
+
+    def lines(self) -> Iterator[str]:
+        for i in range(len(self.starts)):
+            yield self.line(i)
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._deletes or self._inserts)
+
+    def delete(self, idx: int) -> None:
+        self._deletes.add(idx)
+
+    def insert(self, idx: int, line: str) -> None:
+        """Queue ``line`` before original line ``idx`` (``len(self)`` appends)."""
+        self._inserts.setdefault(idx, []).append(line)
+
+    def render(self) -> str:
+        """The text with all queued edits applied."""
+        if not self.dirty:
+            return self.text
+        text, starts = self.text, self.starts
+        n = len(starts)
+        parts: list[str] = []
+        pos = 0  # start of the current untouched run
+        for idx in sorted(self._deletes | self._inserts.keys()):
+            if idx >= n:
+                break  # appends are handled below
+            parts.append(text[pos : starts[idx]])
+            pos = starts[idx]
+            if idx in self._inserts:
+                parts.append("".join(line + "\n" for line in self._inserts[idx]))
+            if idx in self._deletes:
+                pos = starts[idx + 1] if idx + 1 < n else len(text)
+        parts.append(text[pos:])
+        result = "".join(parts)
+        if n - 1 in self._deletes and result.endswith("\n"):
+            # The last line had no newline; drop the one that now ends the
+            # previous line, as "\n".join() over the remaining lines would.
+            result = result[:-1]
+        appended = [line for idx, lines in self._inserts.items() if idx >= n for line in lines]
+        if appended:
+            kept_any = len(self._deletes) < n or any(idx < n for idx in self._inserts)
+            result += ("\n" if kept_any else "") + "\n".join(appended)
+        return result
+
+    def commit(self) -> bool:
+        """Apply queued edits to ``self.text``; return True if anything changed."""
+        if not self.dirty:
+            return False
+        new_text = self.render()
+        changed = new_text != self.text
+        self.__init__(new_text)
+        return changed
+
+    def write(self, path: Path) -> bool:
+        """Commit and write to ``path`` only if the text changed."""
+        if not self.commit():
+            return False
+        path.write_text(self.text, encoding="utf-8", newline="\n")
+        return True
@@ -1,14 +1,13 @@
-import json
-import re
-from pathlib import Path
+from source_index import SourceIndex
+from xref_graph import load_graph
 
-ROOT = Path(__file__).resolve().parents[1]
-ids: set[str] = set()
-for p in (ROOT / "lib/domain/calculators").rglob("*.dart"):
-    ids.update(re.findall(r"id: '([^']+)'", p.read_text(encoding="utf-8")))
+graph = load_graph()
+with SourceIndex() as index:
+    aliases = index.faq_aliases()
+ids = {c for c in graph.nodes("calc") if graph.linked("calc", c, "definition")}
+faq = graph.nodes("faq")
 
-faq = json.load(open(ROOT / "assets/lang/ru.json", encoding="utf-8")).get("faq", {})
-missing = sorted(ids - faq.keys())
-print(len(ids), "calculators", len(faq), "faq", len(missing), "missing")
+missing = sorted(c for c in ids if not graph.linked("calc", c, "faq"))
+print(len(ids), "calculators", len(faq), "faq", len(aliases), "aliases", len(missing), "missing")
 for m in missing:
     print(m)
@@ -1,9 +1,25 @@
 #!/usr/bin/env python3
-"""Migrate custom calculator screens to CalculatorEngine."""
+"""Migrate custom calculator screens to CalculatorEngine.
 
+FILE_TO_ID below is the default table; pass --table to run the same
+migration over another JSON/CSV table of screens.
+"""
+
+import argparse
+import csv
+import json
 import re
+from collections import Counter
+from functools import partial
 from pathlib import Path
 
+from dart_lexer import sub_code
+from line_buffer import LineBuffer
+from multi_replace import MultiReplacer
+from parallel import add_jobs_argument, map_files
+from profiling import run_main
+from writeback import WriteBack
+
 ROOT = Path(__file__).resolve().parents[1] / "lib" / "presentation" / "views"
 
 FILE_TO_ID = {
@@ -59,69 +75,110 @@ FIELD_RE = re.compile(
 )
 
 
-def transform(path: Path, calc_id: str) -> bool:
-    text = path.read_text(encoding="utf-8")
-    orig = text
+# Literal call sites -> CalculatorEngine, applied in a single scan.
+CALL_REPLACER = MultiReplacer(
+    {
+        "_useCase.call(state.toInputs(), _priceList)":
+            "CalculatorEngine.calculate('${calc_id}', state.toInputs(), priceList: _priceList)",
+        "_calculator(_buildCalculationInputs(), <PriceItem>[])":
+            "CalculatorEngine.calculate('${calc_id}', _buildCalculationInputs()",
+        "_calculator(_buildCalculationInputs(), const [])":
+            "CalculatorEngine.calculate('${calc_id}', _buildCalculationInputs()",
+        "_calculator(_buildCalculationInputs(), [])":
+            "CalculatorEngine.calculate('${calc_id}', _buildCalculationInputs()",
+        "_calculator(inputs, [])":
+            "CalculatorEngine.calculate('${calc_id}', inputs)",
+    }
+)
 
-    text = FIELD_RE.sub("", text)
 
-    text = text.replace(
-        "_useCase.call(state.toInputs(), _priceList)",
-        f"CalculatorEngine.calculate('{calc_id}', state.toInputs(), priceList: _priceList)",
-    )
+def load_table(path: Path) -> dict[str, str]:
+    """Read a FILE_TO_ID table: a JSON object, or CSV rows of `path,calc_id`."""
+    text = path.read_text(encoding="utf-8")
+    if path.suffix == ".json":
+        return dict(json.loads(text))
+    rows = csv.reader(line for line in text.splitlines() if line and not line.startswith("#"))
+    return {rel.strip(): calc_id.strip() for rel, calc_id in rows}
+
 
-    replacements = [
-        (
-            "_calculator(_buildCalculationInputs(), <PriceItem>[])",
-            f"CalculatorEngine.calculate('{calc_id}', _buildCalculationInputs()",
-        ),
-        (
-            "_calculator(_buildCalculationInputs(), const [])",
-            f"CalculatorEngine.calculate('{calc_id}', _buildCalculationInputs()",
-        ),
-        (
-            "_calculator(_buildCalculationInputs(), [])",
-            f"CalculatorEngine.calculate('{calc_id}', _buildCalculationInputs()",
-        ),
-        (
-            "_calculator(inputs, [])",
-            f"CalculatorEngine.calculate('{calc_id}', inputs)",
-        ),
-    ]
-    for old, new in replacements:
-        text = text.replace(old, new)
+def transform_counts(text: str, calc_id: str) -> tuple[str, Counter[str]]:
+    """Return (new text, literal -> replacements); FIELD_RE hits count as "fields"."""
+    text, removed = sub_code(FIELD_RE, "", text)
+    text, counts = CALL_REPLACER.replace(text, {"calc_id": calc_id})
+    if removed:
+        counts["fields"] = removed
 
     if ENGINE_IMPORT not in text:
-        lines = text.splitlines(keepends=True)
+        buf = LineBuffer(text)
         insert_at = 0
-        for i, line in enumerate(lines):
+        for i, line in enumerate(buf.lines()):
             if line.startswith("import '../../../domain/") or line.startswith(
                 "import '../../domain/"
             ):
                 insert_at = i + 1
-        lines.insert(insert_at, ENGINE_IMPORT + "\n")
-        text = "".join(lines)
+        buf.insert(insert_at, ENGINE_IMPORT)
+        text = buf.render()
+        counts["import"] = 1
+    return text, counts
+
+
+def transform_text(text: str, calc_id: str) -> str:
+    return transform_counts(text, calc_id)[0]
 
+
+def transform(path: Path, calc_id: str) -> bool:
+    orig = path.read_text(encoding="utf-8")
+    text = transform_text(orig, calc_id)
     if text != orig:
         path.write_text(text, encoding="utf-8")
         return True
     return False
 
 
+def _migrate_file(table: dict[str, str], path: Path) -> tuple[str | None, Counter[str]]:
+    """Worker: return (new text or None, per-pattern counts) without writing."""
+    orig = path.read_text(encoding="utf-8")
+    text, counts = transform_counts(orig, table[path.relative_to(ROOT).as_posix()])
+    return (text if text != orig else None), counts
+
+
 def main() -> None:
-    changed: list[str] = []
-    for rel, calc_id in FILE_TO_ID.items():
+    parser = argparse.ArgumentParser(description="Migrate calculator screens to CalculatorEngine.")
+    parser.add_argument(
+        "--table",
+        type=Path,
+        help="FILE_TO_ID table (JSON object or `path,calc_id` CSV, paths relative to lib/presentation/views)",
+    )
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    table = load_table(args.table) if args.table else FILE_TO_ID
+    paths: list[Path] = []
+    for rel in table:
         path = ROOT / rel
         if not path.exists():
             print("MISSING", path)
             continue
-        if transform(path, calc_id):
-            changed.append(rel)
+        paths.append(path)
+
+    changed: list[str] = []
+    totals: Counter[str] = Counter()
+    with WriteBack() as wb:
+        for path, (text, counts) in zip(paths, map_files(partial(_migrate_file, table), paths, args.jobs)):
+            totals.update(counts)
+            if text is not None:
+                wb.stage(path, text)
+                changed.append(path.relative_to(ROOT).as_posix())
 
     print(f"Updated {len(changed)} files:")
     for name in sorted(changed):
         print(" ", name)
+    if totals:
+        print("Replacements:")
+        for pattern, n in totals.most_common():
+            print(f"  {n:4d}  {pattern}")
+    print(wb.stats)
 
 
 if __name__ == "__main__":
-    main()
+    run_main(main)
@@ -0,0 +1,60 @@
+"""Single-pass multi-literal replacement.
+
+All literals are combined into one alternation regex (longest first, so a
+literal never loses to one of its own prefixes) and a dispatch table maps
+each matched literal to its replacement. The text is scanned and copied
+once, however many literals there are, and per-literal hit counts come
+back with the result.
+
+Replacements may be templates filled from ``params``, so one compiled
+replacer serves every file of a migration. Only `${name}` with a name in
+``params`` is substituted; Dart braces and other `$` interpolations are
+copied as they are:
+
+    r = MultiReplacer({"_calculator(inputs, [])": "CalculatorEngine.calculate('${calc_id}', inputs)"})
+    text, counts = r.replace(text, {"calc_id": "stairs"})
+"""
+from __future__ import annotations
+
+import re
+import string
+from collections import Counter
+from typing import Mapping
+
+
+class _Template(string.Template):
+    # Braced placeholders only, and no `$$` escape: Dart code uses `$` too.
+    pattern = r"""
+    \$(?:
+        (?P<escaped>(?!))
+      | (?P<named>(?!))
+      | \{(?P<braced>[_a-z][_a-z0-9]*)\}
+      | (?P<invalid>(?!))
+    )
+    """
+
+
+class MultiReplacer:
+    __slots__ = ("table", "templates", "pattern")
+
+    def __init__(self, table: Mapping[str, str]) -> None:
+        self.table = dict(table)
+        self.templates = {k: _Template(v) for k, v in self.table.items()}
+        self.pattern = re.compile(
+            "|".join(re.escape(k) for k in sorted(self.table, key=len, reverse=True))
+        )
+
+    def replace(self, text: str, params: Mapping[str, str] | None = None) -> tuple[str, Counter[str]]:
+        """Return (new text, literal -> replacements made)."""
+        counts: Counter[str] = Counter()
+        if params is None:
+            resolved = self.table
+        else:
+            resolved = {k: t.safe_substitute(params) for k, t in self.templates.items()}
+
+        def dispatch(m: re.Match[str]) -> str:
+            literal = m.group()
+            counts[literal] += 1
+            return resolved[literal]
+
+        return self.pattern.sub(dispatch, text), counts
@@ -0,0 +1,76 @@
+"""Process-pool helpers for the file-rewriting codemods (`--jobs N`).
+
+Files are packed into N shards of roughly equal total size (largest file
+first into the lightest shard), each shard runs in one worker process, and
+results come back in the order the paths were given so output stays stable
+regardless of scheduling.
+
+Worker functions must be defined at module level so they can be pickled.
+"""
+from __future__ import annotations
+
+import argparse
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Sequence, TypeVar
+
+import profiling
+
+R = TypeVar("R")
+
+
+def add_jobs_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="worker processes (0 = one per CPU, default 1 = serial)",
+    )
+
+
+def resolve_jobs(jobs: int) -> int:
+    return (os.cpu_count() or 1) if jobs <= 0 else jobs
+
+
+def shard_by_size(paths: Sequence[Path], shards: int) -> list[list[int]]:
+    """Split ``paths`` into ``shards`` lists of indices with balanced byte totals."""
+    sized = sorted(
+        ((p.stat().st_size, i) for i, p in enumerate(paths)),
+        reverse=True,
+    )
+    heap = [(0, n) for n in range(min(shards, len(paths)))]
+    buckets: list[list[int]] = [[] for _ in heap]
+    for size, i in sized:
+        total, n = heapq.heappop(heap)
+        buckets[n].append(i)
+        heapq.heappush(heap, (total + size, n))
+    return buckets
+
+
+def _run_shard(func: Callable[[Path], R], paths: list[Path]) -> list[R]:
+    return [func(p) for p in paths]
+
+
+def map_files(func: Callable[[Path], R], paths: Sequence[Path], jobs: int = 1) -> list[R]:
+    """Apply ``func`` to every path; results are returned in input order.
+
+    Runs serially under --profile, which cannot see into worker processes.
+    """
+    jobs = resolve_jobs(jobs)
+    if jobs <= 1 or profiling.active() or len(paths) <= 1:
+        return [func(p) for p in paths]
+
+    buckets = shard_by_size(paths, jobs)
+    results: list[R | None] = [None] * len(paths)
+    with ProcessPoolExecutor(max_workers=len(buckets)) as pool:
+        futures = [
+            (bucket, pool.submit(_run_shard, func, [paths[i] for i in bucket]))
+            for bucket in buckets
+        ]
+        for bucket, future in futures:
+            for i, result in zip(bucket, future.result()):
+                results[i] = result
+    return results  # type: ignore[return-value]
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""Pack test/parity_fixtures/*.parity.json into one indexed binary bundle.
+
+Each fixture is split into its structure and its values:
+
+    strings   every key, id, description and material name, stored once
+    shapes    a case's structure as a token list (object/array sizes, key
+              string ids, value slots); cases with the same keys share a shape
+    numbers   one float64 column plus an is-int flag column, each case's
+              numbers a contiguous run
+    strrefs   one u32 string id per string slot
+    fixtures  one record per file, sorted by calculator_id (binary search)
+    cases     one record per case: shape, number and string offsets, case id
+
+Decoding a case walks its shape and reads its slice of the columns, so
+opening the bundle and looking up one case costs a header read and a
+bisect, not a JSON parse per file. The build decodes every fixture from the
+written bytes and compares it with its JSON source (key order, int vs
+float, exact values) and, for files in `json.dumps(indent=2)` layout,
+byte for byte; nothing is written if any fixture differs.
+
+    python tools/parity_bundle.py                  # -> build/parity_fixtures.bundle
+    python tools/parity_bundle.py --check          # is the bundle current and exact?
+    python tools/parity_bundle.py --show stairs defaults
+
+    bundle = ParityBundle.open()
+    bundle.case("stairs", "defaults")["expected_totals"]["stepCount"]
+
+compare_parity_registry.py reads calculator ids from the bundle through
+open_current() and parses the JSON files only when the bundle is missing
+or older than a fixture.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import mmap
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Iterator
+
+from profiling import run_main
+from source_index import ROOT, rel, shown
+
+FIXTURES = ROOT / "test/parity_fixtures"
+OUT_PATH = ROOT / "build/parity_fixtures.bundle"
+MAGIC = b"PFXB"
+VERSION = 1
+
+# Shape tokens: op in the low 3 bits, argument above.
+OBJ, KEY, ARR, NUM, STR, LIT, CASES = range(7)
+LITERALS = (False, True, None)
+MAX_EXACT_INT = 2**53
+
+HEADER = struct.Struct("<4sI20sI")  # magic, version, sources sha1, section count
+SECTION = struct.Struct("<II")  # offset, length
+# Records are u32 rows: fixture (file, calculator_id, shape, num_start, str_start,
+# first_case, case_count) and case (shape, num_start, str_start, case id).
+SECTIONS = ("strings", "string_offsets", "shapes", "shape_offsets", "numbers", "int_flags", "strrefs", "fixtures", "cases")
+# Fixture flags stored in the spare high bits of `file`: layout of the source text.
+TRAILING_NEWLINE = 1 << 31
+NOT_CANONICAL = 1 << 30
+FLAG_MASK = TRAILING_NEWLINE | NOT_CANONICAL
+
+
+def fixture_paths(directory: Path = FIXTURES) -> list[Path]:
+    return sorted(directory.glob("*.parity.json"))
+
+
+def sources_sha1(paths: list[Path]) -> bytes:
+    h = hashlib.sha1()
+    for path in paths:
+        h.update(f"{path.name}\0".encode())
+        h.update(hashlib.sha1(path.read_bytes()).digest())
+    return h.digest()
+
+
+def _canonical(doc: Any) -> str:
+    return json.dumps(doc, ensure_ascii=False, indent=2)
+
+
+class _Writer:
+    def __init__(self) -> None:
+        self.strings: dict[str, int] = {}
+        self.shapes: dict[tuple[int, ...], int] = {}
+        self.numbers = array("d")
+        self.int_flags = bytearray()
+        self.strrefs = array("I")
+        self.fixtures = array("I")
+        self.cases = array("I")
+
+    def intern(self, text: str) -> int:
+        return self.strings.setdefault(text, len(self.strings))
+
+    def _encode(self, value: Any, tokens: list[int]) -> None:
+        if isinstance(value, dict):
+            tokens.append(OBJ | len(value) << 3)
+            for key, nested in value.items():
+                tokens.append(KEY | self.intern(key) << 3)
+                self._encode(nested, tokens)
+        elif isinstance(value, list):
+            tokens.append(ARR | len(value) << 3)
+            for nested in value:
+                self._encode(nested, tokens)
+        elif isinstance(value, bool) or value is None:
+            tokens.append(LIT | LITERALS.index(value) << 3)
+        elif isinstance(value, (int, float)):
+            if isinstance(value, int) and abs(value) > MAX_EXACT_INT:
+                raise ValueError(f"integer {value} does not fit a float64 exactly")
+            tokens.append(NUM)
+            self.numbers.append(value)
+            self.int_flags.append(isinstance(value, int))
+        elif isinstance(value, str):
+            tokens.append(STR)
+            self.strrefs.append(self.intern(value))
+        else:
+            raise TypeError(f"unsupported JSON value {value!r}")
+
+    def record(self, value: Any) -> tuple[int, int, int]:
+        """(shape, num_start, str_start) of ``value``; its numbers and strings are appended."""
+        num_start, str_start = len(self.numbers), len(self.strrefs)
+        tokens: list[int] = []
+        if isinstance(value, dict) and "cases" in value:
+            # Fixture header: the cases are stored as separate records.
+            tokens.append(OBJ | len(value) << 3)
+            for key, nested in value.items():
+                tokens.append(KEY | self.intern(key) << 3)
+                if key == "cases":
+                    tokens.append(CASES)
+                else:
+                    self._encode(nested, tokens)
+        else:
+            self._encode(value, tokens)
+        shape = self.shapes.setdefault(tuple(tokens), len(self.shapes))
+        return shape, num_start, str_start
+
+    def add_fixture(self, name: str, text: str) -> None:
+        doc = json.loads(text)
+        canonical = _canonical(doc)
+        flags = 0
+        if canonical + "\n" == text:
+            flags = TRAILING_NEWLINE
+        elif canonical != text:
+            flags = NOT_CANONICAL
+        first_case = len(self.cases) // 4
+        for case in doc["cases"]:
+            self.cases.extend((*self.record(case), self.intern(str(case["id"]))))
+        self.fixtures.extend((
+            self.intern(name) | flags,
+            self.intern(doc["calculator_id"]),
+            *self.record(doc),
+            first_case,
+            len(doc["cases"]),
+        ))
+
+    def to_bytes(self, sha1: bytes) -> bytes:
+        blob = bytearray()
+        string_offsets = array("I", [0])
+        for text in self.strings:  # dicts keep insertion order = string id
+            blob += text.encode("utf-8")
+            string_offsets.append(len(blob))
+        shapes = array("I")
+        shape_offsets = array("I", [0])
+        for tokens in self.shapes:
+            shapes.extend(tokens)
+            shape_offsets.append(len(shapes))
+        # Sort fixture records by calculator_id for the bisect in ParityBundle.
+        names = list(self.strings)
+        rows = [self.fixtures[i : i + 7] for i in range(0, len(self.fixtures), 7)]
+        rows.sort(key=lambda row: names[row[1]])
+        fixtures = array("I", [v for row in rows for v in row])
+        parts = [
+            bytes(blob), string_offsets.tobytes(), shapes.tobytes(), shape_offsets.tobytes(),
+            self.numbers.tobytes(), bytes(self.int_flags), self.strrefs.tobytes(),
+            fixtures.tobytes(), self.cases.tobytes(),
+        ]
+        if sys.byteorder != "little":
+            raise RuntimeError("bundle layout is little-endian")
+        out = bytearray(HEADER.pack(MAGIC, VERSION, sha1, len(parts)))
+        table_at = len(out)
+        out += bytes(SECTION.size * len(parts))
+        table = []
+        for part in parts:
+            out += bytes(-len(out) % 8)  # keep float64 columns aligned
+            table.append((len(out), len(part)))
+            out += part
+        for i, entry in enumerate(table):
+            SECTION.pack_into(out, table_at + i * SECTION.size, *entry)
+        return bytes(out)
+
+
+def pack(paths: list[Path]) -> bytes:
+    writer = _Writer()
+    for path in paths:
+        writer.add_fixture(path.name, path.read_text(encoding="utf-8"))
+    return writer.to_bytes(sources_sha1(paths))
+
+
+class ParityBundle:
+    """Read-only view of a packed bundle; fixtures and cases are decoded on demand."""
+
+    def __init__(self, data: bytes | mmap.mmap) -> None:
+        magic, version, self.sources_sha1, count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"not a parity bundle (version {VERSION})")
+        self.data = data
+        view = memoryview(data)
+        sections = {}
+        for i, name in enumerate(SECTIONS[:count]):
+            offset, length = SECTION.unpack_from(data, HEADER.size + i * SECTION.size)
+            sections[name] = view[offset : offset + length]
+        self._blob = sections["strings"]
+        self._string_offsets = sections["string_offsets"].cast("I")
+        self._shapes = sections["shapes"].cast("I")
+        self._shape_offsets = sections["shape_offsets"].cast("I")
+        self._numbers = sections["numbers"].cast("d")
+        self._int_flags = sections["int_flags"]
+        self._strrefs = sections["strrefs"].cast("I")
+        self._fixtures = sections["fixtures"].cast("I")
+        self._cases = sections["cases"].cast("I")
+        self._string_cache: dict[int, str] = {}
+        self._case_index: dict[int, dict[str, int]] = {}
+
+    @classmethod
+    def open(cls, path: Path = OUT_PATH) -> ParityBundle:
+        with path.open("rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def string(self, i: int) -> str:
+        text = self._string_cache.get(i)
+        if text is None:
+            text = bytes(self._blob[self._string_offsets[i] : self._string_offsets[i + 1]]).decode("utf-8")
+            self._string_cache[i] = text
+        return text
+
+    def __len__(self) -> int:
+        return len(self._fixtures) // 7
+
+    def _fixture_row(self, i: int) -> tuple[int, ...]:
+        return tuple(self._fixtures[i * 7 : i * 7 + 7])
+
+    def ids(self) -> list[str]:
+        return [self.string(self._fixtures[i * 7 + 1]) for i in range(len(self))]
+
+    def _find(self, calculator_id: str) -> int:
+        ids = _LazyIds(self)
+        i = bisect_left(ids, calculator_id)
+        if i == len(self) or ids[i] != calculator_id:
+            raise KeyError(calculator_id)
+        return i
+
+    def _decode(self, shape: int, num: int, ref: int, cases: tuple[int, int] = (0, 0)) -> Any:
+        tokens = self._shapes[self._shape_offsets[shape] : self._shape_offsets[shape + 1]]
+        pos = 0
+
+        def value() -> Any:
+            nonlocal pos, num, ref
+            token = tokens[pos]
+            pos += 1
+            op, arg = token & 7, token >> 3
+            if op == OBJ:
+                obj = {}
+                for _ in range(arg):
+                    key = self.string(tokens[pos] >> 3)
+                    pos += 1
+                    obj[key] = value()
+                return obj
+            if op == ARR:
+                return [value() for _ in range(arg)]
+            if op == NUM:
+                number = self._numbers[num]
+                if self._int_flags[num]:
+                    number = int(number)
+                num += 1
+                return number
+            if op == STR:
+                ref += 1
+                return self.string(self._strrefs[ref - 1])
+            if op == LIT:
+                return LITERALS[arg]
+            if op == CASES:
+                return [self._case(i) for i in range(cases[0], cases[0] + cases[1])]
+            raise ValueError(f"bad shape token {token}")
+
+        return value()
+
+    def _case(self, i: int) -> dict[str, Any]:
+        shape, num, ref, _ = self._cases[i * 4 : i * 4 + 4]
+        return self._decode(shape, num, ref)
+
+    def fixture(self, calculator_id: str) -> dict[str, Any]:
+        """The whole fixture document for ``calculator_id``."""
+        _, _, shape, num, ref, first, count = self._fixture_row(self._find(calculator_id))
+        return self._decode(shape, num, ref, (first, count))
+
+    def case_ids(self, calculator_id: str) -> list[str]:
+        return list(self._cases_of(self._find(calculator_id)))
+
+    def _cases_of(self, fixture: int) -> dict[str, int]:
+        index = self._case_index.get(fixture)
+        if index is None:
+            first, count = self._fixture_row(fixture)[5:]
+            index = {self.string(self._cases[i * 4 + 3]): i for i in range(first, first + count)}
+            self._case_index[fixture] = index
+        return index
+
+    def case(self, calculator_id: str, case_id: str) -> dict[str, Any]:
+        """One case, decoded without touching the rest of the fixture."""
+        return self._case(self._cases_of(self._find(calculator_id))[case_id])
+
+    def files(self) -> Iterator[tuple[str, str, int]]:
+        """(file name, calculator_id, layout flags) per fixture."""
+        for i in range(len(self)):
+            row = self._fixture_row(i)
+            yield self.string(row[0] & ~FLAG_MASK), self.string(row[1]), row[0] & FLAG_MASK
+
+    def text(self, calculator_id: str) -> str:
+        """Source text of the fixture, rebuilt in `json.dumps(indent=2)` layout."""
+        flags = self._fixture_row(self._find(calculator_id))[0] & FLAG_MASK
+        text = _canonical(self.fixture(calculator_id))
+        return text + "\n" if flags & TRAILING_NEWLINE else text
+
+
+def open_current(directory: Path = FIXTURES, path: Path = OUT_PATH) -> ParityBundle | None:
+    """The bundle if it is newer than every fixture and lists the same files, else None.
+
+    Only stats the fixtures; callers fall back to the JSON files on None.
+    """
+    if not path.exists():
+        return None
+    paths = fixture_paths(directory)
+    built = path.stat().st_mtime_ns
+    if any(p.stat().st_mtime_ns > built for p in paths):
+        return None
+    try:
+        bundle = ParityBundle.open(path)
+    except ValueError:  # another bundle version
+        return None
+    if sorted(name for name, _, _ in bundle.files()) != [p.name for p in paths]:
+        return None
+    return bundle
+
+
+class _LazyIds:
+    """calculator_id per sorted fixture record, decoded only where bisect probes."""
+
+    def __init__(self, bundle: ParityBundle) -> None:
+        self.bundle = bundle
+
+    def __len__(self) -> int:
+        return len(self.bundle)
+
+    def __getitem__(self, i: int) -> str:
+        return self.bundle.string(self.bundle._fixtures[i * 7 + 1])
+
+
+def same(a: Any, b: Any) -> bool:
+    """Equal including key order and int/float/bool types."""
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return list(a) == list(b) and all(same(a[k], b[k]) for k in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def verify(bundle: ParityBundle, paths: list[Path]) -> list[str]:
+    """Differences between the bundle and the JSON sources; empty if it round-trips."""
+    problems = []
+    by_name = {name: (calc_id, flags) for name, calc_id, flags in bundle.files()}
+    if sorted(by_name) != sorted(p.name for p in paths):
+        problems.append("bundle and fixture directory list different files")
+    for path in paths:
+        if path.name not in by_name:
+            continue
+        calc_id, flags = by_name[path.name]
+        text = path.read_text(encoding="utf-8")
+        if not same(bundle.fixture(calc_id), json.loads(text)):
+            problems.append(f"{path.name}: decoded fixture differs")
+        elif not flags & NOT_CANONICAL and bundle.text(calc_id) != text:
+            problems.append(f"{path.name}: rebuilt text differs")
+    if bundle.sources_sha1 != sources_sha1(paths):
+        problems.append("fixtures changed since the bundle was built")
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Pack parity fixtures into one indexed bundle.")
+    parser.add_argument("--out", type=Path, default=OUT_PATH, help=f"bundle path (default {rel(OUT_PATH)})")
+    parser.add_argument("--check", action="store_true", help="verify an existing bundle against the fixtures, write nothing")
+    parser.add_argument("--show", nargs="+", metavar=("CALCULATOR_ID", "CASE_ID"), help="print a fixture or one case")
+    args = parser.parse_args()
+    paths = fixture_paths()
+
+    if args.show:
+        bundle = ParityBundle.open(args.out)
+        calc_id, *case_id = args.show
+        doc = bundle.case(calc_id, case_id[0]) if case_id else bundle.fixture(calc_id)
+        print(json.dumps(doc, ensure_ascii=False, indent=2))
+        return 0
+    if args.check:
+        if not args.out.exists():
+            print(f"{shown(args.out)} not found; run without --check first")
+            return 1
+        problems = verify(ParityBundle.open(args.out), paths)
+        for problem in problems:
+            print(f"  {problem}")
+        print("Bundle OK" if not problems else f"{len(problems)} problem(s)")
+        return 1 if problems else 0
+
+    start = time.perf_counter()
+    data = pack(paths)
+    bundle = ParityBundle(data)
+    problems = verify(bundle, paths)
+    if problems:
+        for problem in problems:
+            print(f"  {problem}")
+        print(f"Bundle does not round-trip ({len(problems)} problem(s)); nothing written")
+        return 1
+    elapsed = time.perf_counter() - start
+    # Build output: written directly, not through the WriteBack journal.
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_bytes(data)
+
+    source_bytes = sum(p.stat().st_size for p in paths)
+    cases = sum(count for *_, count in (bundle._fixture_row(i) for i in range(len(bundle))))
+    exact = sum(1 for _, _, flags in bundle.files() if not flags & NOT_CANONICAL)
+    print(f"{len(paths)} fixture(s), {cases} case(s): {source_bytes} bytes of JSON -> {len(data)} bytes ({shown(args.out)})")
+    print(f"  strings: {len(bundle._string_offsets) - 1}, shapes: {len(bundle._shape_offsets) - 1}, numbers: {len(bundle._numbers)}")
+    print(f"  round-trip verified ({exact} byte-exact) in {elapsed * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_main(main))
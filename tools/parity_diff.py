@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""Diff two generations of parity fixtures: totals, material counts and names.
+
+Each side is a directory of *.parity.json files or a git revision (read
+with one `git cat-file --batch`). Every numeric leaf of `expected_totals`
+and `expected_scenarios` becomes a row keyed by (calculator_id, case id,
+total name); both sides are aligned into NumPy arrays over the union of keys
+and compared in bulk:
+
+    changed   |new - old| > atol + rtol * |old|
+    rel       |new - old| / |old|  (inf when old is 0)
+
+Changes to `generated_at` and `formula_version` alone are metadata churn
+and only counted. Totals, cases and fixtures present on one side only are
+listed, as are changes to `expected_materials_count` and
+`expected_material_names`.
+
+Without NumPy the same comparison runs as a Python loop (slower, same
+output).
+
+    python tools/parity_diff.py HEAD~1                 # HEAD~1 vs working tree
+    python tools/parity_diff.py origin/main HEAD --rtol 1e-3 --top 3
+    python tools/parity_diff.py old_fixtures/ test/parity_fixtures --json diff.json --strict
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Iterator, NamedTuple
+
+from profiling import run_main
+from source_index import ROOT, rel
+
+try:
+    import numpy as np
+except ImportError:  # optional: compare() falls back to a Python loop
+    np = None
+
+FIXTURES = ROOT / "test/parity_fixtures"
+METADATA = ("generated_at", "formula_version")
+NUMERIC_SECTIONS = ("expected_totals", "expected_scenarios")
+
+Key = tuple[str, str, str]  # calculator_id, case id, total name
+
+
+class FixtureSet(NamedTuple):
+    label: str
+    docs: dict[str, dict[str, Any]]  # calculator_id -> fixture
+
+
+def load_directory(directory: Path) -> FixtureSet:
+    docs = {}
+    for path in sorted(directory.glob("*.parity.json")):
+        doc = json.loads(path.read_text(encoding="utf-8"))
+        docs[doc.get("calculator_id", path.name)] = doc
+    return FixtureSet(str(directory), docs)
+
+
+def load_revision(rev: str, directory: Path = FIXTURES) -> FixtureSet:
+    """Fixtures as of ``rev``, read in one git process."""
+    prefix = rel(directory)
+    names = subprocess.run(
+        ["git", "ls-tree", "-r", "--name-only", rev, "--", prefix],
+        capture_output=True, text=True, cwd=ROOT, check=True,
+    ).stdout.split()
+    names = [n for n in names if n.endswith(".parity.json")]
+    batch = subprocess.run(
+        ["git", "cat-file", "--batch"],
+        input="".join(f"{rev}:{n}\n" for n in names).encode(),
+        capture_output=True, cwd=ROOT, check=True,
+    ).stdout
+    docs = {}
+    pos = 0
+    for name in names:
+        header_end = batch.index(b"\n", pos)
+        size = int(batch[pos:header_end].split()[2])
+        doc = json.loads(batch[header_end + 1 : header_end + 1 + size])
+        docs[doc.get("calculator_id", Path(name).name)] = doc
+        pos = header_end + 1 + size + 1
+    return FixtureSet(rev, docs)
+
+
+def load(spec: str) -> FixtureSet:
+    path = Path(spec)
+    return load_directory(path) if path.is_dir() else load_revision(spec)
+
+
+def _numbers(value: Any, name: str = "") -> Iterator[tuple[str, float]]:
+    if isinstance(value, dict):
+        for key, nested in value.items():
+            yield from _numbers(nested, f"{name}.{key}" if name else key)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        yield name, float(value)
+
+
+def flatten(fixtures: FixtureSet) -> dict[Key, float]:
+    rows = {}
+    for calc_id, doc in fixtures.docs.items():
+        for case in doc.get("cases", []):
+            for section in NUMERIC_SECTIONS:
+                prefix = "" if section == "expected_totals" else "scenarios"
+                for name, value in _numbers(case.get(section, {}), prefix):
+                    rows[(calc_id, str(case.get("id")), name)] = value
+    return rows
+
+
+class Change(NamedTuple):
+    key: Key
+    old: float
+    new: float
+    abs: float
+    rel: float
+
+
+def compare(old: dict[Key, float], new: dict[Key, float], atol: float, rtol: float) -> tuple[list[Change], list[Key], list[Key]]:
+    """(changed rows, keys only in old, keys only in new)."""
+    keys = list(old.keys() | new.keys())
+    nan = math.nan
+    if np is not None:
+        a = np.fromiter((old.get(k, nan) for k in keys), dtype=np.float64, count=len(keys))
+        b = np.fromiter((new.get(k, nan) for k in keys), dtype=np.float64, count=len(keys))
+        in_a, in_b = ~np.isnan(a), ~np.isnan(b)
+        both = in_a & in_b
+        delta = np.abs(b - a)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            relative = np.where(a != 0, delta / np.abs(a), np.where(delta == 0, 0.0, np.inf))
+        hits = np.flatnonzero(both & (delta > atol + rtol * np.abs(a)))
+        changes = [Change(keys[i], float(a[i]), float(b[i]), float(delta[i]), float(relative[i])) for i in hits]
+        removed = [keys[i] for i in np.flatnonzero(in_a & ~in_b)]
+        added = [keys[i] for i in np.flatnonzero(in_b & ~in_a)]
+    else:
+        changes, removed, added = [], [], []
+        for k in keys:
+            if k not in new:
+                removed.append(k)
+            elif k not in old:
+                added.append(k)
+            else:
+                delta = abs(new[k] - old[k])
+                if delta > atol + rtol * abs(old[k]):
+                    relative = delta / abs(old[k]) if old[k] else math.inf
+                    changes.append(Change(k, old[k], new[k], delta, relative))
+    return changes, sorted(removed), sorted(added)
+
+
+def _without_metadata(doc: dict[str, Any]) -> dict[str, Any]:
+    return {k: v for k, v in doc.items() if k not in METADATA}
+
+
+def case_changes(old: FixtureSet, new: FixtureSet) -> dict[str, list[str]]:
+    """Non-numeric differences per section."""
+    found: dict[str, list[str]] = defaultdict(list)
+    for calc_id in sorted(old.docs.keys() - new.docs.keys()):
+        found["fixtures removed"].append(calc_id)
+    for calc_id in sorted(new.docs.keys() - old.docs.keys()):
+        found["fixtures added"].append(calc_id)
+    for calc_id in sorted(old.docs.keys() & new.docs.keys()):
+        a, b = old.docs[calc_id], new.docs[calc_id]
+        if a.get("formula_version") != b.get("formula_version"):
+            found["formula_version"].append(f"{calc_id}: {a.get('formula_version')} -> {b.get('formula_version')}")
+        if a != b and _without_metadata(a) == _without_metadata(b):
+            found["metadata only"].append(calc_id)
+        cases_a = {str(c.get("id")): c for c in a.get("cases", [])}
+        cases_b = {str(c.get("id")): c for c in b.get("cases", [])}
+        found["cases removed"] += [f"{calc_id}/{c}" for c in sorted(cases_a.keys() - cases_b.keys())]
+        found["cases added"] += [f"{calc_id}/{c}" for c in sorted(cases_b.keys() - cases_a.keys())]
+        for case_id in sorted(cases_a.keys() & cases_b.keys()):
+            ca, cb = cases_a[case_id], cases_b[case_id]
+            where = f"{calc_id}/{case_id}"
+            if ca.get("expected_materials_count") != cb.get("expected_materials_count"):
+                found["materials count"].append(
+                    f"{where}: {ca.get('expected_materials_count')} -> {cb.get('expected_materials_count')}"
+                )
+            names_a = ca.get("expected_material_names") or []
+            names_b = cb.get("expected_material_names") or []
+            if names_a != names_b:
+                gone = [n for n in names_a if n not in names_b]
+                new_names = [n for n in names_b if n not in names_a]
+                detail = "; ".join(
+                    part for part in (
+                        f"-{', -'.join(gone)}" if gone else "",
+                        f"+{', +'.join(new_names)}" if new_names else "",
+                    ) if part
+                ) or "reordered"
+                found["material names"].append(f"{where}: {detail}")
+    return {section: items for section, items in found.items() if items}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Diff two generations of parity fixtures.")
+    parser.add_argument("old", help="fixture directory or git revision")
+    parser.add_argument("new", nargs="?", default=str(FIXTURES), help="fixture directory or git revision (default: working tree)")
+    parser.add_argument("--atol", type=float, default=1e-9, help="absolute tolerance (default 1e-9)")
+    parser.add_argument("--rtol", type=float, default=1e-6, help="relative tolerance (default 1e-6)")
+    parser.add_argument("--top", type=int, default=5, help="largest changes shown per calculator (default 5)")
+    parser.add_argument("--json", type=Path, metavar="OUT", help="write every change as JSON")
+    parser.add_argument("--strict", action="store_true", help="exit 1 when anything beyond metadata changed")
+    args = parser.parse_args()
+
+    old, new = load(args.old), load(args.new)
+    old_rows, new_rows = flatten(old), flatten(new)
+    changes, removed, added = compare(old_rows, new_rows, args.atol, args.rtol)
+    other = case_changes(old, new)
+
+    print(f"{old.label} -> {new.label}: {len(old.docs)} -> {len(new.docs)} fixtures, {len(old_rows)} -> {len(new_rows)} totals")
+    print(f"Changed beyond atol={args.atol:g} rtol={args.rtol:g}: {len(changes)}, removed: {len(removed)}, added: {len(added)}")
+    by_calc: dict[str, list[Change]] = defaultdict(list)
+    for change in changes:
+        by_calc[change.key[0]].append(change)
+    for calc_id, rows in sorted(by_calc.items(), key=lambda item: -max(c.rel for c in item[1])):
+        rows.sort(key=lambda c: (-c.rel, -c.abs))
+        print(f"\n  {calc_id}: {len(rows)} changed, max rel {rows[0].rel:.3g}")
+        for c in rows[: args.top]:
+            print(f"    {c.key[1]} {c.key[2]}: {c.old:g} -> {c.new:g} (abs {c.abs:.3g}, rel {c.rel:.3g})")
+    for title, keys in (("Totals removed", removed), ("Totals added", added)):
+        if keys:
+            print(f"\n{title}: {len(keys)}")
+            for key in keys[: args.top * 4]:
+                print(f"  {'/'.join(key)}")
+    for section, items in other.items():
+        print(f"\n{section}: {len(items)}")
+        for item in items:
+            print(f"  {item}")
+
+    if args.json:
+        args.json.write_text(
+            json.dumps(
+                {
+                    "old": old.label,
+                    "new": new.label,
+                    "changed": [
+                        {"calculator_id": c.key[0], "case": c.key[1], "total": c.key[2],
+                         "old": c.old, "new": c.new, "abs": c.abs, "rel": c.rel if math.isfinite(c.rel) else None}
+                        for c in changes
+                    ],
+                    "removed": ["/".join(k) for k in removed],
+                    "added": ["/".join(k) for k in added],
+                    **other,
+                },
+                ensure_ascii=False,
+                indent=2,
+            )
+            + "\n",
+            encoding="utf-8",
+        )
+    significant = changes or removed or added or any(s not in ("metadata only", "formula_version") for s in other)
+    return 1 if args.strict and significant else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_main(main))
@@ -0,0 +1,588 @@
+#!/usr/bin/env python3
+"""`--profile` for every tool: where a run spends its time, per phase, file and pattern.
+
+Tools call their main() through run_main(), which handles two options before
+the tool's own argument parsing sees them:
+
+    --profile[=OUT]    JSON report (default tools/.cache/profile/<tool>.json)
+                       and a Chrome trace next to it (<OUT stem>.trace.json,
+                       open in chrome://tracing or ui.perfetto.dev)
+    --cprofile[=OUT]   cProfile dump (default tools/.cache/profile/<tool>.prof)
+
+While profiling, these are timed by wrapping them in place:
+
+    glob        Path.glob / rglob iteration
+    read/write  Path.read_text/read_bytes/write_text/write_bytes (+ bytes)
+    regex       every compiled pattern in the tool modules (named module.NAME,
+                e.g. raise_room_limits.PATTERN), patterns compiled at run time
+                and the re.search/sub/... functions: calls, matches, seconds
+    json        json.load(s)/dump(s)
+    subprocess  subprocess.run
+
+Regex and JSON time is charged to the file read most recently, which is how
+the tools work (read a file, then process it), so the report can rank
+files. map_files() runs serially while profiling so worker time is seen.
+Peak RSS comes from getrusage.
+
+    python tools/l10n_usage.py --profile
+    python tools/raise_room_limits.py --profile=/tmp/rooms.json --cprofile
+    python tools/profiling.py tools/compare_parity_registry.py   # scripts without main()
+
+--check runs a tool twice, plain and profiled, and fails if its stdout or
+exit code differ: the wrappers must not change what a tool does.
+
+    python tools/profiling.py --check tools/test_impact.py lib/core/utils/number_formatter.dart
+"""
+from __future__ import annotations
+
+import cProfile
+import difflib
+import functools
+import json
+import pathlib
+import re
+import resource
+import runpy
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+TOOLS = Path(__file__).resolve().parent
+PROFILE_DIR = TOOLS / ".cache/profile"
+# Chrome trace events kept; later calls are still counted in the report.
+MAX_EVENTS = 200_000
+TOP = 15
+
+_active: Profiler | None = None
+
+
+def active() -> bool:
+    return _active is not None
+
+
+class _Stats:
+    __slots__ = ("calls", "seconds")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.seconds = 0.0
+
+
+class _FileStats:
+    __slots__ = ("seconds", "read_bytes", "written_bytes", "read", "write", "regex", "json")
+
+    def __init__(self) -> None:
+        self.seconds = self.read = self.write = self.regex = self.json = 0.0
+        self.read_bytes = self.written_bytes = 0
+
+
+class _PatternStats:
+    __slots__ = ("pattern", "calls", "matches", "seconds")
+
+    def __init__(self, pattern: str) -> None:
+        self.pattern = pattern
+        self.calls = self.matches = 0
+        self.seconds = 0.0
+
+
+class Profiler:
+    def __init__(self, tool: str) -> None:
+        self.tool = tool
+        self.t0 = time.perf_counter()
+        self.phases: dict[str, _Stats] = {}
+        self.files: dict[str, _FileStats] = {}
+        self.patterns: dict[str, _PatternStats] = {}
+        self.events: list[dict[str, Any]] = []
+        self.current: str | None = None
+        self.current_start = 0.0
+        self._depth: dict[str, int] = {}
+        self._undo: list[tuple[Any, str, Any]] = []
+
+    # -- recording ---------------------------------------------------------
+
+    def add(self, phase: str, start: float, seconds: float, name: str | None = None, path: str | None = None) -> None:
+        stats = self.phases.setdefault(phase, _Stats())
+        stats.calls += 1
+        stats.seconds += seconds
+        target = path or self.current
+        if target is not None and phase in ("read", "write", "regex", "json"):
+            file_stats = self.files.setdefault(target, _FileStats())
+            setattr(file_stats, phase, getattr(file_stats, phase) + seconds)
+        if name is not None and len(self.events) < MAX_EVENTS:
+            self.events.append({
+                "name": name, "cat": phase, "ph": "X", "pid": 1, "tid": 1,
+                "ts": (start - self.t0) * 1e6, "dur": seconds * 1e6,
+            })
+
+    def enter_file(self, path: str) -> None:
+        """Close the span of the file being processed and start one for ``path``."""
+        if path == self.current:
+            return
+        now = time.perf_counter()
+        self._close_file(now)
+        self.current, self.current_start = path, now
+
+    def _close_file(self, now: float) -> None:
+        if self.current is None:
+            return
+        self.files.setdefault(self.current, _FileStats()).seconds += now - self.current_start
+        if len(self.events) < MAX_EVENTS:
+            self.events.append({
+                "name": self.current, "cat": "file", "ph": "X", "pid": 1, "tid": 2,
+                "ts": (self.current_start - self.t0) * 1e6, "dur": (now - self.current_start) * 1e6,
+            })
+        self.current = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.perf_counter() - start, name)
+
+    def timed(self, phase: str, func: Callable, label: Callable[..., str | None] | None = None) -> Callable:
+        """``func`` timed under ``phase``; nested calls in the same phase count once."""
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if self._depth.get(phase):
+                return func(*args, **kwargs)
+            self._depth[phase] = 1
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._depth[phase] = 0
+                self.add(phase, start, time.perf_counter() - start, label(*args) if label else None)
+
+        return wrapper
+
+    # -- instrumentation ---------------------------------------------------
+
+    def _patch(self, owner: Any, name: str, value: Any) -> None:
+        self._undo.append((owner, name, getattr(owner, name)))
+        setattr(owner, name, value)
+
+    def install(self) -> None:
+        prof = self
+        path_cls = pathlib.Path
+
+        def io(method: str, phase: str) -> None:
+            original = getattr(path_cls, method)
+
+            def wrapper(path: Path, *args: Any, **kwargs: Any) -> Any:
+                key = _rel(path)
+                if phase == "read":
+                    prof.enter_file(key)
+                start = time.perf_counter()
+                result = original(path, *args, **kwargs)
+                seconds = time.perf_counter() - start
+                stats = prof.files.setdefault(key, _FileStats())
+                if phase == "read":
+                    stats.read_bytes += _size(result)
+                else:
+                    stats.written_bytes += _size(args[0] if args else kwargs.get("data", b""))
+                prof.add(phase, start, seconds, f"{phase} {key}", key)
+                return result
+
+            prof._patch(path_cls, method, functools.wraps(original)(wrapper))
+
+        for method in ("read_text", "read_bytes"):
+            io(method, "read")
+        for method in ("write_text", "write_bytes"):
+            io(method, "write")
+
+        def globbing(method: str) -> None:
+            original = getattr(path_cls, method)
+
+            def wrapper(path: Path, pattern: str, *args: Any, **kwargs: Any) -> Iterator[Path]:
+                it = original(path, pattern, *args, **kwargs)
+                start = time.perf_counter()
+                total = 0.0
+                while True:
+                    t = time.perf_counter()
+                    try:
+                        item = next(it)
+                    except StopIteration:
+                        total += time.perf_counter() - t
+                        break
+                    total += time.perf_counter() - t
+                    yield item
+                prof.add("glob", start, total, f"{method} {_rel(path)}/{pattern}")
+
+            prof._patch(path_cls, method, functools.wraps(original)(wrapper))
+
+        globbing("glob")
+        globbing("rglob")
+
+        for name in ("load", "loads", "dump", "dumps"):
+            self._patch(json, name, self.timed("json", getattr(json, name)))
+        self._patch(subprocess, "run", self.timed("subprocess", subprocess.run, lambda cmd, *a, **k: " ".join(map(str, cmd))[:80]))
+        self._install_regex()
+
+    def _install_regex(self) -> None:
+        prof = self
+        # Module-level patterns (and one level into module-level objects);
+        # a module run as a script may also be imported under its own name.
+        proxies: dict[int, _TimedPattern] = {}
+
+        def proxy(value: re.Pattern, name: str) -> _TimedPattern:
+            if id(value) not in proxies:
+                proxies[id(value)] = _TimedPattern(value, name, self)
+            return proxies[id(value)]
+
+        for module in list(sys.modules.values()):
+            origin = getattr(module, "__file__", None)
+            if not origin or Path(origin).resolve().parent != TOOLS or module.__name__ == __name__:
+                continue
+            short = Path(origin).stem
+            for attr, value in list(vars(module).items()):
+                if isinstance(value, re.Pattern):
+                    self._patch(module, attr, proxy(value, f"{short}.{attr}"))
+                elif isinstance(value, _TimedPattern) or isinstance(value, type) or callable(value):
+                    continue
+                elif hasattr(value, "__dict__"):
+                    for inner, nested in list(vars(value).items()):
+                        if isinstance(nested, re.Pattern):
+                            self._patch(value, inner, proxy(nested, f"{short}.{attr}.{inner}"))
+
+        original_compile = re.compile
+
+        def compile(pattern: Any, flags: int = 0) -> Any:
+            if isinstance(pattern, _TimedPattern) and not flags:
+                return pattern
+            compiled = original_compile(_unwrap(pattern), flags)
+            # Patterns the standard library compiles for itself stay untimed.
+            caller = _caller()
+            return compiled if caller is None else _TimedPattern(compiled, caller, prof)
+
+        self._patch(re, "compile", compile)
+        for name in ("search", "match", "fullmatch", "findall", "finditer", "sub", "subn", "split"):
+            # Call the real re.<name> with the caller's arguments untouched, so
+            # positional count/flags keep their meaning; only the call is timed.
+            original = getattr(re, name)
+
+            def function(pattern: Any, *args: Any, _name: str = name, _original: Callable = original, **kwargs: Any) -> Any:
+                if isinstance(pattern, _TimedPattern):
+                    stats, pattern = pattern.stats, pattern.compiled
+                else:
+                    caller = _caller()
+                    if caller is None:
+                        return _original(pattern, *args, **kwargs)
+                    stats = prof.pattern_stats(caller, pattern)
+                if _name == "finditer":
+                    return prof.timed_matches(stats, _original(pattern, *args, **kwargs))
+                start = time.perf_counter()
+                result = _original(pattern, *args, **kwargs)
+                prof.record_match(stats, start, _matches(_name, result))
+                return result
+
+            self._patch(re, name, functools.wraps(original)(function))
+
+    def pattern_stats(self, name: str, pattern: Any) -> _PatternStats:
+        text = _unwrap(pattern).pattern if isinstance(pattern, (re.Pattern, _TimedPattern)) else pattern
+        return self.patterns.setdefault(name, _PatternStats(text if isinstance(text, str) else repr(text)))
+
+    def record_match(self, stats: _PatternStats, start: float, matches: int) -> None:
+        seconds = time.perf_counter() - start
+        stats.calls += 1
+        stats.matches += matches
+        stats.seconds += seconds
+        self.add("regex", start, seconds)
+
+    def timed_matches(self, stats: _PatternStats, it: Iterator[re.Match]) -> Iterator[re.Match]:
+        """Time a finditer() iterator while the caller consumes it."""
+        start = time.perf_counter()
+        total, count = 0.0, 0
+        while True:
+            t = time.perf_counter()
+            m = next(it, None)
+            total += time.perf_counter() - t
+            if m is None:
+                break
+            count += 1
+            yield m
+        stats.calls += 1
+        stats.matches += count
+        stats.seconds += total
+        self.add("regex", start, total)
+
+    def uninstall(self) -> None:
+        while self._undo:
+            owner, name, value = self._undo.pop()
+            setattr(owner, name, value)
+
+    # -- output ------------------------------------------------------------
+
+    def report(self, argv: list[str]) -> dict[str, Any]:
+        self._close_file(time.perf_counter())
+        wall = time.perf_counter() - self.t0
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        rss_bytes = rss if sys.platform == "darwin" else rss * 1024
+        phases = {name: {"calls": s.calls, "seconds": round(s.seconds, 6)} for name, s in self.phases.items()}
+        accounted = sum(s.seconds for name, s in self.phases.items() if name in ("glob", "read", "write", "regex", "json", "subprocess"))
+        phases["other"] = {"calls": 0, "seconds": round(max(wall - accounted, 0.0), 6)}
+        files = sorted(self.files.items(), key=lambda item: -item[1].seconds)
+        patterns = sorted(self.patterns.items(), key=lambda item: -item[1].seconds)
+        return {
+            "tool": self.tool,
+            "argv": argv,
+            "wall_seconds": round(wall, 6),
+            "peak_rss_bytes": rss_bytes,
+            "bytes_read": sum(f.read_bytes for f in self.files.values()),
+            "bytes_written": sum(f.written_bytes for f in self.files.values()),
+            "phases": phases,
+            "files": [
+                {"path": path, **{slot: round(getattr(s, slot), 6) for slot in _FileStats.__slots__}}
+                for path, s in files
+            ],
+            "patterns": [
+                {"name": name, "pattern": s.pattern, "calls": s.calls, "matches": s.matches, "seconds": round(s.seconds, 6)}
+                for name, s in patterns if s.calls
+            ],
+        }
+
+    def trace(self) -> dict[str, Any]:
+        meta = [
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": 1, "args": {"name": "calls"}},
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": 2, "args": {"name": "files"}},
+        ]
+        return {"traceEvents": meta + self.events, "displayTimeUnit": "ms"}
+
+
+class _TimedPattern:
+    """Stands in for a compiled pattern and times every matching method."""
+
+    def __init__(self, compiled: re.Pattern, name: str, profiler: Profiler) -> None:
+        self.compiled = compiled
+        self.stats = profiler.pattern_stats(name, compiled)
+        self.profiler = profiler
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.compiled, name)
+
+    def _call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        result = getattr(self.compiled, method)(*args, **kwargs)
+        self.profiler.record_match(self.stats, start, _matches(method, result))
+        return result
+
+    def search(self, *args: Any, **kwargs: Any) -> Any:
+        return self._call("search", *args, **kwargs)
+
+    def match(self, *args: Any, **kwargs: Any) -> Any:
+        return self._call("match", *args, **kwargs)
+
+    def fullmatch(self, *args: Any, **kwargs: Any) -> Any:
+        return self._call("fullmatch", *args, **kwargs)
+
+    def findall(self, *args: Any, **kwargs: Any) -> list:
+        return self._call("findall", *args, **kwargs)
+
+    def finditer(self, *args: Any, **kwargs: Any) -> Iterator[re.Match]:
+        return self.profiler.timed_matches(self.stats, self.compiled.finditer(*args, **kwargs))
+
+    def sub(self, *args: Any, **kwargs: Any) -> Any:
+        return self._call("sub", *args, **kwargs)
+
+    def subn(self, *args: Any, **kwargs: Any) -> tuple[Any, int]:
+        return self._call("subn", *args, **kwargs)
+
+    def split(self, *args: Any, **kwargs: Any) -> list:
+        return self._call("split", *args, **kwargs)
+
+
+def _unwrap(pattern: Any) -> Any:
+    return pattern.compiled if isinstance(pattern, _TimedPattern) else pattern
+
+
+def _matches(method: str, result: Any) -> int:
+    """Matches visible in a result; sub() does not report its count."""
+    if method in ("search", "match", "fullmatch"):
+        return result is not None
+    if method == "findall":
+        return len(result)
+    if method == "subn":
+        return result[1]
+    if method == "split":
+        return len(result) - 1
+    return 0
+
+
+def _size(data: str | bytes) -> int:
+    return len(data) if isinstance(data, bytes) else len(data.encode("utf-8"))
+
+
+def _rel(path: Path) -> str:
+    resolved = Path(path).resolve()
+    root = TOOLS.parent
+    return resolved.relative_to(root).as_posix() if resolved.is_relative_to(root) else str(resolved)
+
+
+def _caller() -> str | None:
+    """`module.function` of the tool code using a pattern; None outside tools/."""
+    frame = sys._getframe(2)
+    here = Path(__file__).resolve()
+    while frame and Path(frame.f_code.co_filename).resolve() == here:
+        frame = frame.f_back
+    if frame is None or Path(frame.f_code.co_filename).resolve().parent != TOOLS:
+        return None
+    return f"{Path(frame.f_code.co_filename).stem}.{frame.f_code.co_name}"
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Mark a phase of a tool's run; free when not profiling."""
+    if _active is None:
+        yield
+    else:
+        with _active.phase(name):
+            yield
+
+
+def _pop_option(argv: list[str], name: str) -> str | None:
+    """Remove `--name` / `--name=VALUE` from argv; '' for the bare flag, None if absent."""
+    for i, arg in enumerate(argv):
+        if arg == name:
+            del argv[i]
+            return ""
+        if arg.startswith(name + "="):
+            del argv[i]
+            return arg[len(name) + 1 :]
+    return None
+
+
+def summary(report: dict[str, Any]) -> str:
+    lines = [
+        f"profile: {report['tool']}  wall {report['wall_seconds'] * 1000:.0f} ms, "
+        f"peak RSS {report['peak_rss_bytes'] / 2**20:.0f} MB, "
+        f"read {report['bytes_read']} B, written {report['bytes_written']} B",
+        "  phases: " + ", ".join(
+            f"{name} {p['seconds'] * 1000:.0f} ms ({p['calls']})"
+            for name, p in sorted(report["phases"].items(), key=lambda item: -item[1]["seconds"])
+        ),
+    ]
+    if report["files"]:
+        lines.append(f"  slowest files (of {len(report['files'])}):")
+        lines += [
+            f"    {f['seconds'] * 1000:8.1f} ms  {f['path']}  (regex {f['regex'] * 1000:.1f} ms, {f['read_bytes']} B)"
+            for f in report["files"][:TOP]
+        ]
+    if report["patterns"]:
+        lines.append(f"  slowest patterns (of {len(report['patterns'])}):")
+        lines += [
+            f"    {p['seconds'] * 1000:8.1f} ms  {p['name']}  calls={p['calls']} matches={p['matches']}"
+            for p in report["patterns"][:TOP]
+        ]
+    return "\n".join(lines)
+
+
+def run_main(main: Callable[[], Any], tool: str | None = None) -> Any:
+    """Call a tool's main(), profiled if --profile / --cprofile is on the command line."""
+    global _active
+    tool = tool or Path(sys.argv[0]).stem
+    out = _pop_option(sys.argv, "--profile")
+    cprofile_out = _pop_option(sys.argv, "--cprofile")
+    if out is None and cprofile_out is None:
+        return main()
+
+    profiler = Profiler(tool) if out is not None else None
+    cprof = cProfile.Profile() if cprofile_out is not None else None
+    if profiler:
+        profiler.install()
+        _active = profiler
+    if cprof:
+        cprof.enable()
+    try:
+        return main()
+    finally:
+        if cprof:
+            cprof.disable()
+            path = Path(cprofile_out or PROFILE_DIR / f"{tool}.prof")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            cprof.dump_stats(path)
+            print(f"cProfile dump: {path}", file=sys.stderr)
+        if profiler:
+            _active = None
+            profiler.uninstall()
+            report = profiler.report(sys.argv[1:])
+            path = Path(out or PROFILE_DIR / f"{tool}.json")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+            trace_path = path.with_name(path.stem + ".trace.json")
+            trace_path.write_text(json.dumps(profiler.trace()), encoding="utf-8")
+            print(summary(report), file=sys.stderr)
+            print(f"profile report: {path}\nChrome trace: {trace_path}", file=sys.stderr)
+
+
+DURATION_RE = re.compile(r"\d+(?:\.\d+)?\s*(?:ms|s)\b")
+
+
+def check_same_output(script: Path, args: list[str], ignore: list[str]) -> int:
+    """Run ``script`` with and without --profile; its output must not change.
+
+    Durations are masked and lines matching an ``ignore`` pattern dropped.
+    Run tools that rewrite files in a dry-run mode, or the second run sees
+    the first run's edits.
+    """
+    skip = [re.compile(p) for p in ignore]
+
+    def output(command: list[str]) -> tuple[int, list[str]]:
+        proc = subprocess.run(command, capture_output=True, text=True, cwd=TOOLS.parent)
+        lines = [DURATION_RE.sub("<t>", line) for line in proc.stdout.splitlines()]
+        return proc.returncode, [line for line in lines if not any(p.search(line) for p in skip)]
+
+    with tempfile.TemporaryDirectory(prefix="profile_check_") as tmp:
+        plain = output([sys.executable, str(script), *args])
+        profiled = output([sys.executable, __file__, f"--profile={tmp}/report.json", str(script), *args])
+    if plain == profiled:
+        print(f"{script.name}: same output with --profile (exit {plain[0]}, {len(plain[1])} lines)")
+        return 0
+    print(f"{script.name}: output differs with --profile (exit {plain[0]} -> {profiled[0]})")
+    sys.stdout.writelines(line + "\n" for line in difflib.unified_diff(plain[1], profiled[1], "plain", "--profile", lineterm="", n=1))
+    return 1
+
+
+def main() -> int:
+    # python tools/profiling.py [--profile[=OUT]] [--cprofile[=OUT]] [--check [--ignore RE]...] SCRIPT [ARGS...]
+    args = sys.argv[1:]
+    options: list[str] = []
+    ignore: list[str] = []
+    check = False
+    while args and args[0].startswith("-") and args[0] not in ("-h", "--help"):
+        option = args.pop(0)
+        if option == "--check":
+            check = True
+        elif option == "--ignore" and args:
+            ignore.append(args.pop(0))
+        elif option.startswith(("--profile", "--cprofile")):
+            options.append(option)
+        else:
+            print(f"unknown option {option}", file=sys.stderr)
+            return 2
+    if not args or args[0] in ("-h", "--help"):
+        print(__doc__)
+        return 0 if args else 2
+    script = Path(args[0])
+    if check:
+        return check_same_output(script, args[1:], ignore)
+    sys.argv = [str(script), *args[1:], *(options or ["--profile"])]
+    sys.path.insert(0, str(script.resolve().parent))
+
+    def run_script() -> int:
+        try:
+            runpy.run_path(str(script), run_name="__main__")
+        except SystemExit as exc:
+            return exc.code if isinstance(exc.code, int) else 0 if exc.code is None else 1
+        return 0
+
+    return run_main(run_script, script.stem)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
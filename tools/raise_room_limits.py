@@ -6,12 +6,21 @@ Only touches lines that match the pattern:
 
 This is safer than a blind regex — we require both labelKey + maxValue: 20
 on the same line.
+
+PATTERN is only applied inside each `CalculatorTextField(...)` call, so the
+`.*?` cannot run across the whole file, and each file gets a time budget
+(--budget-ms).
 """
 from __future__ import annotations
 
+import argparse
 from pathlib import Path
 import re
 
+from bounded_match import TimingReport, add_budget_argument, call_windows, sub_in_windows
+from profiling import run_main
+from writeback import WriteBack
+
 ROOT = Path(__file__).resolve().parents[1]
 SCREENS = ROOT / "lib" / "presentation" / "views" / "calculator"
 
@@ -34,21 +43,32 @@ REPLACE = r"\g<1>30)"
 
 
 def main() -> int:
+    parser = argparse.ArgumentParser(description="Raise room length/width maxValue 20 -> 30.")
+    add_budget_argument(parser)
+    args = parser.parse_args()
+
+    report = TimingReport(args.budget_ms)
     total = 0
-    for name in ROOM_FILES:
-        path = SCREENS / name
-        if not path.exists():
-            print(f"MISSING: {path}")
-            continue
-        content = path.read_text(encoding="utf-8")
-        new_content, n = PATTERN.subn(REPLACE, content)
-        if n > 0:
-            path.write_text(new_content, encoding="utf-8", newline="\n")
-            print(f"{name}: {n} replacements")
-            total += n
+    with WriteBack() as wb:
+        for name in ROOM_FILES:
+            path = SCREENS / name
+            if not path.exists():
+                print(f"MISSING: {path}")
+                continue
+            content = path.read_text(encoding="utf-8")
+            n = 0
+            with report.file(name) as budget:
+                windows = call_windows(content, "CalculatorTextField")
+                new_content, n = sub_in_windows(PATTERN, REPLACE, content, windows, budget)
+            if n > 0:
+                wb.stage(path, new_content)
+                print(f"{name}: {n} replacements")
+                total += n
     print(f"Total: {total}")
+    print(wb.stats)
+    report.print()
     return 0
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_main(main))
@@ -2,87 +2,192 @@
 """Remove unused_import warnings from `flutter analyze` output.
 
 Parses lines like:
-    warning - Unused import: 'PATH' - lib\file.dart:LINE:COL - unused_import
+    warning - Unused import: 'PATH' - lib\\file.dart:LINE:COL - unused_import
+
+or the machine-readable format of `dart analyze --format=machine`:
+    WARNING|STATIC_WARNING|UNUSED_IMPORT|/abs/lib/file.dart|LINE|COL|LEN|Unused import: 'PATH'.
 
 Deletes the matching line from the source file. Safe because the line
 number and the import path must both match.
+
+The analyzer output is streamed: diagnostics are parsed as they arrive and
+a file is edited as soon as the analyzer moves on to the next file, so
+analysis and editing overlap and memory stays flat however long the log is.
+Edited files are written together through writeback.py once the run ends.
+If the same file shows up again later, its line numbers are shifted by the
+lines already removed.
+
+Usage:
+    python tools/remove_unused_imports.py                # run flutter analyze
+    python tools/remove_unused_imports.py --machine      # run dart analyze --format=machine
+    python tools/remove_unused_imports.py analyze.log    # read a saved log (either format)
+    python tools/remove_unused_imports.py --sharded -j 8 # disjoint analyzer runs + result cache
 """
 from __future__ import annotations
 
+import argparse
+import bisect
 import re
 import subprocess
 import sys
 from collections import defaultdict
 from pathlib import Path
+from typing import Iterable, Iterator
+
+from line_buffer import LineBuffer
+from parallel import add_jobs_argument
+from profiling import run_main
+from writeback import WriteBack
 
 ROOT = Path(__file__).resolve().parents[1]
 
 PATTERN = re.compile(
     r"Unused import: '([^']+)' - (lib[\\/][^ :]+):(\d+):\d+ - unused_import"
 )
+MACHINE_PATTERN = re.compile(
+    r"^\w+\|\w+\|UNUSED_IMPORT\|([^|]+)\|(\d+)\|\d+\|\d+\|Unused import: '([^']+)'"
+)
+
+FLUTTER_ANALYZE = ["flutter", "analyze", "--no-fatal-infos", "--no-fatal-warnings"]
+DART_ANALYZE_MACHINE = ["dart", "analyze", "--format=machine"]
+
+
+def parse_line(line: str) -> tuple[str, int, str] | None:
+    """Return (file, line, import_path) for an unused_import diagnostic, else None."""
+    m = PATTERN.search(line)
+    if m:
+        return m.group(2).replace("\\", "/"), int(m.group(3)), m.group(1)
+    m = MACHINE_PATTERN.search(line)
+    if m:
+        file_path = m.group(1).replace("\\", "/")
+        root = ROOT.as_posix() + "/"
+        if file_path.startswith(root):
+            file_path = file_path[len(root) :]
+        return file_path, int(m.group(2)), m.group(3)
+    return None
+
+
+def iter_analyzer_lines(analyze_output_path: str | None = None, machine: bool = False) -> Iterator[str]:
+    """Yield analyzer output line by line, from a saved log or a live process."""
+    if analyze_output_path:
+        with open(analyze_output_path, encoding="utf-8") as f:
+            yield from f
+        return
+    cmd = DART_ANALYZE_MACHINE if machine else FLUTTER_ANALYZE
+    # Older analyzers print diagnostics to stderr; merge both streams.
+    with subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        encoding="utf-8",
+        cwd=ROOT,
+        bufsize=1,
+    ) as proc:
+        assert proc.stdout is not None
+        yield from proc.stdout
 
 
-def collect_edits(analyze_output_path: str | None = None) -> list[tuple[str, int, str]]:
+def iter_edits(lines: Iterable[str]) -> Iterator[tuple[str, int, str]]:
+    for line in lines:
+        edit = parse_line(line)
+        if edit:
+            yield edit
+
+
+def collect_edits(analyze_output_path: str | None = None, machine: bool = False) -> list[tuple[str, int, str]]:
     """Collect (file, line, import_path) tuples from `flutter analyze` output.
 
     If ``analyze_output_path`` is provided, reads from that file. Otherwise
     runs ``flutter analyze`` via subprocess (requires flutter on PATH).
     """
-    if analyze_output_path:
-        all_output = Path(analyze_output_path).read_text(encoding="utf-8")
-    else:
-        result = subprocess.run(
-            ["flutter", "analyze", "--no-fatal-infos", "--no-fatal-warnings"],
-            capture_output=True,
-            text=True,
-            cwd=ROOT,
-        )
-        all_output = (result.stdout or "") + "\n" + (result.stderr or "")
-    edits = []
-    for line in all_output.splitlines():
-        m = PATTERN.search(line)
-        if m:
-            import_path = m.group(1)
-            file_path = m.group(2).replace("\\", "/")
-            line_no = int(m.group(3))
-            edits.append((file_path, line_no, import_path))
-    return edits
+    return list(iter_edits(iter_analyzer_lines(analyze_output_path, machine)))
 
 
-def main() -> int:
-    arg = sys.argv[1] if len(sys.argv) > 1 else None
-    edits = collect_edits(arg)
-    print(f"Found {len(edits)} unused imports")
+class ImportRemover:
+    """Apply unused_import edits file by file while diagnostics stream in."""
 
-    by_file: dict[str, list[tuple[int, str]]] = defaultdict(list)
-    for fp, ln, ip in edits:
-        by_file[fp].append((ln, ip))
+    def __init__(self, writeback: WriteBack) -> None:
+        self.writeback = writeback
+        self.removed = 0
+        self.found = 0
+        # Original line numbers already deleted per file, sorted.
+        self._deleted: dict[str, list[int]] = defaultdict(list)
 
-    removed = 0
-    for fp, items in by_file.items():
-        items.sort(reverse=True)  # delete from bottom up
+    def apply(self, fp: str, items: list[tuple[int, str]]) -> None:
         abs_fp = ROOT / fp
         if not abs_fp.exists():
             print(f"MISSING: {abs_fp}")
-            continue
-        content = abs_fp.read_text(encoding="utf-8")
-        lines = content.split("\n")
-        for ln, ip in items:
-            idx = ln - 1
-            if idx >= len(lines):
+            return
+        buf = LineBuffer(self.writeback.read(abs_fp))
+        deleted = self._deleted[fp]
+        removed_here: set[int] = set()
+        for ln, ip in sorted(items):
+            if ln in deleted or ln in removed_here:
+                continue
+            idx = ln - 1 - bisect.bisect_left(deleted, ln)
+            if idx >= len(buf):
                 print(f"SKIP {fp}:{ln} (out of range)")
                 continue
-            text = lines[idx]
+            text = buf.line(idx)
             if "import" in text and ip in text:
-                del lines[idx]
-                removed += 1
+                buf.delete(idx)
+                removed_here.add(ln)
             else:
                 print(f"SKIP {fp}:{ln} mismatch: {text[:80]}")
-        abs_fp.write_text("\n".join(lines), encoding="utf-8", newline="\n")
+        if buf.commit():
+            self.writeback.stage(abs_fp, buf.text)
+            for ln in removed_here:
+                bisect.insort(deleted, ln)
+            self.removed += len(removed_here)
+
+    def run(self, edits: Iterable[tuple[str, int, str]]) -> None:
+        """Group consecutive diagnostics per file and flush on each file switch."""
+        current: str | None = None
+        pending: list[tuple[int, str]] = []
+        for fp, ln, ip in edits:
+            self.found += 1
+            if fp != current and pending:
+                self.apply(current, pending)  # type: ignore[arg-type]
+                pending = []
+            current = fp
+            pending.append((ln, ip))
+        if pending:
+            self.apply(current, pending)  # type: ignore[arg-type]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Remove imports flagged as unused_import.")
+    parser.add_argument("log", nargs="?", help="saved analyzer output instead of a live run")
+    parser.add_argument(
+        "--machine",
+        action="store_true",
+        help="run `dart analyze --format=machine` instead of `flutter analyze`",
+    )
+    parser.add_argument(
+        "--sharded",
+        action="store_true",
+        help="analyze lib/ in disjoint parts, --jobs at a time, reusing cached results (see analyzer_shards.py)",
+    )
+    add_jobs_argument(parser)
+    parser.add_argument("--no-cache", action="store_true", help="ignore cached diagnostics with --sharded")
+    args = parser.parse_args()
+
+    with WriteBack() as wb:
+        remover = ImportRemover(wb)
+        if args.sharded:
+            from analyzer_shards import analyze_sharded
 
-    print(f"Removed {removed} import lines")
+            edits, shards, from_cache = analyze_sharded(args.jobs, use_cache=not args.no_cache)
+            print(f"Analyzed {shards} shard(s), {from_cache} file(s) from cache")
+            remover.run(edits)
+        else:
+            remover.run(iter_edits(iter_analyzer_lines(args.log, args.machine)))
+    print(f"Found {remover.found} unused imports")
+    print(f"Removed {remover.removed} import lines")
+    print(wb.stats)
     return 0
 
 
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(run_main(main))
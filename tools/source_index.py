@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""Persistent on-disk index of lib/ sources and ru.json shared by tools/ scripts.
+
+Every file is keyed by path, mtime and size. When those change the content
+hash is recomputed, and the facts below are only re-extracted when the hash
+differs from the cached one:
+
+    ids             -- calculator ids (`id: '...'`)
+    screen_classes  -- `class FooScreen` / `class FooCalculatorScreen`
+    has_scaffold    -- file contains `CalculatorScaffold(`
+    has_text_field  -- file contains `CalculatorTextField`
+
+FAQ keys from assets/lang/ru.json are cached the same way.
+
+Usage:
+    python tools/source_index.py            # refresh and print a summary
+    python tools/source_index.py --rebuild  # drop the cache and rescan
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Iterable, NamedTuple
+
+from profiling import run_main
+
+ROOT = Path(__file__).resolve().parents[1]
+LIB = ROOT / "lib"
+RU_JSON = ROOT / "assets/lang/ru.json"
+CACHE_DIR = ROOT / "tools" / ".cache"
+DB_PATH = CACHE_DIR / "source_index.sqlite"
+
+# Bump when the extracted facts change shape so stale caches are dropped.
+SCHEMA_VERSION = 3
+
+ID_RE = re.compile(r"id: '([^']+)'")
+SCREEN_CLASS_RE = re.compile(r"^class (\w+Screen)\b", re.MULTILINE)
+
+
+class FileEntry(NamedTuple):
+    path: str  # relative to ROOT, forward slashes
+    sha1: str
+    ids: tuple[str, ...]
+    screen_classes: tuple[str, ...]
+    has_scaffold: bool
+    has_text_field: bool
+
+
+def rel(path: Path) -> str:
+    return path.resolve().relative_to(ROOT).as_posix()
+
+
+def shown(path: Path) -> str:
+    """``rel(path)`` for messages; paths outside the repo (e.g. --out /tmp/...) print as given."""
+    return rel(path) if path.resolve().is_relative_to(ROOT) else str(path)
+
+
+def extract(text: str) -> tuple[list[str], list[str], bool, bool]:
+    return (
+        ID_RE.findall(text),
+        SCREEN_CLASS_RE.findall(text),
+        "CalculatorScaffold(" in text,
+        "CalculatorTextField" in text,
+    )
+
+
+class SourceIndex:
+    """SQLite-backed cache of per-file facts, refreshed lazily on access."""
+
+    def __init__(self, db_path: Path = DB_PATH) -> None:
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(db_path)
+        self.reparsed = 0
+        self._init_schema()
+
+    def __enter__(self) -> SourceIndex:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.db.commit()
+        self.db.close()
+
+    def _init_schema(self) -> None:
+        (version,) = self.db.execute("PRAGMA user_version").fetchone()
+        if version != SCHEMA_VERSION:
+            self.db.executescript(
+                """
+                DROP TABLE IF EXISTS files;
+                DROP TABLE IF EXISTS faq;
+                """
+            )
+            self.db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                sha1 TEXT NOT NULL,
+                ids TEXT NOT NULL,
+                screen_classes TEXT NOT NULL,
+                has_scaffold INTEGER NOT NULL,
+                has_text_field INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS faq (
+                calc_id TEXT PRIMARY KEY,
+                target TEXT NOT NULL,
+                keys TEXT NOT NULL
+            );
+            """
+        )
+
+    def clear(self) -> None:
+        self.db.execute("DELETE FROM files")
+        self.db.execute("DELETE FROM faq")
+
+    def _refresh_one(self, path: Path) -> tuple[str, bool]:
+        """Bring the row for ``path`` up to date; return (rel path, reparsed)."""
+        key = rel(path)
+        st = path.stat()
+        row = self.db.execute(
+            "SELECT mtime_ns, size, sha1 FROM files WHERE path = ?", (key,)
+        ).fetchone()
+        if row and row[0] == st.st_mtime_ns and row[1] == st.st_size:
+            return key, False
+
+        data = path.read_bytes()
+        sha1 = hashlib.sha1(data).hexdigest()
+        if row and row[2] == sha1:
+            self.db.execute(
+                "UPDATE files SET mtime_ns = ?, size = ? WHERE path = ?",
+                (st.st_mtime_ns, st.st_size, key),
+            )
+            return key, False
+
+        if path.suffix == ".dart":
+            ids, classes, scaffold, text_field = extract(data.decode("utf-8"))
+        else:
+            ids, classes, scaffold, text_field = [], [], False, False
+        self.db.execute(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                key,
+                st.st_mtime_ns,
+                st.st_size,
+                sha1,
+                json.dumps(ids),
+                json.dumps(classes),
+                int(scaffold),
+                int(text_field),
+            ),
+        )
+        self.reparsed += 1
+        return key, True
+
+    def _row(self, key: str) -> FileEntry:
+        row = self.db.execute(
+            "SELECT path, sha1, ids, screen_classes, has_scaffold, has_text_field "
+            "FROM files WHERE path = ?",
+            (key,),
+        ).fetchone()
+        return FileEntry(
+            row[0],
+            row[1],
+            tuple(json.loads(row[2])),
+            tuple(json.loads(row[3])),
+            bool(row[4]),
+            bool(row[5]),
+        )
+
+    def entry(self, path: Path) -> FileEntry:
+        key, _ = self._refresh_one(path)
+        return self._row(key)
+
+    def entries(self, paths: Iterable[Path]) -> list[FileEntry]:
+        return [self.entry(p) for p in paths]
+
+    def scan(self, directory: Path, pattern: str = "*.dart", recursive: bool = False) -> list[FileEntry]:
+        """Refresh and return entries for files under ``directory``.
+
+        Rows for files that no longer exist under ``directory`` are pruned.
+        """
+        paths = sorted(directory.rglob(pattern) if recursive else directory.glob(pattern))
+        result = self.entries(paths)
+        prefix = rel(directory) + "/"
+        seen = {e.path for e in result}
+        stale = [
+            (p,)
+            for (p,) in self.db.execute(
+                "SELECT path FROM files WHERE path LIKE ?", (prefix + "%",)
+            )
+            if p not in seen and not (ROOT / p).exists()
+        ]
+        self.db.executemany("DELETE FROM files WHERE path = ?", stale)
+        return result
+
+    def calculator_ids(self, directory: Path, recursive: bool = False) -> set[str]:
+        ids: set[str] = set()
+        for e in self.scan(directory, recursive=recursive):
+            ids.update(e.ids)
+        return ids
+
+    def _refresh_faq(self) -> None:
+        _, reparsed = self._refresh_one(RU_JSON)
+        if reparsed:
+            # Both import this module.
+            from faq_aliases import load_aliases, target_or_none
+            from l10n_store import LocalizationStore
+
+            store = LocalizationStore.load(RU_JSON)
+            aliases = load_aliases(store)
+            targets = {calc_id: target_or_none(aliases, calc_id) for calc_id in store.keys(("faq",)) + list(aliases)}
+            self.db.execute("DELETE FROM faq")
+            self.db.executemany(
+                "INSERT INTO faq VALUES (?, ?, ?)",
+                [
+                    (calc_id, target, json.dumps(store.keys(("faq", target))))
+                    for calc_id, target in targets.items()
+                    if target is not None  # alias cycle: shows no block
+                ],
+            )
+
+    def faq(self) -> dict[str, tuple[str, ...]]:
+        """Return ``calc_id -> FAQ sub-keys`` from ru.json (``faq.<calc_id>.q1`` ...).
+
+        Ids declared in ``faq_aliases`` get the sub-keys of the block they point to.
+        """
+        self._refresh_faq()
+        return {
+            calc_id: tuple(json.loads(keys))
+            for calc_id, keys in self.db.execute("SELECT calc_id, keys FROM faq")
+        }
+
+    def faq_aliases(self) -> dict[str, str]:
+        """Return ``alias calc_id -> calc_id of the block it shows``.
+
+        FAQ blocks are the ids of faq() not listed here; tools report the two
+        counts separately.
+        """
+        self._refresh_faq()
+        return dict(self.db.execute("SELECT calc_id, target FROM faq WHERE calc_id != target"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rebuild", action="store_true", help="drop cached rows first")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with SourceIndex() as index:
+        if args.rebuild:
+            index.clear()
+        entries = index.scan(LIB, recursive=True)
+        faq = index.faq()
+        elapsed = time.perf_counter() - start
+        print(f"Files: {len(entries)}, re-parsed: {index.reparsed}, {elapsed * 1000:.0f} ms")
+        print(f"Calculator ids: {len({i for e in entries for i in e.ids})}")
+        print(f"Screen classes: {sum(len(e.screen_classes) for e in entries)}")
+        print(f"CalculatorScaffold: {sum(e.has_scaffold for e in entries)}")
+        print(f"CalculatorTextField: {sum(e.has_text_field for e in entries)}")
+        aliases = index.faq_aliases()
+        print(f"FAQ blocks: {len(faq) - len(aliases)}, aliases: {len(aliases)}")
+
+
+if __name__ == "__main__":
+    run_main(main)
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""Split assets/lang/ru.json into lazily loadable shards.
+
+    core.json            every namespace except the lazy ones (loaded at startup)
+    faq/<calc_id>.json   one FAQ block per calculator (loaded when its screen opens;
+                         ids in `faq_aliases` load their target's shard)
+    <namespace>.json     namespaces moved out of core with --split
+
+Each shard keeps the full key path ({"faq": {"stairs": {...}}}), so the
+loader can flatten shards one by one into the same map it builds today.
+manifest.json lists every shard with its size and SHA-1 and the SHA-1 of the
+ru.json it was cut from. Before anything is written the shards are merged
+back and compared with ru.json: every key must appear in exactly one shard
+with the same value.
+
+    python tools/split_lang_shards.py                 # -> build/lang_shards/
+    python tools/split_lang_shards.py --split units   # also move `units` out of core
+    python tools/split_lang_shards.py --check         # verify existing shards
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Any, Iterator
+
+from l10n_store import KeyPath, LocalizationStore
+from profiling import run_main
+from source_index import ROOT, RU_JSON
+
+OUT_DIR = ROOT / "build/lang_shards"
+MANIFEST_VERSION = 1
+
+
+def _file_name(key: str) -> str:
+    return re.sub(r"[^\w.-]", "_", key) + ".json"
+
+
+def _dump(data: dict[str, Any]) -> str:
+    # Shards are read by the app, not by people: no indentation.
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def _leaves(value: Any, path: KeyPath = ()) -> Iterator[tuple[KeyPath, Any]]:
+    if isinstance(value, dict) and value:
+        for key, nested in value.items():
+            yield from _leaves(nested, path + (key,))
+    else:
+        yield path, value
+
+
+def build_shards(store: LocalizationStore, split: list[str]) -> dict[str, dict[str, Any]]:
+    """Relative shard file -> shard document."""
+    shards: dict[str, dict[str, Any]] = {"core.json": {}}
+    for namespace in store.keys():
+        if namespace == "faq" and store.is_object(("faq",)):
+            for calc_id in store.keys(("faq",)):
+                shards[f"faq/{_file_name(calc_id)}"] = {"faq": {calc_id: store.get(("faq", calc_id))}}
+        elif namespace in split:
+            shards[_file_name(namespace)] = {namespace: store.get((namespace,))}
+        else:
+            shards["core.json"][namespace] = store.get((namespace,))
+    return shards
+
+
+def check_coverage(original: dict[str, Any], shards: dict[str, dict[str, Any]]) -> list[str]:
+    """Problems found when the shards are merged back; empty if they reproduce ``original``."""
+    expected = dict(_leaves(original))
+    seen: dict[KeyPath, str] = {}
+    problems: list[str] = []
+    for name, doc in shards.items():
+        for path, value in _leaves(doc):
+            dotted = ".".join(path)
+            if path in seen:
+                problems.append(f"{dotted}: in both {seen[path]} and {name}")
+            elif path not in expected:
+                problems.append(f"{dotted}: only in {name}")
+            elif expected[path] != value:
+                problems.append(f"{dotted}: value differs in {name}")
+            seen[path] = name
+    problems.extend(f"{'.'.join(p)}: missing from every shard" for p in sorted(expected.keys() - seen.keys()))
+    return problems
+
+
+def build_manifest(source: bytes, docs: dict[str, dict[str, Any]], texts: dict[str, str]) -> dict[str, Any]:
+    entries = []
+    for name, doc in docs.items():
+        data = texts[name].encode("utf-8")
+        if name.startswith("faq/"):
+            paths = [["faq", calc_id] for calc_id in doc["faq"]]
+        else:
+            paths = [[namespace] for namespace in doc]
+        entries.append({
+            "file": name,
+            "paths": paths,
+            "bytes": len(data),
+            "sha1": hashlib.sha1(data).hexdigest(),
+            "lazy": name != "core.json",
+        })
+    return {
+        "version": MANIFEST_VERSION,
+        "source": RU_JSON.relative_to(ROOT).as_posix(),
+        "source_bytes": len(source),
+        "source_sha1": hashlib.sha1(source).hexdigest(),
+        # faq.<alias> lives in the shard of the block it points to
+        "faq_aliases": docs["core.json"].get("faq_aliases", {}),
+        "shards": entries,
+    }
+
+
+def verify_existing(out_dir: Path, source: bytes) -> list[str]:
+    manifest_path = out_dir / "manifest.json"
+    if not manifest_path.exists():
+        return [f"{manifest_path} not found; run without --check first"]
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    problems: list[str] = []
+    if manifest.get("source_sha1") != hashlib.sha1(source).hexdigest():
+        problems.append("ru.json changed since the shards were built")
+    shards: dict[str, dict[str, Any]] = {}
+    for entry in manifest["shards"]:
+        path = out_dir / entry["file"]
+        if not path.exists():
+            problems.append(f"{entry['file']}: missing")
+            continue
+        data = path.read_bytes()
+        if hashlib.sha1(data).hexdigest() != entry["sha1"]:
+            problems.append(f"{entry['file']}: hash does not match the manifest")
+        try:
+            shards[entry["file"]] = json.loads(data)
+        except ValueError as exc:
+            problems.append(f"{entry['file']}: not valid JSON ({exc})")
+    return problems + check_coverage(json.loads(source), shards)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Split ru.json into lazily loadable shards.")
+    parser.add_argument("--out", type=Path, default=OUT_DIR, help=f"output directory (default {OUT_DIR.relative_to(ROOT)})")
+    parser.add_argument("--split", action="append", default=[], metavar="NAMESPACE", help="move a namespace out of core.json (repeatable)")
+    parser.add_argument("--check", action="store_true", help="verify existing shards against ru.json, write nothing")
+    args = parser.parse_args()
+    out_dir = args.out.resolve()
+
+    source = RU_JSON.read_bytes()
+    if args.check:
+        problems = verify_existing(out_dir, source)
+        for problem in problems:
+            print(f"  {problem}")
+        print("Shards OK" if not problems else f"{len(problems)} problem(s)")
+        return 1 if problems else 0
+
+    store = LocalizationStore(source)
+    unknown = [ns for ns in args.split if (ns,) not in store]
+    if unknown:
+        parser.error(f"unknown namespace(s): {', '.join(unknown)}")
+    docs = build_shards(store, args.split)
+    problems = check_coverage(json.loads(source), docs)
+    if problems:
+        for problem in problems:
+            print(f"  {problem}")
+        print(f"Shards do not reproduce ru.json ({len(problems)} problem(s)); nothing written")
+        return 1
+
+    texts = {name: _dump(doc) for name, doc in docs.items()}
+    manifest = build_manifest(source, docs, texts)
+    old_manifest = out_dir / "manifest.json"
+    stale: list[Path] = []
+    if old_manifest.exists():
+        old = json.loads(old_manifest.read_text(encoding="utf-8"))
+        stale = [out_dir / e["file"] for e in old["shards"] if e["file"] not in texts]
+
+    # Build output, not source: written directly (unchanged shards are
+    # skipped) rather than through the WriteBack journal.
+    texts["manifest.json"] = json.dumps(manifest, ensure_ascii=False, indent=2) + "\n"
+    written = 0
+    for name, text in texts.items():
+        path = out_dir / name
+        if path.exists() and path.read_text(encoding="utf-8") == text:
+            continue
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+        written += 1
+    for path in stale:
+        path.unlink(missing_ok=True)
+
+    core = next(e for e in manifest["shards"] if e["file"] == "core.json")
+    lazy_bytes = sum(e["bytes"] for e in manifest["shards"] if e["lazy"])
+    print(f"ru.json: {len(source)} bytes -> {len(docs)} shard(s) in {out_dir}")
+    print(f"  core.json: {core['bytes']} bytes ({len(core['paths'])} namespaces)")
+    print(f"  lazy shards: {len(docs) - 1}, {lazy_bytes} bytes")
+    if stale:
+        print(f"  removed {len(stale)} stale shard(s)")
+    print(f"  {written} file(s) written")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_main(main))
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""Select the tests affected by a change and print the `flutter test` command.
+
+A test file is selected when it depends on a changed file through Dart
+imports (import_graph, transitively) or is itself changed. Parity fixtures
+are selected per calculator: a fixture runs when its calculator's adapter
+file (or anything that file imports), its definition file or the fixture
+itself changed; ids are matched through xref_graph, like
+compare_parity_registry.py. When only fixtures are affected,
+canonical_web_parity_test.dart is run with `--name` limited to their
+`web parity: <calculator_id>` groups, as a separate command so the filter
+does not apply to other files.
+
+Durations come from `flutter test --machine` logs (`--record LOG`), kept in
+tools/.cache/test_durations.json; `--shards N` splits the selection into N
+commands of about equal recorded time (files without a recording count as
+the median).
+
+    python tools/test_impact.py                       # changes vs HEAD
+    python tools/test_impact.py --since origin/main --shards 4
+    python tools/test_impact.py lib/domain/usecases/stairs_canonical_adapter.dart
+    flutter test --machine > log.json; python tools/test_impact.py --record log.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import shlex
+import statistics
+import sys
+from collections import deque
+from pathlib import Path
+from typing import NamedTuple
+
+from git_changes import add_change_arguments, changed_files, selected_changes
+from import_graph import ImportGraph
+from profiling import run_main
+from source_index import CACHE_DIR, ROOT, rel
+from xref_graph import ADAPTER_ENTRY_RE, ADAPTER_REGISTRY, FIXTURES, load_graph
+
+DURATIONS_PATH = CACHE_DIR / "test_durations.json"
+TEST = ROOT / "test"
+PARITY_TEST = TEST / "domain/usecases/canonical_web_parity_test.dart"
+# Changes that can affect any test: run everything.
+FULL_SUITE = {"pubspec.yaml", "pubspec.lock", "analysis_options.yaml", "dart_test.yaml", "test/flutter_test_config.dart"}
+CANONICAL_DEF_RE = re.compile(r"^\w+\s+(calculateCanonical\w+)\s*\(", re.MULTILINE)
+
+
+class Selection(NamedTuple):
+    full: bool  # run the whole suite
+    tests: list[str]  # test files, relative to ROOT
+    parity_ids: list[str]  # calculator ids for a filtered parity run ([] = none)
+    ignored: list[str]  # changed files no test depends on through imports
+
+
+def adapter_files(graph: ImportGraph) -> dict[str, str]:
+    """Canonical adapter id -> lib/ file defining its function."""
+    registry = rel(ADAPTER_REGISTRY)
+    fn_to_file = {}
+    for path in graph.edges.get(registry, ()):
+        for fn in CANONICAL_DEF_RE.findall((ROOT / path).read_text(encoding="utf-8")):
+            fn_to_file[fn] = path
+    entries = ADAPTER_ENTRY_RE.findall(ADAPTER_REGISTRY.read_text(encoding="utf-8"))
+    return {adapter: fn_to_file[fn] for adapter, fn in entries if fn in fn_to_file}
+
+
+def dependents(graph: ImportGraph, changed: set[str], stop: set[str] = frozenset()) -> set[str]:
+    """``changed`` plus every file importing one of them, not walking past ``stop``."""
+    importers = graph.importers()
+    seen = {p for p in changed if p in graph.edges}
+    queue = deque(p for p in seen if p not in stop)
+    while queue:
+        for src in importers[queue.popleft()]:
+            if src not in seen:
+                seen.add(src)
+                if src not in stop:
+                    queue.append(src)
+    return seen
+
+
+def is_test(path: str) -> bool:
+    return path.startswith(rel(TEST) + "/") and path.endswith("_test.dart")
+
+
+def select(changed: set[str]) -> Selection:
+    if changed & FULL_SUITE:
+        return Selection(True, [], [], [])
+    graph = ImportGraph.build()
+    xref = load_graph()
+    parity = rel(PARITY_TEST)
+    fixture_prefix = rel(FIXTURES) + "/"
+
+    adapters = adapter_files(graph)
+    affected = dependents(graph, changed)
+    tests = {p for p in affected if is_test(p)}
+
+    hit = {adapter for adapter, path in adapters.items() if path in affected}
+    for path in changed:
+        for calc_id in xref.linked("definition", path, "calc"):
+            hit.update(xref.linked("calc", calc_id, "adapter"))
+    fixtures = {f for adapter in hit for f in xref.linked("adapter", adapter, "fixture")}
+    fixtures |= {p for p in changed if p.startswith(fixture_prefix) and p.endswith(".parity.json")}
+    parity_ids = set()
+    # Reaching the parity test only through adapter files means only those
+    # calculators' fixtures need to run, not the whole parity test.
+    full_parity = parity in dependents(graph, changed, stop=set(adapters.values()))
+    for fixture in fixtures:
+        path = ROOT / fixture
+        calc_id = json.loads(path.read_text(encoding="utf-8")).get("calculator_id") if path.exists() else None
+        if calc_id is None:
+            full_parity = True  # cannot filter by name: run every fixture
+        else:
+            parity_ids.add(calc_id)
+    tests.discard(parity)
+    if full_parity:
+        tests.add(parity)
+        parity_ids = set()
+
+    ignored = sorted(
+        p for p in changed
+        if p not in fixtures
+        and not xref.linked("definition", p, "calc")
+        and not any(is_test(d) for d in dependents(graph, {p}))
+    )
+    return Selection(False, sorted(tests), sorted(parity_ids), ignored)
+
+
+def record(log: Path, durations: dict[str, float]) -> int:
+    """Add per-file seconds from a `flutter test --machine` log; returns files recorded."""
+    suites: dict[int, str] = {}
+    started: dict[int, tuple[int, int]] = {}  # test id -> (suite id, start ms)
+    totals: dict[str, float] = {}
+    for line in log.read_text(encoding="utf-8").splitlines():
+        if not line.startswith("{"):
+            continue
+        event = json.loads(line)
+        kind = event.get("type")
+        if kind == "suite":
+            suites[event["suite"]["id"]] = event["suite"]["path"]
+        elif kind == "testStart":
+            started[event["test"]["id"]] = (event["test"]["suiteID"], event["time"])
+        elif kind == "testDone" and event["testID"] in started:
+            suite, start = started[event["testID"]]
+            path = rel(Path(suites[suite]).resolve()) if suite in suites else None
+            if path:
+                totals[path] = totals.get(path, 0.0) + (event["time"] - start) / 1000
+    durations.update({p: round(s, 3) for p, s in totals.items()})
+    return len(totals)
+
+
+def shard(units: list[tuple[str, list[str]]], durations: dict[str, float], count: int) -> list[list[tuple[str, list[str]]]]:
+    """Longest-first greedy split of (args, files) units into ``count`` shards."""
+    default = statistics.median(durations.values()) if durations else 1.0
+
+    def cost(unit: tuple[str, list[str]]) -> float:
+        return sum(durations.get(f, default) for f in unit[1])
+
+    # Split plain file lists into one unit per file so they can be balanced.
+    items = [(args, [f]) for args, files in units if not args for f in files]
+    items += [u for u in units if u[0]]
+    shards: list[list[tuple[str, list[str]]]] = [[] for _ in range(count)]
+    loads = [0.0] * count
+    for item in sorted(items, key=cost, reverse=True):
+        i = loads.index(min(loads))
+        shards[i].append(item)
+        loads[i] += cost(item)
+    return shards
+
+
+def commands(units: list[tuple[str, list[str]]]) -> list[str]:
+    plain = [f for args, files in units if not args for f in files]
+    lines = [f"flutter test {' '.join(plain)}"] if plain else []
+    lines += [f"flutter test {args} {' '.join(files)}" for args, files in units if args]
+    return lines
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Select tests affected by changed files.")
+    parser.add_argument("paths", nargs="*", type=Path, help="changed files (default: git changes)")
+    add_change_arguments(parser)
+    parser.add_argument("--shards", type=int, default=1, metavar="N", help="split into N commands by recorded duration")
+    parser.add_argument("--durations", type=Path, default=DURATIONS_PATH, help="recorded durations JSON")
+    parser.add_argument("--record", type=Path, metavar="LOG", help="store durations from a `flutter test --machine` log and exit")
+    args = parser.parse_args()
+
+    durations = json.loads(args.durations.read_text(encoding="utf-8")) if args.durations.exists() else {}
+    if args.record:
+        count = record(args.record, durations)
+        args.durations.parent.mkdir(parents=True, exist_ok=True)
+        args.durations.write_text(json.dumps(durations, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"Recorded {count} test file(s) in {args.durations}")
+        return 0
+
+    if args.paths:
+        changes = {p.resolve() for p in args.paths}
+    else:
+        changes = selected_changes(args)
+        if changes is None:  # no --since/--changed-only: diff against HEAD
+            changes = changed_files()
+    changed = {rel(p) for p in changes}
+    sel = select(changed)
+
+    print(f"Changed files: {len(changed)}", file=sys.stderr)
+    if sel.full:
+        print("Build or test configuration changed: running the full suite", file=sys.stderr)
+        print("flutter test")
+        return 0
+    for path in sel.ignored:
+        print(f"  no test imports {path}", file=sys.stderr)
+    print(f"Selected: {len(sel.tests)} test file(s), parity fixtures for {len(sel.parity_ids)} calculator(s)", file=sys.stderr)
+
+    units: list[tuple[str, list[str]]] = [("", sel.tests)] if sel.tests else []
+    if sel.parity_ids:
+        name = "web parity: (" + "|".join(sel.parity_ids) + ") "
+        units.append((f"--name {shlex.quote(name)}", [rel(PARITY_TEST)]))
+    if not units:
+        print("No tests affected", file=sys.stderr)
+        return 0
+    if args.shards <= 1:
+        for line in commands(units):
+            print(line)
+        return 0
+    for i, part in enumerate(shard(units, durations, args.shards), 1):
+        print(f"# shard {i}/{args.shards}")
+        for line in commands(part) or ["# (empty)"]:
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_main(main))
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""Transactional write-back for tools/ codemods.
+
+Scripts stage new file contents instead of writing as they go. Nothing
+touches the tree until commit(), which:
+
+    1. drops staged files whose text equals what is on disk (a file that
+       uses CRLF keeps CRLF, so reading and re-staging it is a no-op),
+    2. journals the original bytes of every file about to change
+       (tools/.cache/writeback/, manifest marked "pending"),
+    3. writes each file to a temp file next to it and os.replace()s it in,
+    4. marks the journal "committed".
+
+Ctrl-C or an exception before commit() leaves the tree untouched. A crash
+during commit() leaves a "pending" journal; the next WriteBack refuses to
+run until it is resolved:
+
+    python tools/writeback.py --status
+    python tools/writeback.py --rollback   # restore files from the last journal
+
+The journal of the last committed run is kept, so --rollback also undoes
+the last successful run.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import stat
+import sys
+from pathlib import Path
+from types import TracebackType
+from typing import NamedTuple
+
+from profiling import run_main
+from source_index import CACHE_DIR, ROOT
+
+JOURNAL_DIR = CACHE_DIR / "writeback"
+MANIFEST = JOURNAL_DIR / "manifest.json"
+
+
+class WriteStats(NamedTuple):
+    files_written: int
+    bytes_written: int
+    files_unchanged: int
+
+    def __str__(self) -> str:
+        return (
+            f"Wrote {self.files_written} file(s), {self.bytes_written} bytes"
+            f" ({self.files_unchanged} staged file(s) unchanged)"
+        )
+
+
+class JournalPending(RuntimeError):
+    pass
+
+
+def _read_manifest() -> dict | None:
+    if not MANIFEST.exists():
+        return None
+    return json.loads(MANIFEST.read_text(encoding="utf-8"))
+
+
+def _write_manifest(data: dict) -> None:
+    tmp = MANIFEST.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, MANIFEST)
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if path.exists():
+            os.chmod(tmp, stat.S_IMODE(path.stat().st_mode))
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def _encode(text: str, old: bytes | None) -> bytes:
+    """``text`` as bytes, with the line endings of the file it replaces.
+
+    read() uses universal newlines so codemod patterns only ever see "\\n".
+    """
+    if old is not None and b"\r\n" in old:
+        text = text.replace("\r\n", "\n").replace("\n", "\r\n")
+    return text.encode("utf-8")
+
+
+def _journal_path(path: Path) -> str:
+    """Repo-relative path, or absolute for files outside the repo (e.g. --out /tmp/...)."""
+    return path.relative_to(ROOT).as_posix() if path.is_relative_to(ROOT) else path.as_posix()
+
+
+class WriteBack:
+    """Buffer pending edits; write them atomically in one commit phase."""
+
+    def __init__(self, dry_run: bool = False) -> None:
+        self.dry_run = dry_run
+        self.pending: dict[Path, str] = {}
+        self.stats = WriteStats(0, 0, 0)
+
+    def __enter__(self) -> WriteBack:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.pending.clear()  # interrupted: leave the tree as it was
+
+    def read(self, path: Path) -> str:
+        """Current text of ``path``, including edits staged but not yet committed."""
+        path = path.resolve()
+        if path in self.pending:
+            return self.pending[path]
+        return path.read_text(encoding="utf-8")
+
+    def stage(self, path: Path, text: str) -> None:
+        self.pending[path.resolve()] = text
+
+    def commit(self) -> WriteStats:
+        changes: list[tuple[Path, bytes, bytes | None]] = []
+        unchanged = 0
+        for path, text in sorted(self.pending.items()):
+            old = path.read_bytes() if path.exists() else None
+            data = _encode(text, old)
+            if old == data:
+                unchanged += 1
+            else:
+                changes.append((path, data, old))
+        self.pending.clear()
+
+        if self.dry_run or not changes:
+            # A dry run reports what would have been written.
+            self.stats = WriteStats(len(changes), sum(len(d) for _, d, _ in changes), unchanged)
+            return self.stats
+
+        manifest = _read_manifest()
+        if manifest and manifest["status"] == "pending":
+            raise JournalPending(
+                "an interrupted write-back journal exists; run "
+                "`python tools/writeback.py --rollback` (or --discard) first"
+            )
+        if JOURNAL_DIR.exists():
+            shutil.rmtree(JOURNAL_DIR)
+        JOURNAL_DIR.mkdir(parents=True)
+        entries = []
+        for i, (path, _, old) in enumerate(changes):
+            backup = None
+            if old is not None:
+                backup = f"{i}.orig"
+                (JOURNAL_DIR / backup).write_bytes(old)
+            entries.append({"path": _journal_path(path), "backup": backup})
+        _write_manifest({"status": "pending", "files": entries})
+
+        written = 0
+        for path, data, _ in changes:
+            _atomic_write(path, data)
+            written += len(data)
+
+        _write_manifest({"status": "committed", "files": entries})
+        self.stats = WriteStats(len(changes), written, unchanged)
+        return self.stats
+
+
+def rollback() -> int:
+    """Restore every file recorded in the journal; return how many were restored."""
+    manifest = _read_manifest()
+    if not manifest:
+        return 0
+    for entry in manifest["files"]:
+        path = ROOT / entry["path"]  # absolute entries stay absolute
+        if entry["backup"] is None:
+            if path.exists():
+                path.unlink()
+        else:
+            _atomic_write(path, (JOURNAL_DIR / entry["backup"]).read_bytes())
+    shutil.rmtree(JOURNAL_DIR)
+    return len(manifest["files"])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Inspect or roll back the write-back journal.")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--status", action="store_true", help="show the journal (default)")
+    group.add_argument("--rollback", action="store_true", help="restore files from the journal")
+    group.add_argument("--discard", action="store_true", help="delete the journal, keep files as they are")
+    args = parser.parse_args()
+
+    manifest = _read_manifest()
+    if args.rollback:
+        print(f"Restored {rollback()} file(s)")
+    elif args.discard:
+        if JOURNAL_DIR.exists():
+            shutil.rmtree(JOURNAL_DIR)
+        print("Journal discarded")
+    elif not manifest:
+        print("No journal")
+    else:
+        print(f"Journal: {manifest['status']}, {len(manifest['files'])} file(s)")
+        for entry in manifest["files"]:
+            print(f"  {entry['path']}{'' if entry['backup'] else ' (new file)'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_main(main))
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""Cross-reference graph: calculator id <-> screen <-> FAQ <-> adapter <-> parity fixture.
+
+Nodes are (kind, name) pairs:
+
+    calc        calculator id                   'stairs'
+    definition  file declaring the id           'lib/domain/calculators/definitions/facade_calculators.dart'
+    screen      screen file routed to the id    'lib/presentation/views/calculator/stairs_calculator_screen.dart'
+    faq         FAQ block shown for the id      'stairs' (aliases resolve to their target block)
+    adapter     canonical adapter id            'stairs'
+    fixture     parity fixture file             'test/parity_fixtures/stairs.parity.json'
+
+Edges are undirected, so every lookup is a dict access in either direction:
+
+    graph = load_graph()
+    graph.linked("calc", "stairs", "screen")
+    graph.linked("fixture", "test/parity_fixtures/blind-area.parity.json", "calc")
+
+Fixture ids use hyphens ('blind-area') and adapter ids underscores
+('blind_area'); they are matched after normalizing hyphens. Calculator ids
+reach adapters through the `calculateCanonical*` function named in their
+definition.
+
+The graph is cached in tools/.cache/xref_graph.json, keyed by the content
+hashes of every input (SourceIndex), and rebuilt only when one changes.
+
+    python tools/xref_graph.py               # consistency report
+    python tools/xref_graph.py --show stairs # everything linked to a name
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterable
+
+import add_faq_prefix
+import migrate_calculator_screens
+from faq_aliases import load_aliases, target_or_none
+from l10n_store import LocalizationStore
+from profiling import run_main
+from source_index import CACHE_DIR, ID_RE, LIB, ROOT, RU_JSON, SourceIndex, rel
+
+CACHE_PATH = CACHE_DIR / "xref_graph.json"
+# Bump when node kinds or edge rules change.
+GRAPH_VERSION = 1
+
+CALCULATORS = LIB / "domain/calculators"
+VIEWS = LIB / "presentation/views"
+ADAPTER_REGISTRY = ROOT / "test/helpers/canonical_adapter_registry.dart"
+FIXTURES = ROOT / "test/parity_fixtures"
+
+KINDS = ("calc", "definition", "screen", "faq", "adapter", "fixture")
+CANONICAL_FN_RE = re.compile(r"\bcalculateCanonical\w+")
+ADAPTER_ENTRY_RE = re.compile(r"^\s*'([^']+)':\s*(\w+),", re.MULTILINE)
+
+Node = tuple[str, str]
+
+
+def adapter_id(fixture_id: str) -> str:
+    return fixture_id.replace("-", "_")
+
+
+class XrefGraph:
+    def __init__(self, edges: Iterable[tuple[Node, Node]] = ()) -> None:
+        self.adj: dict[Node, set[Node]] = defaultdict(set)
+        self.by_kind: dict[str, set[str]] = {kind: set() for kind in KINDS}
+        for a, b in edges:
+            self.link(a, b)
+
+    def add(self, node: Node) -> None:
+        self.by_kind[node[0]].add(node[1])
+        self.adj.setdefault(node, set())
+
+    def link(self, a: Node, b: Node) -> None:
+        self.add(a)
+        self.add(b)
+        self.adj[a].add(b)
+        self.adj[b].add(a)
+
+    def nodes(self, kind: str) -> list[str]:
+        return sorted(self.by_kind[kind])
+
+    def linked(self, kind: str, name: str, to_kind: str) -> list[str]:
+        """Names of ``to_kind`` nodes linked to (kind, name); [] if it is unknown."""
+        return sorted(n for k, n in self.adj.get((kind, name), ()) if k == to_kind)
+
+    def find(self, name: str) -> list[Node]:
+        return [(kind, name) for kind in KINDS if name in self.by_kind[kind]]
+
+    def to_json(self) -> dict:
+        edges = sorted({tuple(sorted((a, b))) for a, nbrs in self.adj.items() for b in nbrs})
+        isolated = sorted(n for n, nbrs in self.adj.items() if not nbrs)
+        return {"edges": [list(map(list, e)) for e in edges], "nodes": [list(n) for n in isolated]}
+
+    @classmethod
+    def from_json(cls, data: dict) -> XrefGraph:
+        graph = cls((tuple(a), tuple(b)) for a, b in data["edges"])
+        for node in data["nodes"]:
+            graph.add(tuple(node))
+        return graph
+
+
+def _inputs(index: SourceIndex) -> list:
+    entries = index.scan(CALCULATORS, recursive=True) + index.scan(VIEWS, recursive=True)
+    entries += index.scan(FIXTURES, "*.parity.json")
+    entries += index.entries([
+        add_faq_prefix.REGISTRY,
+        ADAPTER_REGISTRY,
+        RU_JSON,
+        # Hand-maintained id tables live in these scripts.
+        Path(add_faq_prefix.__file__),
+        Path(migrate_calculator_screens.__file__),
+    ])
+    return entries
+
+
+def fingerprint(entries: list) -> str:
+    h = hashlib.sha1(f"v{GRAPH_VERSION}".encode())
+    for e in sorted(entries):
+        h.update(f"\n{e.path} {e.sha1}".encode())
+    return h.hexdigest()
+
+
+def build_graph(entries: list) -> XrefGraph:
+    graph = XrefGraph()
+    by_path = {e.path: e for e in entries}
+
+    adapters = dict(
+        (fn, adapter) for adapter, fn in ADAPTER_ENTRY_RE.findall(ADAPTER_REGISTRY.read_text(encoding="utf-8"))
+    )
+    for adapter in adapters.values():
+        graph.add(("adapter", adapter))
+
+    calc_prefix = rel(CALCULATORS) + "/"
+    for e in entries:
+        if not e.path.startswith(calc_prefix) or not e.ids:
+            continue
+        text = (ROOT / e.path).read_text(encoding="utf-8")
+        ids = [(m.start(), m.group(1)) for m in ID_RE.finditer(text)]
+        for calc_id in e.ids:
+            graph.link(("calc", calc_id), ("definition", e.path))
+        # A canonical function belongs to the nearest id declared before it.
+        for m in CANONICAL_FN_RE.finditer(text):
+            owner = [calc_id for pos, calc_id in ids if pos < m.start()]
+            if owner and m.group() in adapters:
+                graph.link(("calc", owner[-1]), ("adapter", adapters[m.group()]))
+
+    for e in entries:
+        if e.path.startswith(rel(FIXTURES) + "/"):
+            data = json.loads((ROOT / e.path).read_text(encoding="utf-8"))
+            fixture_id = data.get("calculator_id", Path(e.path).name.removesuffix(".parity.json"))
+            graph.add(("fixture", e.path))
+            if adapter_id(fixture_id) in graph.by_kind["adapter"]:
+                graph.link(("fixture", e.path), ("adapter", adapter_id(fixture_id)))
+
+    screen_prefix = rel(VIEWS) + "/"
+    class_to_file = {
+        cls: e.path for e in entries if e.path.startswith(screen_prefix) for cls in e.screen_classes
+    }
+    for e in entries:
+        if e.path.startswith(screen_prefix) and e.screen_classes and e.has_scaffold:
+            graph.add(("screen", e.path))
+    for calc_id, cls in add_faq_prefix.registry_pairs():
+        if cls in class_to_file:
+            graph.link(("calc", calc_id), ("screen", class_to_file[cls]))
+    for name, calc_id in add_faq_prefix.MANUAL.items():
+        for path in by_path:
+            if path.startswith(screen_prefix) and path.endswith("/" + name):
+                graph.link(("calc", calc_id), ("screen", path))
+
+    store = LocalizationStore.load(RU_JSON)
+    aliases = load_aliases(store)
+    for calc_id in graph.nodes("calc"):
+        block = target_or_none(aliases, calc_id)
+        if block is not None and ("faq", block) in store:
+            graph.link(("calc", calc_id), ("faq", block))
+    for block in store.keys(("faq",)):
+        graph.add(("faq", block))
+    return graph
+
+
+def load_graph(rebuild: bool = False) -> XrefGraph:
+    with SourceIndex() as index:
+        entries = _inputs(index)
+    key = fingerprint(entries)
+    if not rebuild and CACHE_PATH.exists():
+        cached = json.loads(CACHE_PATH.read_text(encoding="utf-8"))
+        if cached.get("fingerprint") == key:
+            return XrefGraph.from_json(cached["graph"])
+    graph = build_graph(entries)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    CACHE_PATH.write_text(json.dumps({"fingerprint": key, "graph": graph.to_json()}), encoding="utf-8")
+    return graph
+
+
+def consistency_report(graph: XrefGraph) -> dict[str, list[str]]:
+    calcs = graph.nodes("calc")
+    defined = [c for c in calcs if graph.linked("calc", c, "definition")]
+    routed = {
+        rel(VIEWS / name): calc_id for name, calc_id in migrate_calculator_screens.FILE_TO_ID.items()
+    }
+    return {
+        "missing FAQ": [c for c in defined if not graph.linked("calc", c, "faq")],
+        "missing adapter": [c for c in defined if not graph.linked("calc", c, "adapter")],
+        "missing fixture": [
+            f"{c} (adapter {a})"
+            for c in defined
+            for a in graph.linked("calc", c, "adapter")
+            if not graph.linked("adapter", a, "fixture")
+        ],
+        "adapter without fixture": [
+            a for a in graph.nodes("adapter") if not graph.linked("adapter", a, "fixture")
+        ],
+        "fixture without adapter": [
+            f for f in graph.nodes("fixture") if not graph.linked("fixture", f, "adapter")
+        ],
+        "orphan screen": [
+            s for s in graph.nodes("screen")
+            if not graph.linked("screen", s, "calc")
+            and not Path(s).name.startswith("_")
+            and Path(s).name not in add_faq_prefix.SKIP_FILES
+        ],
+        "screen route to unknown id": [
+            f"{c} -> {s}"
+            for c in sorted(set(calcs) - set(defined))
+            for s in graph.linked("calc", c, "screen")
+        ],
+        "FILE_TO_ID disagrees with registry": [
+            f"{path}: {calc_id} (registry: {', '.join(graph.linked('screen', path, 'calc')) or 'none'})"
+            for path, calc_id in sorted(routed.items())
+            if calc_id not in graph.linked("screen", path, "calc")
+        ],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Calculator cross-reference graph and consistency report.")
+    parser.add_argument("--show", metavar="NAME", action="append", default=[], help="print every node linked to NAME")
+    parser.add_argument("--rebuild", action="store_true", help="ignore the cached graph")
+    parser.add_argument("--strict", action="store_true", help="exit 1 when the report has findings")
+    args = parser.parse_args()
+
+    graph = load_graph(args.rebuild)
+    if args.show:
+        for name in args.show:
+            nodes = graph.find(name)
+            if not nodes:
+                print(f"{name}: not in the graph")
+            for kind, _ in nodes:
+                print(f"{kind} {name}")
+                for other in KINDS:
+                    for linked in graph.linked(kind, name, other):
+                        print(f"  {other:<10} {linked}")
+        return 0
+
+    print("  ".join(f"{kind}: {len(graph.by_kind[kind])}" for kind in KINDS))
+    report = consistency_report(graph)
+    for section, items in report.items():
+        print(f"\n{section}: {len(items)}")
+        for item in items:
+            print(f"  {item}")
+    return 1 if args.strict and any(report.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_main(main))